@@ -0,0 +1,289 @@
+"""
+Local breed catalog.
+
+The full Dog API and Cat API breed lists are bulk-loaded into per pet type in-memory indexes, so
+breed lookups and autocomplete are answered without an internet round trip:
+- a sorted name list and a sorted word list, searched with `bisect` for prefix matches
+  ("gol" -> "Golden Retriever", "retr" -> "Labrador Retriever");
+- a trigram index for typo-tolerant matches ("labrdor" -> "Labrador Retriever").
+Lists are re-fetched with conditional requests (ETag / Last-Modified), and the last good lists
+are kept in a JSON snapshot file so a restarted worker serves lookups before, or without, reaching
+the upstream APIs.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import httpx
+from dotenv import load_dotenv
+from app.upstream import upstream
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DOG_API_KEY = os.getenv("DOG_API_KEY")
+# Next to this module by default, like the vaccine data files, whatever the working directory
+BREED_CATALOG_SNAPSHOT = Path(
+    os.getenv("BREED_CATALOG_SNAPSHOT", Path(__file__).resolve().parent / "breed_catalog.json")
+)
+# Minimum share (0-1) of the query's trigrams a fuzzy autocomplete match must contain
+BREED_FUZZY_THRESHOLD = float(os.getenv("BREED_FUZZY_THRESHOLD", 0.5))
+
+BREED_LIST_URLS = {
+    "dog": "https://api.thedogapi.com/v1/breeds",
+    "cat": "https://api.thecatapi.com/v1/breeds",
+}
+
+
+def api_headers(pet_type: str) -> dict:
+    # The Cat API does not require an API key for breed listings and searches
+    return {"x-api-key": DOG_API_KEY} if pet_type == "dog" and DOG_API_KEY else {}
+
+
+def normalize(name: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+
+def trigrams(text: str) -> Counter:
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class BreedIndex:
+    """
+    Immutable search index over the breeds of one pet type.
+    """
+
+    def __init__(self, breeds: List[dict]):
+        named = (breed for breed in breeds if breed.get("name"))
+        self.breeds = sorted(named, key=lambda breed: normalize(breed["name"]))
+        self.names = [normalize(breed["name"]) for breed in self.breeds]
+        self.by_name = {name: position for position, name in enumerate(self.names)}
+        self.words: List[Tuple[str, int]] = sorted(
+            (word, position) for position, name in enumerate(self.names) for word in set(name.split())
+        )
+        self.grams = [trigrams(name) for name in self.names]
+        self.postings: Dict[str, List[int]] = {}
+        for position, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.breeds)
+
+    @staticmethod
+    def _prefixed(keys: list, low, matches) -> List[int]:
+        # Keys from `low` on, for as long as they match; sorted keys keep all matches together
+        hits = []
+        for position in range(bisect_left(keys, low), len(keys)):
+            if not matches(keys[position]):
+                break
+            hits.append(position)
+        return hits
+
+    def prefix_matches(self, query: str) -> List[int]:
+        """
+        Positions of breeds whose name, or one of whose words, starts with `query`, name matches first.
+        """
+        matches = self._prefixed(self.names, query, lambda name: name.startswith(query))
+        word_hits = self._prefixed(self.words, (query,), lambda entry: entry[0].startswith(query))
+        seen = set(matches)
+        for position in (self.words[hit][1] for hit in word_hits):
+            if position not in seen:
+                seen.add(position)
+                matches.append(position)
+        return matches
+
+    def fuzzy_matches(self, query: str, threshold: float = BREED_FUZZY_THRESHOLD) -> List[int]:
+        """
+        Positions of breeds by descending trigram similarity to `query`.
+        - Like `word_similarity` in pg_trgm, a breed is scored on the share of the query's trigrams it
+          contains, so a long name is not penalized; ties go to the closer name overall.
+        """
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram, count in query_grams.items():
+            for position in self.postings.get(gram, ()):
+                shared[position] += min(count, self.grams[position][gram])
+        total = sum(query_grams.values())
+        scored = []
+        for position, common in shared.items():
+            if common / total >= threshold:
+                overall = common / (total + sum(self.grams[position].values()) - common)
+                scored.append((-common, -overall, self.names[position], position))
+        return [position for *_, position in sorted(scored)]
+
+    def position(self, breed_name: str) -> Optional[int]:
+        """
+        Position of the breed named `breed_name`, or else of the one breed whose name or a name word starts with it.
+        - None if none or several match ("retriever"): an answer about a guessed breed would mislead.
+        """
+        query = normalize(breed_name)
+        if not query:
+            return None
+        position = self.by_name.get(query)
+        if position is None:
+            matches = self.prefix_matches(query)
+            if len(matches) == 1:
+                position = matches[0]
+        return position
+
+    def lookup(self, breed_name: str) -> Optional[dict]:
+        position = self.position(breed_name)
+        return None if position is None else self.breeds[position]
+
+    def autocomplete(self, query: str, limit: int = 10) -> List[dict]:
+        query = normalize(query)
+        if not query:
+            return []
+        positions = self.prefix_matches(query)[:limit]
+        if len(positions) < limit:
+            seen = set(positions)
+            fuzzy = [position for position in self.fuzzy_matches(query) if position not in seen]
+            positions += fuzzy[:limit - len(positions)]
+        breeds = [self.breeds[position] for position in positions]
+        return [{"id": breed.get("id"), "name": breed["name"]} for breed in breeds]
+
+
+class BreedCatalog:
+    """
+    Per pet type breed indexes, refreshed from the upstream APIs.
+    - A refresh builds a new index and swaps it in at once; readers never see a half-built one.
+    - `refresh` is driven by `app.jobs.breed_catalog_refresh`; lookups never call upstream.
+    """
+
+    def __init__(self, snapshot_path: Optional[Path] = BREED_CATALOG_SNAPSHOT):
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, BreedIndex] = {}
+        self._validators: Dict[str, dict] = {}  # ETag / Last-Modified per pet type
+        self.loaded_at: Dict[str, float] = {}
+        self.version = 0  # Bumped on every index swap; indexes derived from the catalog rebuild on change
+        self.stats = {"refreshes": 0, "not_modified": 0, "failed": 0, "lookups": 0, "autocompletes": 0}
+
+    def has(self, pet_type: str) -> bool:
+        return pet_type in self._indexes
+
+    def index(self, pet_type: str) -> Optional[BreedIndex]:
+        return self._indexes.get(pet_type)
+
+    def replace(self, pet_type: str, breeds: List[dict], validators: Optional[dict] = None):
+        index = BreedIndex(breeds)
+        with self._lock:
+            self._indexes[pet_type] = index
+            self._validators[pet_type] = validators or {}
+            self.loaded_at[pet_type] = time.time()
+            self.version += 1
+        logger.info(f"Loaded {len(index)} {pet_type} breeds into the breed catalog")
+
+    def breeds(self, pet_type: str) -> List[dict]:
+        index = self._indexes.get(pet_type)
+        return index.breeds if index else []
+
+    def lookup(self, pet_type: str, breed_name: str) -> Optional[dict]:
+        index = self._indexes.get(pet_type)
+        self.stats["lookups"] += 1
+        return index.lookup(breed_name) if index else None
+
+    def autocomplete(self, pet_type: str, query: str, limit: int = 10) -> List[dict]:
+        index = self._indexes.get(pet_type)
+        self.stats["autocompletes"] += 1
+        return index.autocomplete(query, limit) if index else []
+
+    async def fetch(self, pet_type: str) -> bool:
+        """
+        Conditionally re-fetch one breed list; returns whether the index changed.
+        """
+        headers = api_headers(pet_type)
+        validators = self._validators.get(pet_type, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = await upstream.get(BREED_LIST_URLS[pet_type], headers=headers)
+        if response.status_code == 304:
+            self.stats["not_modified"] += 1
+            return False
+        response.raise_for_status()
+        breeds = response.json()
+        validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "digest": hashlib.sha256(response.content).hexdigest(),
+        }
+        if self.has(pet_type) and validators["digest"] == self._validators.get(pet_type, {}).get("digest"):
+            # The APIs do not always send validators; an unchanged body needs no rebuild either
+            self._validators[pet_type] = validators
+            self.stats["not_modified"] += 1
+            return False
+        self.replace(pet_type, breeds, validators)
+        return True
+
+    async def refresh(self) -> dict:
+        """
+        Re-fetch every breed list; a failed pet type keeps its current index.
+        """
+        changed = {}
+        for pet_type in BREED_LIST_URLS:
+            try:
+                changed[pet_type] = await self.fetch(pet_type)
+            except (httpx.HTTPError, ValueError) as e:
+                self.stats["failed"] += 1
+                changed[pet_type] = False
+                logger.warning(f"Could not refresh the {pet_type} breed list: {e}")
+        self.stats["refreshes"] += 1
+        if any(changed.values()):
+            self.save_snapshot()
+        return changed
+
+    def save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        data = {
+            pet_type: {"breeds": index.breeds, "validators": self._validators.get(pet_type, {})}
+            for pet_type, index in self._indexes.items()
+        }
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = self.snapshot_path.with_suffix(".tmp")
+            partial.write_text(json.dumps(data), encoding="utf-8")
+            partial.replace(self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Could not write the breed catalog snapshot {self.snapshot_path}: {e}")
+
+    def load_snapshot(self) -> bool:
+        """
+        Load the breed lists saved by the last successful refresh, if any.
+        """
+        if not self.snapshot_path or not self.snapshot_path.exists():
+            return False
+        try:
+            data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable breed catalog snapshot {self.snapshot_path}: {e}")
+            return False
+        for pet_type, entry in data.items():
+            self.replace(pet_type, entry["breeds"], entry.get("validators"))
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "breeds": {pet_type: len(index) for pet_type, index in self._indexes.items()},
+            "loaded_at": self.loaded_at,
+            "version": self.version,
+            **self.stats,
+        }
+
+
+# Process-wide catalog, loaded from the snapshot at startup and kept fresh by the refresh job
+catalog = BreedCatalog()
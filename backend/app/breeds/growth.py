@@ -0,0 +1,72 @@
+"""
+Puppy and kitten growth curves.
+
+A young animal's expected weight is its breed's adult range scaled by the share of adult weight
+reached at its age. That share is read from a growth table per size class, linearly interpolated
+by age in weeks. Dogs are sized by the midpoint of their adult range because small breeds finish
+growing within a year while giant breeds take up to two. The tables are approximate averages of
+published growth charts, and the result is widened by GROWTH_TOLERANCE to cover normal spread.
+Breeds without an adult range (see app/breeds/weights.py) are not covered (None).
+"""
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+from app.breeds.weights import WeightRanges, weight_ranges as breed_weight_ranges
+
+# Relative widening of the interpolated range on both sides
+GROWTH_TOLERANCE = float(os.getenv("GROWTH_TOLERANCE", 0.15))
+
+# Upper bound (kg, adult range midpoint) of each dog size class
+DOG_SIZE_CLASSES = (("toy", 5), ("small", 10), ("medium", 25), ("large", 45), ("giant", float("inf")))
+
+# Share of adult weight by age in weeks, per size class: (weeks, share) points
+GROWTH_TABLES = {
+    "toy": ((0, 0.05), (8, 0.25), (12, 0.38), (16, 0.52), (24, 0.75), (36, 0.95), (52, 1.0)),
+    "small": ((0, 0.04), (8, 0.22), (12, 0.35), (16, 0.48), (24, 0.70), (36, 0.90), (52, 1.0)),
+    "medium": ((0, 0.03), (8, 0.17), (12, 0.28), (16, 0.40), (24, 0.60), (36, 0.80), (52, 0.95), (64, 1.0)),
+    "large": ((0, 0.02), (8, 0.13), (12, 0.22), (16, 0.32), (24, 0.52), (36, 0.72), (52, 0.88), (78, 1.0)),
+    "giant": (
+        (0, 0.015), (8, 0.10), (12, 0.17), (16, 0.26), (24, 0.44), (36, 0.62), (52, 0.78), (78, 0.92), (104, 1.0)
+    ),
+    "cat": ((0, 0.03), (8, 0.25), (12, 0.35), (16, 0.45), (24, 0.65), (36, 0.85), (52, 1.0)),
+}
+
+# The tables as (weeks, share) arrays for np.interp
+_CURVES: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+    size: (np.array([weeks for weeks, _ in points], dtype=np.float64), np.array([share for _, share in points]))
+    for size, points in GROWTH_TABLES.items()
+}
+
+
+def size_class(pet_type: str, adult_range: Tuple[float, float]) -> str:
+    if pet_type == "cat":
+        return "cat"
+    midpoint = sum(adult_range) / 2
+    return next(size for size, limit in DOG_SIZE_CLASSES if midpoint < limit)
+
+
+def growth_share(size: str, age_weeks: float) -> float:
+    """
+    Share of adult weight expected at `age_weeks`; 1.0 once fully grown.
+    """
+    weeks, shares = _CURVES[size]
+    return float(np.interp(age_weeks, weeks, shares))
+
+
+def expected_weight_range(
+    breed: str,
+    age_weeks: float,
+    pet_type: Optional[str] = None,
+    ranges: WeightRanges = breed_weight_ranges,
+) -> Optional[Tuple[float, float]]:
+    """
+    Healthy (min, max) kilograms for a `breed` animal aged `age_weeks`; None if the breed is not covered.
+    """
+    adult = ranges.weight_range(breed, pet_type)
+    if adult is None:
+        return None
+    if pet_type is None:
+        pet_type = "dog" if ranges.index("dog").row(breed) >= 0 else "cat"
+    share = growth_share(size_class(pet_type, adult), age_weeks)
+    low, high = adult[0] * share * (1 - GROWTH_TOLERANCE), adult[1] * share * (1 + GROWTH_TOLERANCE)
+    return round(low, 1), round(high, 1)
@@ -0,0 +1,164 @@
+"""
+Breed weight ranges.
+
+The metric weight strings of the breed catalog ("25 - 34", "3 - 7") are parsed once into a
+compact index per pet type: a name -> row map over two float arrays of lower and upper bounds.
+A single check is a dict lookup; a batch is classified with vectorized NumPy comparisons.
+The index is rebuilt when the catalog changes (`BreedCatalog.version`). Until the catalog has a
+pet type's breeds (no snapshot yet, refresh disabled or upstream unreachable), the ranges of common
+breeds bundled in `fallback_weights.json` are used, so weights are still checked locally.
+"""
+import json
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from app.breeds.catalog import BreedCatalog, BreedIndex, catalog as breed_catalog, normalize
+
+# Status codes of `WeightIndex.classify`, in the order of WEIGHT_STATUSES
+UNKNOWN, UNDERWEIGHT, HEALTHY, OVERWEIGHT, INVALID = range(5)
+WEIGHT_STATUSES = ("unknown", "underweight", "healthy", "overweight", "invalid")
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+FALLBACK_WEIGHTS_FILE = Path(__file__).resolve().parent / "fallback_weights.json"
+
+
+@lru_cache(maxsize=1)
+def fallback_breeds() -> Dict[str, List[dict]]:
+    """
+    Bundled breeds with weight ranges per pet type, in the breed catalog's format.
+    """
+    with open(FALLBACK_WEIGHTS_FILE, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def parse_weight_range(metric: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    (min, max) kilograms from a catalog weight string; None unless it holds a valid range.
+    """
+    if not metric or "nan" in metric.lower():
+        return None
+    numbers = [float(number) for number in _NUMBER.findall(metric)]
+    if len(numbers) != 2 or numbers[0] > numbers[1]:
+        return None
+    return numbers[0], numbers[1]
+
+
+class WeightIndex:
+    """
+    Weight ranges of the breeds of one pet type.
+    """
+
+    def __init__(self, breeds: Sequence[dict]):
+        rows: Dict[str, int] = {}
+        low, high = [], []
+        for breed in breeds:
+            bounds = parse_weight_range((breed.get("weight") or {}).get("metric"))
+            if bounds is None:
+                continue
+            rows[normalize(breed["name"])] = len(low)
+            low.append(bounds[0])
+            high.append(bounds[1])
+        self.rows = rows
+        # Name search over all breeds, so a partial name is only accepted when no other breed matches it
+        self.search = BreedIndex(breeds)
+        # Row -1 (unknown breeds) reads the NaN sentinel at the end
+        self.low = np.array(low + [np.nan], dtype=np.float64)
+        self.high = np.array(high + [np.nan], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def row(self, breed: str) -> int:
+        """
+        Row of the breed `BreedIndex.position` resolves `breed` to; -1 if none, or if it has no weight range.
+        """
+        position = self.search.position(breed)
+        row = None if position is None else self.rows.get(self.search.names[position])
+        return -1 if row is None else row
+
+    def weight_range(self, breed: str) -> Optional[Tuple[float, float]]:
+        row = self.row(breed)
+        return None if row < 0 else (float(self.low[row]), float(self.high[row]))
+
+    def classify(self, breeds: Sequence[str], weights: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Status codes and (min, max) bounds for many (breed, weight) pairs.
+        - Names are resolved once per distinct breed; the comparisons run on whole arrays.
+        """
+        names, inverse = np.unique(np.asarray(breeds, dtype=object).astype(str), return_inverse=True)
+        rows = np.array([self.row(name) for name in names], dtype=np.int64)[inverse]
+        low, high = self.low[rows], self.high[rows]
+        weights = np.asarray(weights, dtype=np.float64)
+        status = np.select(
+            [~(weights > 0), rows < 0, weights < low, weights > high],
+            [INVALID, UNKNOWN, UNDERWEIGHT, OVERWEIGHT],
+            default=HEALTHY,
+        )
+        return status, low, high
+
+
+class WeightRanges:
+    """
+    Per pet type weight indexes over a breed catalog, rebuilt when the catalog changes.
+    - `fallback` holds the breeds of pet types the catalog has not loaded; the bundled ones by default.
+    """
+
+    def __init__(self, catalog: BreedCatalog = breed_catalog, fallback: Optional[Dict[str, List[dict]]] = None):
+        self.catalog = catalog
+        self.fallback = fallback_breeds() if fallback is None else fallback
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, WeightIndex] = {}
+        self._sources: Dict[str, str] = {}
+        self._version: Optional[int] = None
+
+    def index(self, pet_type: str) -> WeightIndex:
+        if self._version != self.catalog.version:
+            with self._lock:
+                if self._version != self.catalog.version:
+                    version = self.catalog.version
+                    self._indexes, self._sources = {}, {}
+                    self._version = version
+        index = self._indexes.get(pet_type)
+        if index is None:
+            if self.catalog.has(pet_type):
+                breeds, self._sources[pet_type] = self.catalog.breeds(pet_type), "catalog"
+            else:
+                breeds, self._sources[pet_type] = self.fallback.get(pet_type, []), "fallback"
+            index = self._indexes[pet_type] = WeightIndex(breeds)
+        return index
+
+    def weight_range(self, breed: str, pet_type: Optional[str] = None) -> Optional[Tuple[float, float]]:
+        """
+        (min, max) kilograms of a breed; looked up in every pet type when `pet_type` is not given.
+        """
+        for candidate in [pet_type] if pet_type else ["dog", "cat"]:
+            bounds = self.index(candidate).weight_range(breed)
+            if bounds is not None:
+                return bounds
+        return None
+
+    def validate_batch(self, pet_type: str, breeds: List[str], weights: List[float]) -> dict:
+        status, low, high = self.index(pet_type).classify(breeds, weights)
+        known = ~np.isnan(low)
+        low_list = np.where(known, low, None).tolist()
+        high_list = np.where(known, high, None).tolist()
+        counts = np.bincount(status, minlength=len(WEIGHT_STATUSES))
+        return {
+            "results": [
+                {"status": WEIGHT_STATUSES[code], "min_weight": minimum, "max_weight": maximum}
+                for code, minimum, maximum in zip(status.tolist(), low_list, high_list)
+            ],
+            "summary": dict(zip(WEIGHT_STATUSES, counts.tolist())),
+        }
+
+    def snapshot(self) -> dict:
+        breeds = {pet_type: len(index) for pet_type, index in self._indexes.items()}
+        return {"catalog_version": self._version, "breeds": breeds, "sources": dict(self._sources)}
+
+
+# Process-wide weight ranges over the breed catalog
+weight_ranges = WeightRanges()
@@ -0,0 +1,183 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, update, delete, insert, bindparam
+
+# Upper bound on items per batch request; keeps one transaction and its lock footprint bounded
+MAX_BULK_ITEMS = 1000
+
+DUPLICATE_ID = "Duplicate id in batch."
+
+
+def check_batch_size(items: list):
+    """
+    Reject empty or oversized batches before doing any work.
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one item.")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large; at most {MAX_BULK_ITEMS} items are allowed.")
+
+
+def item_result(index: int, id: int = None, error: str = None) -> dict:
+    return {"index": index, "success": error is None, "id": id, "error": error}
+
+
+def summarize(results: List[dict]) -> dict:
+    """
+    Build the bulk response body, ordered like the request.
+    """
+    results = sorted(results, key=lambda result: result["index"])
+    succeeded = sum(1 for result in results if result["success"])
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+def validate_items(items: List[Dict[str, Any]], schema: Type[BaseModel]) -> Tuple[list, list]:
+    """
+    Validate each item on its own so one bad row does not reject the whole batch.
+    - Returns (index, model) pairs for valid items and failure results for the rest.
+    """
+    valid, failures = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            failures.append(item_result(index, error=message))
+    return valid, failures
+
+
+def column_values(model, data: dict) -> dict:
+    """
+    Keep only keys that are columns of the model's table (schemas carry extra, non-persisted fields).
+    """
+    columns = model.__table__.columns.keys()
+    return {key: value for key, value in data.items() if key in columns}
+
+
+async def existing_ids(db, id_column, ids, lock: bool = False) -> set:
+    """
+    Return which of `ids` exist, in a single query.
+    - `lock` takes row locks (FOR UPDATE) so the rows stay in place until the transaction ends.
+    """
+    ids = set(ids)
+    if not ids:
+        return set()
+    statement = select(id_column).where(id_column.in_(ids))
+    if lock:
+        statement = statement.with_for_update()
+    return set((await db.execute(statement)).scalars().all())
+
+
+def first_occurrences(indexed_ids) -> Tuple[list, list]:
+    """
+    Split (index, id) pairs into first occurrences of each id and failure results for repeats.
+    """
+    seen, first, repeats = set(), [], []
+    for index, row_id in indexed_ids:
+        if row_id in seen:
+            repeats.append(item_result(index, id=row_id, error=DUPLICATE_ID))
+        else:
+            seen.add(row_id)
+            first.append(index)
+    return first, repeats
+
+
+async def insert_rows(db, model, rows: List[dict]) -> List[int]:
+    """
+    Multi-row INSERT ... RETURNING id; ids come back in the order of `rows`.
+    """
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list((await db.execute(statement, rows)).scalars().all())
+
+
+async def update_rows(db, model, rows: List[dict], extra_values: Optional[Callable[[dict], dict]] = None):
+    """
+    Executemany UPDATE by primary key.
+    - Rows are grouped by the set of columns they change, one statement per group.
+    - Versioned tables get their row version bumped in the same statement.
+    - `extra_values` maps a group's SET values to further columns to write (e.g. dispatch state of reminders).
+    """
+    table = model.__table__
+    groups: Dict[tuple, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(key for key in row if key != "id")), []).append(row)
+
+    for columns, group in groups.items():
+        if not columns:
+            continue
+        values = {column: bindparam(f"new_{column}") for column in columns}
+        if extra_values:
+            values.update(extra_values(values))
+        if "version" in table.c:
+            values["version"] = table.c.version + 1
+        statement = update(table).where(table.c.id == bindparam("row_id")).values(values)
+        params = [{"row_id": row["id"], **{f"new_{column}": row[column] for column in columns}} for row in group]
+        await db.execute(statement, params)
+
+
+async def delete_rows(db, model, ids: List[int]) -> set:
+    """
+    DELETE ... WHERE id IN (...) RETURNING id; returns the ids that were deleted.
+    """
+    statement = delete(model).where(model.id.in_(set(ids))).returning(model.id)
+    return set((await db.execute(statement)).scalars().all())
+
+
+async def create_many(db, model, valid: list, parent_column, parent_key: str, missing_parent: str) -> list:
+    """
+    Insert validated items whose parent row exists; report the rest as failed.
+    - One query checks all parents, one multi-row INSERT writes all rows.
+    """
+    parents = await existing_ids(db, parent_column, (getattr(item, parent_key) for _, item in valid))
+    results, rows = [], []
+    for index, item in valid:
+        if getattr(item, parent_key) not in parents:
+            results.append(item_result(index, error=missing_parent))
+        else:
+            rows.append((index, column_values(model, item.model_dump())))
+
+    if rows:
+        new_ids = await insert_rows(db, model, [row for _, row in rows])
+        results.extend(item_result(index, id=new_id) for (index, _), new_id in zip(rows, new_ids))
+    return results
+
+
+async def update_many(
+    db, model, valid: list, not_found: str, extra_values: Optional[Callable[[dict], dict]] = None
+) -> list:
+    """
+    Apply validated partial updates to rows that exist; report unknown and repeated ids as failed.
+    - Each item writes only the fields it set: `update_rows` groups items by the columns they change.
+    - The rows are locked first, so every row reported as updated is the one the UPDATE wrote
+      (executemany UPDATE cannot return rows on our dialects).
+    - `extra_values` is passed on to `update_rows`.
+    """
+    first, results = first_occurrences((index, item.id) for index, item in valid)
+    first = set(first)
+    valid = [(index, item) for index, item in valid if index in first]
+    found = await existing_ids(db, model.id, (item.id for _, item in valid), lock=True)
+    rows = []
+    for index, item in valid:
+        if item.id not in found:
+            results.append(item_result(index, error=not_found))
+        else:
+            rows.append(column_values(model, item.model_dump(exclude_unset=True)))
+            results.append(item_result(index, id=item.id))
+
+    if rows:
+        await update_rows(db, model, rows, extra_values)
+    return results
+
+
+async def delete_many(db, model, ids: List[int], not_found: str) -> list:
+    """
+    Delete rows by id in one statement; report ids that matched nothing, and repeated ids, as failed.
+    - Successes come from the ids the DELETE returned.
+    """
+    first, results = first_occurrences(enumerate(ids))
+    deleted = await delete_rows(db, model, ids)
+    results.extend(
+        item_result(index, id=ids[index], error=None if ids[index] in deleted else not_found) for index in first
+    )
+    return results
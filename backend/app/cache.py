@@ -0,0 +1,218 @@
+"""
+Two-tier read-through cache: an in-process LRU in front of Redis.
+
+- Tier 1 is a size-bounded LRU per worker. Its entries also expire after `local_ttl` seconds so
+  a refresh made by another worker is picked up from Redis.
+- Tier 2 is Redis, shared by all workers. Values are stored as JSON envelopes holding the value,
+  or a "not found" marker, and the time they stop being fresh.
+- Fresh entries are served as they are. Stale entries (past `ttl` but within `stale_ttl`) are
+  served at once while one background task reloads them (stale-while-revalidate).
+- A loader raising `NotFound` is cached as a negative entry for `negative_ttl` seconds, so repeated
+  lookups of an unknown key do not reach the upstream either.
+- Concurrent misses and refreshes for a key share one load through `SingleFlight`.
+Redis errors are counted and skipped; the cache then behaves as tier 1 only.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from redis.exceptions import RedisError
+from app.clients import get_redis
+from app.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class NotFound(Exception):
+    """
+    Raised by a loader when the key does not exist upstream; cached as a negative entry.
+    """
+
+
+class LocalCache:
+    """
+    Size-bounded LRU of cache envelopes with a per-entry expiry.
+    """
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        envelope, expires_at = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return envelope
+
+    def set(self, key: str, envelope: dict, ttl: float):
+        self._entries[key] = (envelope, self.clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache:
+    """
+    Read-through cache for one namespace of keys; see the module docstring.
+    - `redis` returns the Redis client (None disables tier 2); `clock` is injectable for tests.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        stale_ttl: float = 0,
+        negative_ttl: float = 0,
+        local_size: int = 1024,
+        local_ttl: float = 60,
+        redis: Optional[Callable[[], Any]] = get_redis,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.local_ttl = local_ttl
+        self.redis = redis
+        self.clock = clock
+        self.local = LocalCache(local_size, clock)
+        self.flight = SingleFlight()
+        self._refreshing: Set[asyncio.Task] = set()
+        self.stats: Dict[str, Dict[str, int]] = {
+            "local": {"hits": 0, "stale": 0, "negative": 0, "misses": 0},
+            "redis": {"hits": 0, "stale": 0, "negative": 0, "misses": 0, "errors": 0},
+            "upstream": {"loads": 0, "not_found": 0, "failed": 0, "refreshes": 0, "failed_refreshes": 0},
+        }
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _envelope(self, value: Any = None, missing: bool = False) -> dict:
+        fresh_for = self.negative_ttl if missing else self.ttl
+        return {"value": value, "missing": missing, "fresh_until": self.clock() + fresh_for}
+
+    def _expires_in(self, envelope: dict) -> float:
+        # Negative entries are never served stale
+        grace = 0 if envelope["missing"] else self.stale_ttl
+        return envelope["fresh_until"] + grace - self.clock()
+
+    async def _redis_get(self, key: str) -> Optional[dict]:
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis().get(self._redis_key(key))
+        except RedisError as e:
+            self.stats["redis"]["errors"] += 1
+            logger.warning(f"Cache tier 2 unavailable, skipping {self.namespace}:{key}: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def _cache_locally(self, key: str, envelope: dict):
+        expires_in = self._expires_in(envelope)
+        # Without tier 2 there is nothing fresher to pick up, so keep the entry as long as it is usable
+        self.local.set(key, envelope, expires_in if self.redis is None else min(self.local_ttl, expires_in))
+
+    async def _store(self, key: str, envelope: dict):
+        self._cache_locally(key, envelope)
+        expires_in = self._expires_in(envelope)
+        if self.redis is None:
+            return
+        try:
+            await self.redis().setex(self._redis_key(key), max(1, int(expires_in)), json.dumps(envelope))
+        except RedisError as e:
+            self.stats["redis"]["errors"] += 1
+            logger.warning(f"Cache tier 2 unavailable, not storing {self.namespace}:{key}: {e}")
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], background: bool = False) -> dict:
+        self.stats["upstream"]["refreshes" if background else "loads"] += 1
+        try:
+            envelope = self._envelope(await loader())
+        except NotFound:
+            self.stats["upstream"]["not_found"] += 1
+            if not self.negative_ttl:
+                raise
+            envelope = self._envelope(missing=True)
+        await self._store(key, envelope)
+        return envelope
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        try:
+            await self.flight.do(key, lambda: self._load(key, loader, background=True))
+        except Exception as e:
+            # Keep serving the stale entry until it expires
+            self.stats["upstream"]["failed_refreshes"] += 1
+            logger.warning(f"Background refresh of {self.namespace}:{key} failed: {e}")
+
+    def _revalidate(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        if key in self.flight:
+            return
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    def _serve(self, tier: str, key: str, envelope: dict, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if envelope["missing"]:
+            self.stats[tier]["negative"] += 1
+            raise NotFound(key)
+        if self.clock() >= envelope["fresh_until"]:
+            self.stats[tier]["stale"] += 1
+            self._revalidate(key, loader)
+        else:
+            self.stats[tier]["hits"] += 1
+        return envelope["value"]
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The cached value of `key`, loading it with `loader` on a miss.
+        - Raises `NotFound` for keys the loader reported missing.
+        """
+        envelope = self.local.get(key)
+        if envelope is not None:
+            return self._serve("local", key, envelope, loader)
+        self.stats["local"]["misses"] += 1
+
+        envelope = await self._redis_get(key)
+        if envelope is not None and self._expires_in(envelope) > 0:
+            self._cache_locally(key, envelope)
+            return self._serve("redis", key, envelope, loader)
+        self.stats["redis"]["misses"] += 1
+
+        try:
+            envelope = await self.flight.do(key, lambda: self._load(key, loader))
+        except NotFound:
+            raise
+        except Exception:
+            self.stats["upstream"]["failed"] += 1
+            raise
+        if envelope["missing"]:
+            raise NotFound(key)
+        return envelope["value"]
+
+    async def wait_for_refreshes(self):
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing, return_exceptions=True)
+
+    def snapshot(self) -> dict:
+        """
+        Counters per tier, plus the share of lookups answered without an upstream load.
+        """
+        requests = sum(self.stats["local"].values())
+        loads = self.stats["upstream"]["loads"]
+        return {
+            "namespace": self.namespace,
+            "local_size": len(self.local),
+            "refreshing": len(self._refreshing),
+            **self.stats,
+            "offload_ratio": round(1 - loads / requests, 4) if requests else None,
+        }
@@ -0,0 +1,52 @@
+"""
+Shared outbound clients: one pooled HTTP client and one Redis connection pool per worker.
+
+Both are created on first use and closed from the app lifespan, so requests reuse open
+connections (and TLS sessions) instead of dialing the upstream APIs or Redis each time.
+"""
+import os
+from typing import Optional
+import httpx
+import redis.asyncio as redis
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", 5))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_redis_client: Optional[redis.Redis] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+def get_redis() -> redis.Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+async def close_clients():
+    global _http_client, _redis_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
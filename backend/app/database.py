@@ -1,14 +1,187 @@
+import os
+import time
+import threading
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from dotenv import load_dotenv
+from app.jobs.base import env_flag
+
+# Load environment variables
+load_dotenv()
 
 # Ensure the correct database URL is used
-DATABASE_URL = "postgresql://user:password@db:5432/pets_db"
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://user:password@db:5432/pets_db")
+
+# "async" serves the routers through asyncpg, "sync" runs the blocking driver in the threadpool.
+# Keeping both lets us compare throughput and tail latency on the same handlers.
+DB_SESSION_MODE = os.getenv("DB_SESSION_MODE", "async").lower()
+if DB_SESSION_MODE not in ("async", "sync"):
+    raise ValueError(f"DB_SESSION_MODE must be 'async' or 'sync', got '{DB_SESSION_MODE}'.")
+
+# Connection pool sizing; size these for the number of workers sharing the database
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # Seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # Seconds before a connection is replaced
+DB_POOL_PRE_PING = env_flag("DB_POOL_PRE_PING", default=True)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # 0 disables the server-side limit
+
+# Optional read replica; safe GET handlers read from it unless the client recently wrote
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+READ_PRIMARY_COOKIE = "pp_read_primary_until"
+
+
+class PoolWaitStats:
+    """
+    Running totals of how long callers waited to check out a connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    def record(self, seconds: float, outcome: str = "ok"):
+        """
+        Count one checkout; `outcome` is "ok", "timeout" (pool exhausted) or "error" (connecting failed).
+        """
+        with self._lock:
+            if outcome == "timeout":
+                self.timeouts += 1
+                return
+            if outcome == "error":
+                self.errors += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.last_wait = seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_errors": self.errors,
+                "wait_ms_avg": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.max_wait * 1000, 3),
+                "wait_ms_last": round(self.last_wait * 1000, 3),
+            }
+
+
+# Wait statistics keyed by pool logging name; survives pool.recreate() on dispose
+pool_wait_stats = {}
+
+
+class _TimedCheckoutMixin:
+    """
+    Times `_do_get`, which is where callers block when the pool is exhausted.
+    - Only an exhausted pool counts as a timeout; failures to connect (refused, auth, DNS) are errors.
+    """
+
+    def _do_get(self):
+        stats = pool_wait_stats.setdefault(self.logging_name, PoolWaitStats())
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            stats.record(time.perf_counter() - start, outcome="timeout")
+            raise
+        except Exception:
+            stats.record(time.perf_counter() - start, outcome="error")
+            raise
+        stats.record(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(name: str, is_async: bool) -> dict:
+    """
+    Build the pool options shared by the sync and async engines.
+    """
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_logging_name": name,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def _async_url(url: str) -> str:
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Create the SQLAlchemy engines with the configured pool
+engine = create_engine(DATABASE_URL, **_engine_options("primary", is_async=False))
+async_engine = create_async_engine(_async_url(DATABASE_URL), **_engine_options("primary-async", is_async=True))
+
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL, **_engine_options("replica", is_async=False))
+    async_replica_engine = create_async_engine(
+        _async_url(DATABASE_REPLICA_URL), **_engine_options("replica-async", is_async=True)
+    )
+else:
+    replica_engine, async_replica_engine = engine, async_engine
+
+
+def pool_status() -> list:
+    """
+    Report live connection counts and checkout wait times for every engine pool.
+    """
+    engines = [engine, async_engine.sync_engine]
+    if DATABASE_REPLICA_URL:
+        engines += [replica_engine, async_replica_engine.sync_engine]
+
+    report = []
+    for db_engine in engines:
+        pool = db_engine.pool
+        stats = pool_wait_stats.get(pool.logging_name) or PoolWaitStats()
+        report.append({
+            "pool": pool.logging_name,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": DB_MAX_OVERFLOW,
+            **stats.snapshot(),
+        })
+    return report
 
-# Create the SQLAlchemy engine without SQLite-specific options
-engine = create_engine(DATABASE_URL)
 
 # Configure session handling
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+AsyncReplicaSessionLocal = async_sessionmaker(bind=async_replica_engine, autoflush=False, expire_on_commit=False)
 
 # Declare the base class for models
 Base = declarative_base()
@@ -20,3 +193,135 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency function for async database sessions
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+class ThreadpoolSession:
+    """
+    Awaitable facade over a blocking `Session`.
+    - Exposes the subset of the `AsyncSession` API used by the routers.
+    - Every database call is pushed to Starlette's threadpool, like a sync `def` handler would be.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    def expunge_all(self):
+        self.sync_session.expunge_all()
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def connection(self, **kwargs):
+        return await run_in_threadpool(self.sync_session.connection, **kwargs)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+@asynccontextmanager
+async def session_scope(read_only: bool = False):
+    """
+    Open a session for the configured DB_SESSION_MODE.
+    - `read_only` sessions are bound to the replica when one is configured.
+    - Usable outside of request handling (background jobs, scripts).
+    """
+    if DB_SESSION_MODE == "sync":
+        factory = ReplicaSessionLocal if read_only else SessionLocal
+        db = ThreadpoolSession(factory(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
+    else:
+        factory = AsyncReplicaSessionLocal if read_only else AsyncSessionLocal
+        async with factory() as db:
+            yield db
+
+
+@asynccontextmanager
+async def snapshot_scope(read_only: bool = False):
+    """
+    Like `session_scope`, but every read of the session sees one snapshot of the database.
+    - PostgreSQL: a REPEATABLE READ transaction. SQLite read transactions are snapshots already.
+    - For responses derived from several queries, e.g. an ETag and the body it describes.
+    """
+    async with session_scope(read_only=read_only) as db:
+        if engine.dialect.name == "postgresql":
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        yield db
+
+
+# Dependency used by the CRUD routers; honours DB_SESSION_MODE
+async def get_session():
+    async with session_scope() as db:
+        yield db
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """
+    True while the client is inside its read-your-writes window.
+    """
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def pin_to_primary(response: Response):
+    """
+    Route this client's reads to the primary for READ_YOUR_WRITES_SECONDS.
+    """
+    if READ_YOUR_WRITES_SECONDS > 0:
+        until = time.time() + READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, f"{until:.3f}", max_age=READ_YOUR_WRITES_SECONDS, httponly=True, samesite="lax"
+        )
+
+
+def use_replica(request: Request) -> bool:
+    """
+    True if this request's reads may go to the replica.
+    """
+    return bool(DATABASE_REPLICA_URL) and not is_pinned_to_primary(request)
+
+
+# Dependency for safe GET handlers; reads from the replica unless the client recently wrote
+async def get_read_session(request: Request):
+    async with session_scope(read_only=use_replica(request)) as db:
+        yield db
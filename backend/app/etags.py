@@ -0,0 +1,102 @@
+import hashlib
+from typing import Iterable, List, Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+
+
+def resource_etag(kind: str, resource_id: int, version: int) -> str:
+    """
+    Strong ETag for a single versioned row, e.g. "pet-12-v3".
+    """
+    return f'"{kind}-{resource_id}-v{version}"'
+
+
+def collection_etag(kind: str, rows: Iterable) -> str:
+    """
+    Strong ETag for a list response, derived from the (table, id, version) of every row in it.
+    """
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(f"{row.__tablename__}:{row.id}:{row.version};".encode())
+    return f'"{kind}-{digest.hexdigest()[:20]}"'
+
+
+def page_etag(kind: str, page: dict, limit: int) -> str:
+    """
+    Strong ETag for a keyset page: its rows plus `next_cursor` and the page size.
+    - A full last page gains a `next_cursor` when rows are added after it, with the same items.
+    """
+    return collection_etag(f"{kind}-{limit}-{page['next_cursor'] or ''}", page["items"])
+
+
+def state_etag(kind: str, *state) -> str:
+    """
+    Strong ETag for a response derived from an aggregate summary of its rows (counts, version sums).
+    """
+    digest = hashlib.sha1(repr(state).encode()).hexdigest()[:20]
+    return f'"{kind}-{digest}"'
+
+
+def _parse(header: str, allow_weak: bool) -> List[str]:
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            if not allow_weak:
+                continue
+            tag = tag[2:]
+        tags.append(tag)
+    return tags
+
+
+def is_not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True when If-None-Match names the current ETag (weak comparison, as RFC 9110 requires).
+    """
+    if not if_none_match:
+        return False
+    tags = _parse(if_none_match, allow_weak=True)
+    return "*" in tags or etag in tags
+
+
+def conditional_response(if_none_match: Optional[str], etag: str, response: Response) -> Optional[Response]:
+    """
+    Return a 304 response if the client already has this representation.
+    - Otherwise sets the ETag header on the outgoing response and returns None.
+    """
+    if is_not_modified(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+
+def if_match_versions(if_match: Optional[str], kind: str, resource_id: int) -> Optional[List[int]]:
+    """
+    Versions a conditional write may apply to, taken from If-Match.
+    - None means unconditional (header absent or "*").
+    - Raises 412 if no listed ETag can refer to this resource.
+    """
+    if not if_match:
+        return None
+    tags = _parse(if_match, allow_weak=False)
+    if "*" in tags:
+        return None
+
+    prefix, versions = f'"{kind}-{resource_id}-v', []
+    for tag in tags:
+        number = tag[len(prefix):-1]
+        if tag.startswith(prefix) and tag.endswith('"') and number.isdigit():
+            versions.append(int(number))
+    if not versions:
+        raise HTTPException(status_code=412, detail="Precondition failed: the resource has been modified.")
+    return versions
+
+
+async def write_conflict(db, model, criteria: list, versions: Optional[List[int]], not_found: str) -> HTTPException:
+    """
+    Explain why a (conditional) UPDATE matched no row.
+    - 412 if the row exists but at another version, 404 otherwise.
+    """
+    if versions and await db.scalar(select(model.id).where(*criteria)) is not None:
+        return HTTPException(status_code=412, detail="Precondition failed: the resource has been modified.")
+    return HTTPException(status_code=404, detail=not_found)
@@ -0,0 +1,178 @@
+"""
+iCalendar (RFC 5545) serialization for reminders and treatments.
+
+Events are serialized by hand rather than through `ics.Calendar`: a feed is a header,
+one VEVENT fragment per row and a footer, so it can be streamed while rows are still
+being read. Fragments are cached by (kind, id, row version, pet version); any write
+bumps a version, so a changed row is never served from the cache.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from app.recurrence import reminder_anchor
+
+ICS_FRAGMENT_CACHE_SIZE = int(os.getenv("ICS_FRAGMENT_CACHE_SIZE", 50_000))
+
+PRODID = "-//Pawfect Planner//Calendar Feed//EN"
+UID_DOMAIN = "pawfectplanner"
+CALENDAR_FOOTER = b"END:VCALENDAR\r\n"
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+_MAX_LINE_OCTETS = 75
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU of serialized VEVENT fragments.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return fragment
+
+    def put(self, key, fragment: bytes):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+fragment_cache = FragmentCache(ICS_FRAGMENT_CACHE_SIZE)
+
+
+def escape_text(value: str) -> str:
+    """
+    Escape a TEXT property value (RFC 5545 section 3.3.11).
+    """
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "")
+    )
+
+
+def fold(line: str) -> str:
+    """
+    Fold a content line to at most 75 octets per physical line, never splitting a UTF-8 character.
+    """
+    encoded = line.encode("utf-8")
+    if len(encoded) <= _MAX_LINE_OCTETS:
+        return line + "\r\n"
+
+    parts, current, size, limit = [], [], 0, _MAX_LINE_OCTETS
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > limit:
+            parts.append("".join(current))
+            current, size, limit = [], 0, _MAX_LINE_OCTETS - 1  # Continuation lines start with a space
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _stamp(moment: Optional[datetime]) -> str:
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def calendar_header(name: str) -> bytes:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ]
+    return "".join(fold(line) for line in lines).encode("utf-8")
+
+
+def vevent(
+    uid: str, summary: str, description: Optional[str], day: date, stamp: Optional[datetime], sequence: int,
+    rrule: Optional[str] = None,
+) -> bytes:
+    """
+    Serialize one all-day VEVENT.
+    - SEQUENCE follows the row version so clients replace their copy after an edit.
+    - `rrule` makes the event recur from `day`; the calendar client expands it.
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_stamp(stamp)}",
+        f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}",
+        f"SEQUENCE:{sequence}",
+        f"SUMMARY:{escape_text(summary)}",
+    ]
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines).encode("utf-8")
+
+
+def _summary(title: str, pet_name: Optional[str]) -> str:
+    return f"{pet_name}: {title}" if pet_name else title
+
+
+def reminder_event(reminder, pet_name: Optional[str] = None, pet_version: int = 0) -> bytes:
+    """
+    Recurring reminders become one recurring event starting at the series anchor.
+    """
+    key = ("reminder", reminder.id, reminder.version, pet_version)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        fragment = vevent(
+            f"reminder-{reminder.id}@{UID_DOMAIN}", _summary(reminder.title, pet_name), reminder.description,
+            reminder_anchor(reminder), reminder.updated_at, reminder.version - 1, rrule=reminder.recurrence,
+        )
+        fragment_cache.put(key, fragment)
+    return fragment
+
+
+def treatment_event(
+    treatment, pet_name: Optional[str] = None, pet_version: int = 0, day: Optional[date] = None
+) -> bytes:
+    """
+    Treatments are placed on their next due date; `day` overrides it for undated single exports.
+    """
+    day = day or treatment.next_due_date
+    key = ("treatment", treatment.id, treatment.version, pet_version, day)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        details = [treatment.description, f"Frequency: {treatment.frequency}" if treatment.frequency else None]
+        fragment = vevent(
+            f"treatment-{treatment.id}@{UID_DOMAIN}", _summary(treatment.name, pet_name),
+            "\n".join(part for part in details if part) or None,
+            day, treatment.updated_at, treatment.version - 1,
+        )
+        fragment_cache.put(key, fragment)
+    return fragment
+
+
+def single_event_calendar(name: str, fragment: bytes) -> bytes:
+    return calendar_header(name) + fragment + CALENDAR_FOOTER
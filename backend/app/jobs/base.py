@@ -0,0 +1,97 @@
+"""
+Shared lifecycle of the background jobs in this package.
+
+A job runs in the app lifespan of each worker process: `start` schedules it on the event loop,
+`run_once` does one unit of work, repeated every `interval_seconds` until `stop` (or only once
+when the interval is None). A failing run is logged and counted, and the job carries on.
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """
+    Boolean setting from the environment: "1", "true" or "yes" (any case) enable it.
+    """
+    return os.getenv(name, "true" if default else "false").lower() in ("1", "true", "yes")
+
+
+class BackgroundJob:
+    """
+    Start/stop scaffolding around `run_once`; see the module docstring.
+    - `stats` holds the job's counters; failed runs are counted under `failure_stat`.
+    """
+
+    name = "Background job"
+    failure_stat = "failed"
+
+    def __init__(self, interval_seconds: Optional[float], enabled: bool = False):
+        self.interval_seconds = interval_seconds
+        self.enabled = enabled
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self.stats = {self.failure_stat: 0}
+
+    async def run_once(self):
+        raise NotImplementedError
+
+    def sleep_seconds(self) -> float:
+        """
+        Pause before the next run; jobs with their own timing (e.g. the next due reminder) override it.
+        """
+        return self.interval_seconds
+
+    async def on_stop(self):
+        """
+        Called once the loop has ended, e.g. to hand back held work.
+        """
+
+    async def run(self):
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception:
+                self.stats[self.failure_stat] += 1
+                logger.exception(f"{self.name} failed")
+            if self.interval_seconds is None:
+                break
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.sleep_seconds())
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+        logger.info(f"{self.name} started")
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._stopping.set()
+        if self.interval_seconds is None:
+            # A one-off run does not check for the stop signal; do not hold up shutdown for it
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.on_stop()
+        logger.info(f"{self.name} stopped")
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            **self.stats,
+        }
@@ -0,0 +1,158 @@
+"""
+Startup warm-up of the breed cache.
+
+Once per worker start, the most common breeds of existing pets (`queries.most_common_breeds`)
+are looked up through the breed route's lookup, so their answers, including "not found", sit in
+the breed cache before the first user asks. Lookups run with bounded concurrency so the breed
+APIs are not flooded, and the whole warm-up is bounded by a timeout; a failed or timed-out
+lookup is simply loaded on first use later. With BREED_WARMUP_BLOCKS_READINESS set, `/ready`
+reports 503 until the warm-up has finished.
+
+Pet types the local breed catalog has loaded are skipped: their lookups are answered from the
+catalog and never reach the breed cache.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from fastapi import HTTPException
+from app.breeds.catalog import BreedCatalog, catalog as breed_catalog
+from app.database import session_scope
+from app.jobs.base import BackgroundJob, env_flag
+from app.queries import most_common_breeds
+from app.routes.breeds import BREED_SEARCH_URLS, lookup_breed
+
+logger = logging.getLogger(__name__)
+
+BREED_WARMUP_ENABLED = env_flag("BREED_WARMUP_ENABLED")
+BREED_WARMUP_LIMIT = int(os.getenv("BREED_WARMUP_LIMIT", 200))  # Distinct (type, breed) pairs to warm
+BREED_WARMUP_CONCURRENCY = int(os.getenv("BREED_WARMUP_CONCURRENCY", 8))
+BREED_WARMUP_TIMEOUT_SECONDS = float(os.getenv("BREED_WARMUP_TIMEOUT_SECONDS", 60))
+BREED_WARMUP_BLOCKS_READINESS = env_flag("BREED_WARMUP_BLOCKS_READINESS")
+
+
+class BreedCacheWarmup(BackgroundJob):
+    """
+    Warms the breed cache once for one worker process.
+    - `session_factory`, `lookup` and `catalog` are injectable for tests.
+    """
+
+    name = "Breed cache warm-up"
+
+    def __init__(
+        self,
+        session_factory=session_scope,
+        lookup: Callable[[str, str], Awaitable[dict]] = lookup_breed,
+        limit: int = BREED_WARMUP_LIMIT,
+        concurrency: int = BREED_WARMUP_CONCURRENCY,
+        timeout_seconds: float = BREED_WARMUP_TIMEOUT_SECONDS,
+        blocks_readiness: bool = BREED_WARMUP_BLOCKS_READINESS,
+        catalog: BreedCatalog = breed_catalog,
+    ):
+        super().__init__(interval_seconds=None, enabled=BREED_WARMUP_ENABLED)
+        self.session_factory = session_factory
+        self.lookup = lookup
+        self.limit = limit
+        self.concurrency = concurrency
+        self.timeout_seconds = timeout_seconds
+        self.blocks_readiness = blocks_readiness
+        self.catalog = catalog
+        self.finished = False
+        self.last_run: Optional[dict] = None
+
+    @property
+    def ready(self) -> bool:
+        # Only a started warm-up holds readiness back; a failed one still counts as finished
+        return self.finished or not self.blocks_readiness or self._task is None
+
+    async def warm_up(self) -> dict:
+        """
+        Look up the most common breeds of existing pets once, for the pet types served through the breed cache.
+        - `coverage` is the share of those pets with a breed whose lookup is now cached.
+        - `skipped_pet_types` are answered from the breed catalog, so there is nothing to warm for them.
+        """
+        start = time.perf_counter()
+        skipped = [pet_type for pet_type in BREED_SEARCH_URLS if self.catalog.has(pet_type)]
+        pet_types = [pet_type for pet_type in BREED_SEARCH_URLS if pet_type not in skipped]
+        rows = []
+        if pet_types:
+            async with self.session_factory(read_only=True) as db:
+                rows = (await db.execute(most_common_breeds(pet_types, self.limit))).all()
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        counts = {"warmed": 0, "not_found": 0, "failed": 0, "skipped": 0}
+        covered_pets = 0
+
+        async def warm(row):
+            nonlocal covered_pets
+            async with semaphore:
+                if self.catalog.has(row.type):
+                    # Loaded into the catalog meanwhile; the lookup would not touch the cache
+                    counts["skipped"] += 1
+                    return
+                try:
+                    await self.lookup(row.type, row.breed)
+                    counts["warmed"] += 1
+                except HTTPException as e:
+                    if e.status_code != 404:
+                        counts["failed"] += 1
+                        return
+                    # Cached as a negative entry
+                    counts["not_found"] += 1
+                except Exception as e:
+                    counts["failed"] += 1
+                    logger.debug(f"Warm-up lookup of {row.type} breed {row.breed!r} failed: {e}")
+                    return
+                covered_pets += row.pets
+
+        timed_out = False
+        try:
+            async with asyncio.timeout(self.timeout_seconds):
+                await asyncio.gather(*(warm(row) for row in rows))
+        except TimeoutError:
+            timed_out = True
+
+        total_pets = rows[0].total if rows else 0
+        result = {
+            "ran_at": datetime.now(timezone.utc).isoformat(),
+            "pet_types": pet_types,
+            "skipped_pet_types": skipped,
+            "breeds": len(rows),
+            **counts,
+            "timed_out": timed_out,
+            "pets": total_pets,
+            "coverage": round(covered_pets / total_pets, 4) if total_pets else None,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        self.last_run = result
+        logger.info(
+            f"Warmed the breed cache in {result['duration_ms']} ms: {counts['warmed'] + counts['not_found']} "
+            f"of {len(rows)} breeds, {result['coverage']} of pets covered, timed out: {timed_out}"
+        )
+        return result
+
+    async def run_once(self):
+        try:
+            await self.warm_up()
+        finally:
+            self.finished = True
+
+    def start(self):
+        self.finished = False
+        super().start()
+
+    def snapshot(self) -> dict:
+        return {
+            **super().snapshot(),
+            "finished": self.finished,
+            "ready": self.ready,
+            "limit": self.limit,
+            "concurrency": self.concurrency,
+            "last_run": self.last_run,
+        }
+
+
+# Process-wide job, started from the app lifespan when BREED_WARMUP_ENABLED is set
+breed_warmup = BreedCacheWarmup()
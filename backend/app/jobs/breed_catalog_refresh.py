@@ -0,0 +1,61 @@
+"""
+Periodic refresh of the local breed catalog.
+
+Each run re-fetches the Dog API and Cat API breed lists with conditional requests
+(`BreedCatalog.refresh`); an unchanged list costs a 304 and no index rebuild, and a failed
+fetch keeps serving the current index.
+"""
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from app.breeds.catalog import BreedCatalog, catalog as breed_catalog
+from app.jobs.base import BackgroundJob, env_flag
+
+logger = logging.getLogger(__name__)
+
+BREED_CATALOG_REFRESH_ENABLED = env_flag("BREED_CATALOG_REFRESH_ENABLED")
+BREED_CATALOG_REFRESH_INTERVAL_SECONDS = float(os.getenv("BREED_CATALOG_REFRESH_INTERVAL_SECONDS", 6 * 3600))
+
+
+class BreedCatalogRefresh(BackgroundJob):
+    """
+    Refreshes the breed catalog on a fixed interval for one worker process.
+    """
+
+    name = "Breed catalog refresh"
+
+    def __init__(
+        self,
+        catalog: BreedCatalog = breed_catalog,
+        interval_seconds: float = BREED_CATALOG_REFRESH_INTERVAL_SECONDS,
+    ):
+        super().__init__(interval_seconds, enabled=BREED_CATALOG_REFRESH_ENABLED)
+        self.catalog = catalog
+
+        self.stats.update(runs=0)
+        self.last_run: Optional[dict] = None
+
+    async def refresh(self) -> dict:
+        start = time.perf_counter()
+        changed = await self.catalog.refresh()
+        result = {
+            "ran_at": datetime.now(timezone.utc).isoformat(),
+            "changed": changed,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        self.stats["runs"] += 1
+        self.last_run = result
+        logger.info(f"Refreshed the breed catalog in {result['duration_ms']} ms, changed: {changed}")
+        return result
+
+    async def run_once(self):
+        await self.refresh()
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "last_run": self.last_run}
+
+
+# Process-wide job, started from the app lifespan when BREED_CATALOG_REFRESH_ENABLED is set
+breed_refresh = BreedCatalogRefresh()
@@ -0,0 +1,296 @@
+"""
+Background dispatch of due reminders.
+
+Each worker claims the reminders coming due in the next look-ahead window in batches
+(`queries.claim_due_reminders`), keeps them in an in-memory heap ordered by fire time and
+runs the registered hooks when they come due. Delivery is at-least-once:
+- A claim is a lease; if a worker dies, its reminders are claimed again once the lease expires.
+- `notified_at` is only set after every hook succeeded, so a failed or interrupted delivery is retried.
+- A reminder edited while held (new date or version) is not acknowledged but handed back and claimed
+  again as it is now.
+Recurring reminders are never marked notified; their `due_date` moves on to the next occurrence instead.
+"""
+import asyncio
+import heapq
+import inspect
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional, Union
+from sqlalchemy import update, bindparam, tuple_
+from app.database import session_scope
+from app.jobs.base import BackgroundJob, env_flag
+from app.models import Reminder
+from app.queries import claim_due_reminders
+from app.recurrence import parse_recurrence, next_occurrence, reminder_anchor
+
+logger = logging.getLogger(__name__)
+
+REMINDER_DISPATCH_ENABLED = env_flag("REMINDER_DISPATCH_ENABLED")
+REMINDER_DISPATCH_INTERVAL_SECONDS = float(os.getenv("REMINDER_DISPATCH_INTERVAL_SECONDS", 30))
+REMINDER_DISPATCH_LOOKAHEAD_SECONDS = int(os.getenv("REMINDER_DISPATCH_LOOKAHEAD_SECONDS", 3600))
+REMINDER_DISPATCH_LEASE_SECONDS = int(os.getenv("REMINDER_DISPATCH_LEASE_SECONDS", 300))
+REMINDER_DISPATCH_BATCH_SIZE = int(os.getenv("REMINDER_DISPATCH_BATCH_SIZE", 500))
+REMINDER_DISPATCH_MAX_PENDING = int(os.getenv("REMINDER_DISPATCH_MAX_PENDING", 10_000))  # Cap on the in-memory heap
+
+
+@dataclass(order=True)
+class DueReminder:
+    fire_at: datetime
+    id: int
+    pet_id: int = field(compare=False)
+    title: str = field(compare=False)
+    description: Optional[str] = field(compare=False)
+    due_date: date = field(compare=False)
+    version: int = field(compare=False)
+    recurrence: Optional[str] = field(default=None, compare=False)
+    recurrence_start: Optional[date] = field(default=None, compare=False)
+
+
+Hook = Callable[[DueReminder], Union[None, Awaitable[None]]]
+
+# Notification hooks, called once per due reminder (sync or async callables)
+notification_hooks: List[Hook] = []
+
+
+def register_hook(hook: Hook) -> Hook:
+    """
+    Register a notification hook; usable as a decorator.
+    """
+    notification_hooks.append(hook)
+    return hook
+
+
+@register_hook
+def log_due_reminder(reminder: DueReminder):
+    logger.info(f"Reminder {reminder.id} for pet {reminder.pet_id} is due: {reminder.title}")
+
+
+def fire_time(due_date: date) -> datetime:
+    """
+    Reminders carry a date only; they fire at the start of that day (UTC).
+    """
+    return datetime.combine(due_date, dt_time.min, tzinfo=timezone.utc)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class ReminderDispatcher(BackgroundJob):
+    """
+    Claims, schedules and fires due reminders for one worker process.
+    - `session_factory` and `clock` are injectable for tests.
+    - `failed` counts failed deliveries; failed ticks are counted under `failed_ticks`.
+    """
+
+    failure_stat = "failed_ticks"
+
+    def __init__(
+        self,
+        hooks: Optional[List[Hook]] = None,
+        session_factory=session_scope,
+        clock: Callable[[], datetime] = _utcnow,
+        worker_id: Optional[str] = None,
+        batch_size: int = REMINDER_DISPATCH_BATCH_SIZE,
+        lookahead_seconds: int = REMINDER_DISPATCH_LOOKAHEAD_SECONDS,
+        lease_seconds: int = REMINDER_DISPATCH_LEASE_SECONDS,
+        interval_seconds: float = REMINDER_DISPATCH_INTERVAL_SECONDS,
+        max_pending: int = REMINDER_DISPATCH_MAX_PENDING,
+    ):
+        super().__init__(interval_seconds, enabled=REMINDER_DISPATCH_ENABLED)
+        self.hooks = notification_hooks if hooks is None else hooks
+        self.session_factory = session_factory
+        self.clock = clock
+        self.worker_id = worker_id or _worker_id()
+        self.name = f"Reminder dispatcher {self.worker_id}"
+        self.batch_size = batch_size
+        self.lookahead = timedelta(seconds=lookahead_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.max_pending = max_pending
+
+        self._heap: List[DueReminder] = []
+        self._held = set()
+        self.stats.update(claimed=0, fired=0, failed=0, acknowledged=0, requeued=0, released=0, ticks=0)
+        self.last_tick_ms = 0.0
+
+    async def claim(self, now: datetime) -> int:
+        """
+        Claim the next batch of reminders due before the look-ahead horizon.
+        - The lease runs until the horizon plus the lease length, so it outlives the wait until firing.
+        """
+        horizon = now + self.lookahead
+        limit = min(self.batch_size, self.max_pending - len(self._heap))
+        statement = claim_due_reminders(self.worker_id, now, horizon.date(), horizon + self.lease, limit)
+        async with self.session_factory() as db:
+            rows = (await db.execute(statement)).all()
+            await db.commit()
+
+        for row in rows:
+            if row.id in self._held:
+                continue
+            self._held.add(row.id)
+            heapq.heappush(self._heap, DueReminder(fire_at=fire_time(row.due_date), **row._mapping))
+        self.stats["claimed"] += len(rows)
+        return len(rows)
+
+    async def _deliver(self, reminder: DueReminder) -> bool:
+        try:
+            for hook in self.hooks:
+                result = hook(reminder)
+                if inspect.isawaitable(result):
+                    await result
+            return True
+        except Exception:
+            logger.exception(f"Notification hook failed for reminder {reminder.id}; retried once its lease expires")
+            return False
+
+    async def fire_due(self, now: datetime) -> int:
+        """
+        Run the hooks for every held reminder whose fire time has passed, then acknowledge them.
+        - Only rows still claimed by this worker are acknowledged.
+        """
+        due = []
+        while self._heap and self._heap[0].fire_at <= now:
+            reminder = heapq.heappop(self._heap)
+            self._held.discard(reminder.id)
+            due.append(reminder)
+        if not due:
+            return 0
+
+        delivered = await asyncio.gather(*(self._deliver(reminder) for reminder in due))
+        fired = [reminder for reminder, ok in zip(due, delivered) if ok]
+        self.stats["fired"] += len(fired)
+        self.stats["failed"] += len(due) - len(fired)
+        if fired:
+            await self.acknowledge(fired, now)
+        return len(fired)
+
+    async def acknowledge(self, fired: List[DueReminder], now: datetime):
+        """
+        Mark one-off reminders notified and move recurring ones on to their next occurrence.
+        - Only rows still claimed by this worker, at the due date and version that were claimed, are touched.
+        - Rows edited since the claim are handed back instead, to be claimed again with their current schedule.
+        """
+        one_off = [(reminder.id, reminder.due_date, reminder.version) for reminder in fired if not reminder.recurrence]
+        advanced = [
+            {
+                "row_id": reminder.id,
+                "claimed_due": reminder.due_date,
+                "claimed_version": reminder.version,
+                # Occurrences missed while no dispatcher was running are skipped, not replayed
+                "next_due": next_occurrence(
+                    reminder_anchor(reminder), parse_recurrence(reminder.recurrence), max(reminder.due_date, now.date())
+                ),
+            }
+            for reminder in fired if reminder.recurrence
+        ]
+
+        acknowledged = 0
+        async with self.session_factory() as db:
+            if one_off:
+                statement = (
+                    update(Reminder)
+                    .where(
+                        tuple_(Reminder.id, Reminder.due_date, Reminder.version).in_(one_off),
+                        Reminder.claimed_by == self.worker_id,
+                    )
+                    .values(notified_at=now, claimed_by=None, claim_expires_at=None, updated_at=Reminder.updated_at)
+                    .returning(Reminder.id)
+                    .execution_options(synchronize_session=False)
+                )
+                acknowledged += len((await db.execute(statement)).scalars().all())
+            if advanced:
+                table = Reminder.__table__
+                statement = (
+                    update(table)
+                    .where(
+                        table.c.id == bindparam("row_id"),
+                        table.c.due_date == bindparam("claimed_due"),
+                        table.c.version == bindparam("claimed_version"),
+                        table.c.claimed_by == self.worker_id,
+                    )
+                    .values(
+                        due_date=bindparam("next_due"), claimed_by=None, claim_expires_at=None,
+                        version=table.c.version + 1,
+                    )
+                )
+                result = await db.execute(statement, advanced)
+                acknowledged += result.rowcount if result.rowcount >= 0 else len(advanced)
+            # Acknowledged rows are no longer claimed; whatever this worker still holds changed meanwhile
+            statement = (
+                update(Reminder)
+                .where(Reminder.id.in_([reminder.id for reminder in fired]), Reminder.claimed_by == self.worker_id)
+                .values(claimed_by=None, claim_expires_at=None, updated_at=Reminder.updated_at)
+                .returning(Reminder.id)
+                .execution_options(synchronize_session=False)
+            )
+            requeued = (await db.execute(statement)).scalars().all()
+            await db.commit()
+        if requeued:
+            logger.info(f"Reminders {requeued} changed after they were claimed; handed back to be claimed again")
+        self.stats["acknowledged"] += acknowledged
+        self.stats["requeued"] += len(requeued)
+
+    async def tick(self):
+        """
+        One scheduling step: top up the heap from the database, then fire what is due.
+        """
+        start = time.perf_counter()
+        now = self.clock()
+        if len(self._heap) < self.max_pending:
+            await self.claim(now)
+        await self.fire_due(now)
+        self.stats["ticks"] += 1
+        self.last_tick_ms = (time.perf_counter() - start) * 1000
+
+    async def release(self):
+        """
+        Hand back reminders claimed but not yet fired, so another worker can pick them up at once.
+        """
+        statement = (
+            update(Reminder)
+            .where(Reminder.claimed_by == self.worker_id, Reminder.notified_at.is_(None))
+            .values(claimed_by=None, claim_expires_at=None, updated_at=Reminder.updated_at)
+            .returning(Reminder.id)
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_factory() as db:
+            released = (await db.execute(statement)).scalars().all()
+            await db.commit()
+        self.stats["released"] += len(released)
+        self._heap.clear()
+        self._held.clear()
+
+    async def run_once(self):
+        await self.tick()
+
+    def sleep_seconds(self) -> float:
+        if self._heap:
+            until_next = (self._heap[0].fire_at - self.clock()).total_seconds()
+            return max(0.0, min(self.interval_seconds, until_next))
+        return self.interval_seconds
+
+    async def on_stop(self):
+        await self.release()
+
+    def snapshot(self) -> dict:
+        return {
+            **super().snapshot(),
+            "worker_id": self.worker_id,
+            "pending": len(self._heap),
+            "next_fire_at": self._heap[0].fire_at.isoformat() if self._heap else None,
+            "last_tick_ms": round(self.last_tick_ms, 3),
+        }
+
+
+# Process-wide dispatcher, started from the app lifespan when REMINDER_DISPATCH_ENABLED is set
+dispatcher = ReminderDispatcher()
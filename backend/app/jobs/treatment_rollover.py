@@ -0,0 +1,83 @@
+"""
+Periodic rollover of overdue treatments to their next due date.
+
+Each run advances every treatment whose `next_due_date` has passed to its next occurrence
+with one set-based UPDATE per interval class (`queries.roll_over_treatments_by_days` and
+`queries.roll_over_treatments_by_months`); no rows are loaded into Python. Several workers
+may run it at once: a row advanced by one run no longer matches the other's filter.
+"""
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from app.database import session_scope
+from app.jobs.base import BackgroundJob, env_flag
+from app.queries import roll_over_treatments_by_days, roll_over_treatments_by_months
+
+logger = logging.getLogger(__name__)
+
+TREATMENT_ROLLOVER_ENABLED = env_flag("TREATMENT_ROLLOVER_ENABLED")
+TREATMENT_ROLLOVER_INTERVAL_SECONDS = float(os.getenv("TREATMENT_ROLLOVER_INTERVAL_SECONDS", 3600))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TreatmentRollover(BackgroundJob):
+    """
+    Runs the rollover statements on a fixed interval for one worker process.
+    - `session_factory` and `clock` are injectable for tests.
+    """
+
+    name = "Treatment rollover"
+
+    def __init__(
+        self,
+        session_factory=session_scope,
+        clock: Callable[[], datetime] = _utcnow,
+        interval_seconds: float = TREATMENT_ROLLOVER_INTERVAL_SECONDS,
+    ):
+        super().__init__(interval_seconds, enabled=TREATMENT_ROLLOVER_ENABLED)
+        self.session_factory = session_factory
+        self.clock = clock
+
+        self.stats.update(runs=0, advanced=0)
+        self.last_run: Optional[dict] = None
+
+    async def roll_over(self) -> dict:
+        """
+        Advance all overdue treatments in one transaction.
+        - Returns the rows advanced per interval class and the time taken.
+        """
+        start = time.perf_counter()
+        now = self.clock()
+        today = now.date()
+        async with self.session_factory() as db:
+            by_days = (await db.execute(roll_over_treatments_by_days(today))).rowcount
+            by_months = (await db.execute(roll_over_treatments_by_months(today))).rowcount
+            await db.commit()
+
+        result = {
+            "ran_at": now.isoformat(),
+            "advanced": by_days + by_months,
+            "advanced_by_days": by_days,
+            "advanced_by_months": by_months,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        self.stats["runs"] += 1
+        self.stats["advanced"] += result["advanced"]
+        self.last_run = result
+        logger.info(f"Advanced {result['advanced']} overdue treatments in {result['duration_ms']} ms")
+        return result
+
+    async def run_once(self):
+        await self.roll_over()
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "last_run": self.last_run}
+
+
+# Process-wide job, started from the app lifespan when TREATMENT_ROLLOVER_ENABLED is set
+rollover = TreatmentRollover()
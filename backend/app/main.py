@@ -1,21 +1,78 @@
-from fastapi import FastAPI
-from app.database import engine, Base
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from app.database import engine, async_engine, replica_engine, async_replica_engine, Base, pin_to_primary
+from app.migrations import run_migrations
+from app.clients import close_clients
+from app.jobs.reminder_dispatch import dispatcher, REMINDER_DISPATCH_ENABLED
+from app.jobs.treatment_rollover import rollover, TREATMENT_ROLLOVER_ENABLED
+from app.jobs.breed_catalog_refresh import breed_refresh, BREED_CATALOG_REFRESH_ENABLED
+from app.jobs.breed_cache_warmup import breed_warmup, BREED_WARMUP_ENABLED
 from app.routes.pets import router as pets_router
 from app.routes.reminders import router as reminders_router
 from app.routes.treatments import router as treatments_router
 from app.routes.breeds import router as breeds_router
+from app.routes.metrics import router as metrics_router
+from app.routes.calendar import router as calendar_router
+from app.routes.healthcheck import router as healthcheck_router
+from app.vaccines.vaccines import router as vaccines_router
+from app.vaccines.catalog import catalog as vaccine_catalog
+from app.breeds.catalog import catalog as breed_catalog
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    vaccine_catalog.load()
+    breed_catalog.load_snapshot()
+    if REMINDER_DISPATCH_ENABLED:
+        dispatcher.start()
+    if TREATMENT_ROLLOVER_ENABLED:
+        rollover.start()
+    if BREED_CATALOG_REFRESH_ENABLED:
+        breed_refresh.start()
+    if BREED_WARMUP_ENABLED:
+        breed_warmup.start()
+    yield
+    await breed_warmup.stop()
+    await dispatcher.stop()
+    await rollover.stop()
+    await breed_refresh.stop()
+    await close_clients()
+    # Release pooled connections on shutdown
+    await async_engine.dispose()
+    await async_replica_engine.dispose()
+    engine.dispose()
+    replica_engine.dispose()
+
 
 # Initialize FastAPI app
-app = FastAPI(title="Pawfect Planner API", version="1.0.0")
+# Keep the default response class: for routes with a response_model FastAPI then serializes straight to JSON bytes
+# in pydantic-core. A custom class such as ORJSONResponse forces the slower dict + encoder path (see benchmarks/).
+app = FastAPI(title="Pawfect Planner API", version="1.0.0", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """
+    Pin a client's reads to the primary for a short window after a successful write.
+    """
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        pin_to_primary(response)
+    return response
 
-# Create database tables
+# Create database tables and apply schema migrations
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 # Include routes
 app.include_router(pets_router, prefix="/pets", tags=["Pets"])
 app.include_router(reminders_router, prefix="/reminders", tags=["Reminders"])
 app.include_router(treatments_router, prefix="/treatments", tags=["Treatments"])
 app.include_router(breeds_router, prefix="/breeds", tags=["Breeds"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
+app.include_router(calendar_router, prefix="/calendar", tags=["Calendar"])
+app.include_router(vaccines_router, prefix="/api", tags=["Vaccines"])
+app.include_router(healthcheck_router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,102 @@
+import logging
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant identifying the migration advisory lock
+MIGRATION_LOCK_ID = 7_311_046
+
+# Ordered schema changes for databases created before the models gained them.
+# `Base.metadata.create_all` only creates missing tables, so anything added to an
+# existing table (columns, indexes) must also be listed here. Statements must be idempotent.
+MIGRATIONS = [
+    (
+        "0001_fk_and_due_date_indexes",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_pets_owner_id ON pets (owner_id)",
+            "CREATE INDEX IF NOT EXISTS ix_treatments_pet_id_next_due_date ON treatments (pet_id, next_due_date)",
+            "CREATE INDEX IF NOT EXISTS ix_reminders_pet_id_due_date ON reminders (pet_id, due_date)",
+        ],
+    ),
+    (
+        "0002_row_versions",
+        [
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}"
+            for table in ("pets", "treatments", "reminders")
+            for column in (
+                "version INTEGER NOT NULL DEFAULT 1",
+                "updated_at TIMESTAMPTZ NOT NULL DEFAULT now()",
+            )
+        ],
+    ),
+    (
+        "0003_reminder_dispatch",
+        [
+            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS notified_at TIMESTAMPTZ",
+            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS claimed_by VARCHAR",
+            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS claim_expires_at TIMESTAMPTZ",
+            # Reminders that were already past due must not all fire on the first dispatch run
+            "UPDATE reminders SET notified_at = now() WHERE notified_at IS NULL AND due_date < CURRENT_DATE",
+            "CREATE INDEX IF NOT EXISTS ix_reminders_due_date_pending ON reminders (due_date) WHERE notified_at IS NULL",
+        ],
+    ),
+    (
+        "0004_recurring_reminders",
+        [
+            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS recurrence VARCHAR",
+            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS recurrence_start DATE",
+        ],
+    ),
+    (
+        "0005_treatment_frequency_interval",
+        [
+            "ALTER TABLE treatments ADD COLUMN IF NOT EXISTS frequency_count INTEGER",
+            "ALTER TABLE treatments ADD COLUMN IF NOT EXISTS frequency_unit VARCHAR",
+            # Backfill the forms app.recurrence accepts: "2 months", "every 3 weeks", "Yearly", ...
+            "UPDATE treatments SET "
+            "frequency_count = COALESCE(substring(lower(frequency) from '(\\d+)')::int, 1), "
+            "frequency_unit = substring(lower(frequency) from '(day|week|month|year)') "
+            "WHERE frequency_unit IS NULL "
+            "AND lower(trim(frequency)) ~ '^(every\\s+)?([1-9]\\d*\\s*)?(day|week|month|year)s?$'",
+            "UPDATE treatments SET "
+            "frequency_count = CASE WHEN lower(trim(frequency)) IN ('biweekly', 'fortnightly') THEN 2 "
+            "WHEN lower(trim(frequency)) = 'quarterly' THEN 3 ELSE 1 END, "
+            "frequency_unit = CASE lower(trim(frequency)) WHEN 'daily' THEN 'day' "
+            "WHEN 'weekly' THEN 'week' WHEN 'biweekly' THEN 'week' WHEN 'fortnightly' THEN 'week' "
+            "WHEN 'monthly' THEN 'month' WHEN 'quarterly' THEN 'month' ELSE 'year' END "
+            "WHERE frequency_unit IS NULL AND lower(trim(frequency)) IN "
+            "('daily', 'weekly', 'biweekly', 'fortnightly', 'monthly', 'quarterly', 'yearly', 'annually', 'annual')",
+        ],
+    ),
+    (
+        "0006_source_keys",
+        [
+            "ALTER TABLE treatments ADD COLUMN IF NOT EXISTS source_key VARCHAR",
+            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS source_key VARCHAR",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_treatments_pet_id_source_key ON treatments (pet_id, source_key)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_reminders_pet_id_source_key ON reminders (pet_id, source_key)",
+        ],
+    ),
+]
+
+
+def run_migrations(engine):
+    """
+    Apply pending migrations in order and record them in `schema_migrations`.
+    - Serialized with an advisory lock so concurrent workers do not race.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR PRIMARY KEY, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+        applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+        for version, statements in MIGRATIONS:
+            if version in applied:
+                continue
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": version})
+            logger.info(f"Applied migration {version}")
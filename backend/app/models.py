@@ -1,7 +1,16 @@
-from sqlalchemy import Column, String, Integer, Date, Float, ForeignKey
+from sqlalchemy import Column, String, Integer, Date, DateTime, Float, ForeignKey, Index, func, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+
+class VersionedMixin:
+    """
+    Row version for ETags and optimistic concurrency.
+    - Writers bump `version` in the same UPDATE; `updated_at` is maintained by SQLAlchemy.
+    """
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
 class User(Base):
     __tablename__ = "users"
 
@@ -11,7 +20,7 @@ class User(Base):
 
     pets = relationship("Pet", back_populates="owner")
 
-class Pet(Base):
+class Pet(VersionedMixin, Base):
     __tablename__ = "pets"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -21,24 +30,58 @@ class Pet(Base):
     other_breed = Column(String, nullable=True)  # User-defined breed for "other"
     birth_date = Column(Date, nullable=True)
     weight = Column(Float, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
     owner = relationship("User", back_populates="pets")
+    treatments = relationship(
+        "Treatment", back_populates="pet", order_by="(Treatment.next_due_date, Treatment.id)"
+    )
+    reminders = relationship("Reminder", back_populates="pet", order_by="(Reminder.due_date, Reminder.id)")
 
-class Treatment(Base):
+class Treatment(VersionedMixin, Base):
     __tablename__ = "treatments"
+    __table_args__ = (
+        # Leading pet_id column also serves plain per-pet lookups
+        Index("ix_treatments_pet_id_next_due_date", "pet_id", "next_due_date"),
+        # Rows generated from another source (e.g. the vaccine schedule) are created once per pet
+        Index("ux_treatments_pet_id_source_key", "pet_id", "source_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     frequency = Column(String, nullable=True)
+    # Interval parsed from `frequency` on write; drives the next_due_date rollover job
+    frequency_count = Column(Integer, nullable=True)
+    frequency_unit = Column(String, nullable=True)  # One of app.recurrence.UNITS
     next_due_date = Column(Date, nullable=True)
     pet_id = Column(Integer, ForeignKey("pets.id"))
+    source_key = Column(String, nullable=True)  # Set on generated rows only, see app/vaccines/materialize.py
+    pet = relationship("Pet", back_populates="treatments")
 
-class Reminder(Base):
+class Reminder(VersionedMixin, Base):
     __tablename__ = "reminders"
+    __table_args__ = (
+        # Leading pet_id column also serves plain per-pet lookups
+        Index("ix_reminders_pet_id_due_date", "pet_id", "due_date"),
+        # Only reminders still waiting to be dispatched; stays small however many have fired
+        Index(
+            "ix_reminders_due_date_pending", "due_date",
+            postgresql_where=text("notified_at IS NULL"), sqlite_where=text("notified_at IS NULL"),
+        ),
+        Index("ux_reminders_pet_id_source_key", "pet_id", "source_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     due_date = Column(Date, nullable=False)
     pet_id = Column(Integer, ForeignKey("pets.id"))
+    # Recurring reminders: canonical RRULE plus the date the series is anchored on, see app/recurrence.py
+    recurrence = Column(String, nullable=True)
+    recurrence_start = Column(Date, nullable=True)
+    source_key = Column(String, nullable=True)  # Set on generated rows only, see app/vaccines/materialize.py
+    # Dispatch state, see app/jobs/reminder_dispatch.py
+    notified_at = Column(DateTime(timezone=True), nullable=True)
+    claimed_by = Column(String, nullable=True)
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+    pet = relationship("Pet", back_populates="reminders")
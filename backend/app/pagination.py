@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import date
+from typing import Callable, Optional, Sequence
+from fastapi import HTTPException
+
+# Page sizes for keyset-paginated list endpoints
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor.
+    """
+    payload = [value.isoformat() if isinstance(value, date) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> list:
+    """
+    Decode a cursor produced by `encode_cursor` back into typed sort-key values.
+    - Raises 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("unexpected cursor shape")
+        return [
+            None if value is None else date.fromisoformat(value) if value_type is date else value_type(value)
+            for value, value_type in zip(values, types)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def paginate(rows: Sequence, limit: int, sort_key: Callable) -> dict:
+    """
+    Build a page from `limit + 1` fetched rows.
+    - The extra row only signals that another page exists; it is not returned.
+    """
+    items = list(rows[:limit])
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(*sort_key(items[-1]))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,259 @@
+from datetime import date, datetime
+from typing import Iterable, Optional
+from sqlalchemy import Date, Integer, Interval, select, update, func, literal, null, union_all, and_, or_, case, cast, extract
+from sqlalchemy.orm import selectinload
+from app.models import Pet, Treatment, Reminder
+
+# Statement builders for the hot read paths.
+# Kept in one place so test_query_plans can EXPLAIN exactly what the routers run.
+
+
+def pets_for_owner(owner_id: int, after_id: Optional[int] = None):
+    """
+    Pets of an owner ordered by ID; served by ix_pets_owner_id.
+    - `after_id` continues a keyset-paginated listing.
+    """
+    statement = select(Pet).where(Pet.owner_id == owner_id)
+    if after_id is not None:
+        statement = statement.where(Pet.id > after_id)
+    return statement.order_by(Pet.id)
+
+
+def treatments_for_pet(pet_id: int, after: Optional[tuple] = None):
+    """
+    Treatments of a pet ordered by (next_due_date, id), undated ones last.
+    - Served by ix_treatments_pet_id_next_due_date.
+    - `after` is the (next_due_date, id) of the last row of the previous page.
+    """
+    statement = select(Treatment).where(Treatment.pet_id == pet_id)
+    if after is not None:
+        after_date, after_id = after
+        if after_date is None:
+            statement = statement.where(Treatment.next_due_date.is_(None), Treatment.id > after_id)
+        else:
+            statement = statement.where(or_(
+                Treatment.next_due_date > after_date,
+                and_(Treatment.next_due_date == after_date, Treatment.id > after_id),
+                Treatment.next_due_date.is_(None),
+            ))
+    return statement.order_by(Treatment.next_due_date.asc().nulls_last(), Treatment.id)
+
+
+def reminders_for_pet(pet_id: int, after: Optional[tuple] = None):
+    """
+    Reminders of a pet ordered by (due_date, id); served by ix_reminders_pet_id_due_date.
+    - `after` is the (due_date, id) of the last row of the previous page.
+    """
+    statement = select(Reminder).where(Reminder.pet_id == pet_id)
+    if after is not None:
+        after_date, after_id = after
+        # The redundant lower bound lets the planner use due_date as an index condition
+        statement = statement.where(
+            Reminder.due_date >= after_date,
+            or_(Reminder.due_date > after_date, Reminder.id > after_id),
+        )
+    return statement.order_by(Reminder.due_date, Reminder.id)
+
+
+def upcoming_treatments(pet_ids: Iterable[int], start: date, end: date):
+    """
+    Treatments of the given pets coming due within [start, end].
+    """
+    return (
+        select(Treatment)
+        .where(Treatment.pet_id.in_(list(pet_ids)), Treatment.next_due_date.between(start, end))
+        .order_by(Treatment.next_due_date, Treatment.id)
+    )
+
+
+def reminder_in_window(start: date, end: date):
+    """
+    Reminders that may have an occurrence within [start, end].
+    - One-off reminders are due inside the window; recurring ones only need their series to start before its end.
+    """
+    return or_(
+        Reminder.due_date.between(start, end),
+        and_(Reminder.recurrence.is_not(None), Reminder.recurrence_start <= end),
+    )
+
+
+def upcoming_reminders(pet_ids: Iterable[int], start: date, end: date):
+    """
+    Reminders of the given pets with an occurrence within [start, end].
+    """
+    return (
+        select(Reminder)
+        .where(Reminder.pet_id.in_(list(pet_ids)), reminder_in_window(start, end))
+        .order_by(Reminder.due_date, Reminder.id)
+    )
+
+
+def pets_with_upcoming_care(start: date, end: date):
+    """
+    Pets with their treatments and reminders due within [start, end] eagerly loaded.
+    - Recurring reminders are included whenever their series overlaps the window.
+    - Three queries in total (pets, then one IN query per collection), however many pets match.
+    - Callers add the pet or owner filter.
+    """
+    return select(Pet).options(
+        selectinload(Pet.treatments.and_(Treatment.next_due_date.between(start, end))),
+        selectinload(Pet.reminders.and_(reminder_in_window(start, end))),
+    )
+
+
+def most_common_breeds(pet_types: Iterable[str], limit: int):
+    """
+    The `limit` most common (type, breed) pairs among pets, with their pet counts, most common first.
+    - Types and breeds are compared case-insensitively; "other" and empty breeds are left out.
+    - `total` counts the pets of all matching pairs, before the limit, to report coverage.
+    """
+    pet_type = func.lower(Pet.type)
+    breed = func.lower(func.trim(Pet.breed))
+    pets = func.count(Pet.id)
+    return (
+        select(pet_type.label("type"), breed.label("breed"), pets.label("pets"), func.sum(pets).over().label("total"))
+        .where(pet_type.in_(list(pet_types)), Pet.breed.is_not(None), breed.not_in(["", "other"]))
+        .group_by(pet_type, breed)
+        .order_by(pets.desc(), pet_type, breed)
+        .limit(limit)
+    )
+
+
+# Reminder columns whose change reschedules it; recurrence_start is always written along with due_date
+SCHEDULE_COLUMNS = ("due_date", "recurrence")
+
+
+def reset_dispatch_state(values: dict) -> dict:
+    """
+    Extra SET values for a reminder UPDATE writing `values` (plain values or bind parameters).
+    - When the update moves the schedule, `notified_at` and any claim are cleared so the new date fires.
+    - Compared against the current row, so rewriting an unchanged date does not fire the reminder again.
+    """
+    table = Reminder.__table__
+    changed = [table.c[column].is_distinct_from(values[column]) for column in SCHEDULE_COLUMNS if column in values]
+    if not changed:
+        return {}
+    rescheduled = or_(*changed)
+    return {
+        column: case((rescheduled, null()), else_=table.c[column])
+        for column in ("notified_at", "claimed_by", "claim_expires_at")
+    }
+
+
+def claim_due_reminders(worker_id: str, now: datetime, until: date, lease_expires_at: datetime, limit: int):
+    """
+    Claim up to `limit` undispatched reminders due on or before `until` for `worker_id`.
+    - Range scan of ix_reminders_due_date_pending; rows already claimed by a live lease are skipped.
+    - FOR UPDATE SKIP LOCKED lets several workers claim concurrently without blocking or overlapping.
+    - `updated_at` is left alone: dispatch state is not part of the reminder's representation.
+    """
+    candidates = (
+        select(Reminder.id)
+        .where(
+            Reminder.notified_at.is_(None),
+            Reminder.due_date <= until,
+            or_(Reminder.claim_expires_at.is_(None), Reminder.claim_expires_at < now),
+        )
+        .order_by(Reminder.due_date, Reminder.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Reminder)
+        .where(Reminder.id.in_(candidates))
+        .values(claimed_by=worker_id, claim_expires_at=lease_expires_at, updated_at=Reminder.updated_at)
+        .returning(
+            Reminder.id, Reminder.pet_id, Reminder.title, Reminder.description, Reminder.due_date, Reminder.version,
+            Reminder.recurrence, Reminder.recurrence_start,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def roll_over_treatments_by_days(today: date):
+    """
+    Advance overdue day- and week-interval treatments to their first occurrence on or after `today`.
+    - Closed form: ceil(days overdue / step) whole steps, so a row that missed many occurrences moves in one go.
+    - Bumps the row version like any other write, so ETags and cached calendar events are refreshed.
+    """
+    step = Treatment.frequency_count * case((Treatment.frequency_unit == "week", 7), else_=1)
+    steps = (literal(today, Date) - Treatment.next_due_date + step - 1) // step
+    return (
+        update(Treatment)
+        .where(
+            Treatment.next_due_date < today,
+            Treatment.frequency_unit.in_(("day", "week")),
+            Treatment.frequency_count > 0,
+        )
+        .values(next_due_date=Treatment.next_due_date + steps * step, version=Treatment.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def roll_over_treatments_by_months(today: date):
+    """
+    Advance overdue month- and year-interval treatments to their first occurrence on or after `today`.
+    - Steps are counted from the month difference; one more step is taken when the day of month is still behind.
+    - Month ends clamp like `app.recurrence.add_months` (Jan 31 + 1 month is Feb 28/29).
+    """
+    months = Treatment.frequency_count * case((Treatment.frequency_unit == "year", 12), else_=1)
+    due_month = cast(extract("year", Treatment.next_due_date) * 12 + extract("month", Treatment.next_due_date), Integer)
+    steps = (today.year * 12 + today.month - due_month + months - 1) // months
+
+    def shifted(n):
+        return cast(Treatment.next_due_date + func.make_interval(0, n * months, type_=Interval), Date)
+
+    return (
+        update(Treatment)
+        .where(
+            Treatment.next_due_date < today,
+            Treatment.frequency_unit.in_(("month", "year")),
+            Treatment.frequency_count > 0,
+        )
+        .values(
+            next_due_date=case((shifted(steps) < today, shifted(steps + 1)), else_=shifted(steps)),
+            version=Treatment.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _calendar_scope(statement, owner_id: Optional[int], pet_id: Optional[int]):
+    if pet_id is not None:
+        return statement.where(Pet.id == pet_id)
+    return statement.where(Pet.owner_id == owner_id)
+
+
+def calendar_reminders(owner_id: Optional[int] = None, pet_id: Optional[int] = None, after_id: int = 0):
+    """
+    Reminders of an owner's pets (or of one pet) with the pet's name and version, in id order.
+    - `after_id` continues a batched read of the feed.
+    """
+    statement = select(Reminder, Pet.name, Pet.version).join(Pet, Reminder.pet_id == Pet.id)
+    statement = _calendar_scope(statement, owner_id, pet_id).where(Reminder.id > after_id)
+    return statement.order_by(Reminder.id)
+
+
+def calendar_treatments(owner_id: Optional[int] = None, pet_id: Optional[int] = None, after_id: int = 0):
+    """
+    Dated treatments of an owner's pets (or of one pet) with the pet's name and version, in id order.
+    """
+    statement = select(Treatment, Pet.name, Pet.version).join(Pet, Treatment.pet_id == Pet.id)
+    statement = _calendar_scope(statement, owner_id, pet_id)
+    return statement.where(Treatment.next_due_date.is_not(None), Treatment.id > after_id).order_by(Treatment.id)
+
+
+def calendar_state(owner_id: Optional[int] = None, pet_id: Optional[int] = None):
+    """
+    Per-table summary of everything a calendar feed contains, used for its ETag.
+    - Row count and id sum change on inserts and deletes, the version sum on every edit.
+    """
+    def aggregate(model, *criteria):
+        statement = select(
+            literal(model.__tablename__), func.count(model.id), func.sum(model.id), func.sum(model.version)
+        )
+        if model is not Pet:
+            statement = statement.join(Pet, model.pet_id == Pet.id)
+        return _calendar_scope(statement, owner_id, pet_id).where(*criteria)
+
+    return union_all(aggregate(Pet), aggregate(Reminder), aggregate(Treatment, Treatment.next_due_date.is_not(None)))
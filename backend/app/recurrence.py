@@ -0,0 +1,193 @@
+"""
+Recurrence rules for reminders and treatments.
+
+A rule is parsed into an `Interval` (count, unit) from either an RRULE subset
+("FREQ=MONTHLY;INTERVAL=2") or the free-text frequencies used across the app
+("2 months", "Yearly", "every 3 weeks"). Occurrences are computed in closed form from
+the series anchor, so expanding a window never walks the series from its start and
+month-end anchors (the 31st) do not drift.
+"""
+import calendar
+import re
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+UNITS = ("day", "week", "month", "year")
+
+_FREQ_UNITS = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month", "YEARLY": "year"}
+_UNIT_FREQS = {unit: freq for freq, unit in _FREQ_UNITS.items()}
+_ALIASES = {
+    "daily": (1, "day"),
+    "weekly": (1, "week"),
+    "biweekly": (2, "week"),
+    "fortnightly": (2, "week"),
+    "monthly": (1, "month"),
+    "quarterly": (3, "month"),
+    "yearly": (1, "year"),
+    "annually": (1, "year"),
+    "annual": (1, "year"),
+}
+_TEXT_RULE = re.compile(r"^(?:every\s+)?(?:(\d+)\s*)?(day|week|month|year)s?$")
+
+
+class Interval(NamedTuple):
+    count: int
+    unit: str  # One of UNITS
+
+
+def parse_recurrence(value: Optional[str]) -> Optional[Interval]:
+    """
+    Parse a recurrence rule or frequency string.
+    - Returns None for empty input.
+    - Raises ValueError for anything that is not a supported rule.
+    """
+    if value is None or not value.strip():
+        return None
+    text = value.strip()
+    if "FREQ=" in text.upper():
+        return _parse_rrule(text)
+
+    lowered = " ".join(text.lower().split())
+    if lowered in _ALIASES:
+        return Interval(*_ALIASES[lowered])
+    match = _TEXT_RULE.match(lowered)
+    if not match:
+        raise ValueError(f"Unsupported recurrence '{value}'; use e.g. '2 months', 'Yearly' or 'FREQ=WEEKLY'.")
+    count = int(match.group(1) or 1)
+    if count < 1:
+        raise ValueError("Recurrence interval must be at least 1.")
+    return Interval(count, match.group(2))
+
+
+def _parse_rrule(text: str) -> Interval:
+    if text.upper().startswith("RRULE:"):
+        text = text[len("RRULE:"):]
+    parts = {}
+    for part in filter(None, text.split(";")):
+        key, separator, value = part.partition("=")
+        if not separator:
+            raise ValueError(f"Malformed RRULE part '{part}'.")
+        parts[key.strip().upper()] = value.strip().upper()
+
+    unsupported = set(parts) - {"FREQ", "INTERVAL"}
+    if unsupported:
+        raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(unsupported))}; only FREQ and INTERVAL are.")
+    unit = _FREQ_UNITS.get(parts.get("FREQ"))
+    if not unit:
+        raise ValueError(f"Unsupported RRULE FREQ '{parts.get('FREQ')}'.")
+    count = parts.get("INTERVAL", "1")
+    if not count.isdigit() or int(count) < 1:
+        raise ValueError("RRULE INTERVAL must be a positive integer.")
+    return Interval(int(count), unit)
+
+
+def to_rrule(interval: Interval) -> str:
+    return f"FREQ={_UNIT_FREQS[interval.unit]};INTERVAL={interval.count}"
+
+
+def describe_interval(interval: Interval) -> str:
+    """
+    Free-text form of an interval, e.g. "1 year" or "2 months".
+    """
+    return f"{interval.count} {interval.unit}{'s' if interval.count != 1 else ''}"
+
+
+def normalize_recurrence(value: Optional[str]) -> Optional[str]:
+    """
+    Canonical RRULE for a rule or frequency string, as stored on reminders.
+    """
+    interval = parse_recurrence(value)
+    return to_rrule(interval) if interval else None
+
+
+def add_months(day: date, months: int) -> date:
+    """
+    Shift by whole months, clamping to the end of shorter months.
+    """
+    year, month = divmod(day.month - 1 + months, 12)
+    year, month = day.year + year, month + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrence(anchor: date, interval: Interval, n: int) -> date:
+    """
+    The n-th occurrence of a series (0 is the anchor), computed from the anchor.
+    """
+    if interval.unit == "day":
+        return anchor + timedelta(days=n * interval.count)
+    if interval.unit == "week":
+        return anchor + timedelta(weeks=n * interval.count)
+    months = n * interval.count * (12 if interval.unit == "year" else 1)
+    return add_months(anchor, months)
+
+
+def first_index_on_or_after(anchor: date, interval: Interval, day: date) -> int:
+    """
+    Index of the first occurrence on or after `day`, without enumerating earlier ones.
+    """
+    if day <= anchor:
+        return 0
+    if interval.unit in ("day", "week"):
+        step = interval.count * (7 if interval.unit == "week" else 1)
+        return -(-(day - anchor).days // step)
+
+    step = interval.count * (12 if interval.unit == "year" else 1)
+    n = max(((day.year - anchor.year) * 12 + day.month - anchor.month) // step, 0)
+    while occurrence(anchor, interval, n) < day:
+        n += 1
+    return n
+
+
+def occurrences(anchor: date, interval: Optional[Interval], start: date, end: date) -> Iterator[date]:
+    """
+    Lazily yield the occurrences within [start, end].
+    - Without an interval the series is the anchor alone.
+    """
+    if interval is None:
+        if start <= anchor <= end:
+            yield anchor
+        return
+
+    n = first_index_on_or_after(anchor, interval, start)
+    while True:
+        day = occurrence(anchor, interval, n)
+        if day > end:
+            return
+        yield day
+        n += 1
+
+
+def next_occurrence(anchor: date, interval: Interval, after: date) -> date:
+    """
+    First occurrence strictly after `after`.
+    """
+    return occurrence(anchor, interval, first_index_on_or_after(anchor, interval, after + timedelta(days=1)))
+
+
+def reminder_anchor(reminder) -> date:
+    """
+    Recurring reminders expand from the date the series was set up, not from the next pending occurrence.
+    """
+    if reminder.recurrence and reminder.recurrence_start:
+        return reminder.recurrence_start
+    return reminder.due_date
+
+
+def reminder_occurrences(reminders: Iterable, start: date, end: date) -> List[dict]:
+    """
+    Expand reminders into their occurrences within [start, end], ordered by date.
+    """
+    items = []
+    for reminder in reminders:
+        interval = parse_recurrence(reminder.recurrence)
+        for day in occurrences(reminder_anchor(reminder), interval, start, end):
+            items.append({
+                "reminder_id": reminder.id,
+                "pet_id": reminder.pet_id,
+                "title": reminder.title,
+                "description": reminder.description,
+                "date": day,
+                "recurring": interval is not None,
+            })
+    items.sort(key=lambda item: (item["date"], item["reminder_id"]))
+    return items
@@ -1,28 +1,116 @@
 import os
-import redis
-import json
+import logging
 import httpx
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, Body, HTTPException, Query
 from dotenv import load_dotenv
+from app.breeds.catalog import api_headers, catalog as breed_catalog
+from app.breeds.weights import weight_ranges
+from app.cache import NotFound, TieredCache
+from app.schemas import WeightCheckItem
+from app.upstream import CircuitOpen, DeadlineExceeded, upstream
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-DOG_API_KEY = os.getenv("DOG_API_KEY")
-CACHE_EXPIRATION = 3600  # Cache expires in 1 hour
+CACHE_EXPIRATION = int(os.getenv("BREED_CACHE_TTL_SECONDS", 3600))  # Cache expires in 1 hour
+BREED_CACHE_STALE_SECONDS = int(os.getenv("BREED_CACHE_STALE_SECONDS", 86400))  # Served stale while refreshing
+BREED_NEGATIVE_CACHE_SECONDS = int(os.getenv("BREED_NEGATIVE_CACHE_SECONDS", 300))  # Remembered "not found"
+BREED_LOCAL_CACHE_SIZE = int(os.getenv("BREED_LOCAL_CACHE_SIZE", 1024))
+BREED_LOCAL_CACHE_SECONDS = int(os.getenv("BREED_LOCAL_CACHE_SECONDS", 60))
+BREED_WEIGHT_BATCH_MAX = int(os.getenv("BREED_WEIGHT_BATCH_MAX", 100_000))  # Upper bound on pairs per request
+
+# Breed search endpoints per pet type
+BREED_SEARCH_URLS = {
+    "dog": "https://api.thedogapi.com/v1/breeds/search",
+    "cat": "https://api.thecatapi.com/v1/breeds/search",
+}
+
+# In-process LRU in front of Redis; concurrent misses for the same breed share one upstream request
+breed_cache = TieredCache(
+    "breeds",
+    ttl=CACHE_EXPIRATION,
+    stale_ttl=BREED_CACHE_STALE_SECONDS,
+    negative_ttl=BREED_NEGATIVE_CACHE_SECONDS,
+    local_size=BREED_LOCAL_CACHE_SIZE,
+    local_ttl=BREED_LOCAL_CACHE_SECONDS,
+)
+
+
+async def fetch_breed_info(pet_type: str, breed_name: str) -> dict:
+    """
+    Search the breed upstream and return the first match.
+    - Fails fast while the API's circuit is open; the cache keeps serving stale entries meanwhile.
+    """
+    try:
+        response = await upstream.get(
+            BREED_SEARCH_URLS[pet_type], params={"q": breed_name}, headers=api_headers(pet_type)
+        )
+        response.raise_for_status()
+        data = response.json()
+    except CircuitOpen:
+        raise HTTPException(status_code=503, detail="Breed API temporarily unavailable.")
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Breed API timed out.")
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail=f"API error: {e.response.text}")
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching breed data: {str(e)}")
+
+    if not data:
+        raise NotFound(breed_name)
+    return data[0]  # Return first breed match
+
+
+def check_pet_type(pet_type: str) -> str:
+    pet_type = pet_type.lower()
+    if pet_type not in BREED_SEARCH_URLS:
+        raise HTTPException(status_code=400, detail="Invalid pet type. Use 'dog' or 'cat'.")
+    return pet_type
+
 
-# Initialize Redis cache
-redis_client = redis.Redis(host="localhost", port=6379, db=0, decode_responses=True)
+@router.get("/breeds/{pet_type}/autocomplete")
+async def autocomplete_breeds(pet_type: str, q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """
+    Suggest breed names for a partial or misspelled name, from the local breed catalog.
+    - Names and name words starting with `q` come first, then close matches by trigram similarity.
+    - Empty until the catalog has been loaded.
+    """
+    return breed_catalog.autocomplete(check_pet_type(pet_type), q, limit)
+
+
+@router.post("/breeds/{pet_type}/weights/validate")
+def validate_weights(pet_type: str, items: List[WeightCheckItem] = Body(...)):
+    """
+    Check many (breed, weight in kg) pairs against the breed weight ranges at once.
+    - Each result holds a `status` (healthy, underweight, overweight, unknown breed or invalid weight)
+      and the breed's `min_weight` and `max_weight`, in request order; `summary` counts the statuses.
+    - Ranges come from the local breed catalog, or from the bundled ranges of common breeds until it is loaded.
+    """
+    pet_type = check_pet_type(pet_type)
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one item.")
+    if len(items) > BREED_WEIGHT_BATCH_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"Batch too large; at most {BREED_WEIGHT_BATCH_MAX} items are allowed."
+        )
+    breeds = [item["breed"] for item in items]
+    weights = [item["weight"] for item in items]
+    return weight_ranges.validate_batch(pet_type, breeds, weights)
 
 
 @router.get("/breeds/{pet_type}/{breed_name}")
-def get_breed_info(pet_type: str, breed_name: str):
+async def get_breed_info(pet_type: str, breed_name: str):
     """
     Fetch breed information for dogs or cats.
     If breed_name is "other", return a generic response.
-    Caching is implemented to reduce API calls.
+    Breeds are looked up in the local breed catalog when it is loaded, without an API call; a partial name is
+    only matched there when a single breed starts with it.
+    Otherwise caching is implemented to reduce API calls: see `breed_cache`. Unknown breeds are cached too.
     """
     breed_name = breed_name.lower()
 
@@ -32,36 +120,22 @@ def get_breed_info(pet_type: str, breed_name: str):
             "info": "No breed-specific information available. However, you can still access vaccination schedules, custom treatments, reminders, and AI features."
         }
 
-    # Check cache before making an API call
-    cache_key = f"{pet_type}_breed_{breed_name}"
-    cached_data = redis_client.get(cache_key)
-    if cached_data:
-        return json.loads(cached_data)
-
-    # Define API endpoints
-    if pet_type.lower() == "dog":
-        url = f"https://api.thedogapi.com/v1/breeds/search?q={breed_name}"
-        headers = {"x-api-key": DOG_API_KEY} if DOG_API_KEY else {}
-    elif pet_type.lower() == "cat":
-        url = f"https://api.thecatapi.com/v1/breeds/search?q={breed_name}"
-        headers = {}  # The Cat API does not require an API key for breed searches
-    else:
-        raise HTTPException(status_code=400, detail="Invalid pet type. Use 'dog' or 'cat'.")
+    return await lookup_breed(check_pet_type(pet_type), breed_name)
 
-    # Make API request
-    try:
-        response = httpx.get(url, headers=headers, timeout=5)
-        response.raise_for_status()
-        data = response.json()
 
-        if data:
-            breed_info = data[0]  # Return first breed match
-            redis_client.setex(cache_key, CACHE_EXPIRATION, json.dumps(breed_info))  # Cache the response
-            return breed_info
-        else:
+async def lookup_breed(pet_type: str, breed_name: str) -> dict:
+    """
+    Breed information from the local catalog when it is loaded, else from the cache or the breed API.
+    - `pet_type` is validated and `breed_name` lower-cased by the caller.
+    """
+    if breed_catalog.has(pet_type):
+        breed_info = breed_catalog.lookup(pet_type, breed_name)
+        if breed_info is None:
             raise HTTPException(status_code=404, detail="Breed not found.")
+        return breed_info
 
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=e.response.status_code, detail=f"API error: {e.response.text}")
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching breed data: {str(e)}")
+    # Check cache before making an API call
+    try:
+        return await breed_cache.get_or_load(f"{pet_type}:{breed_name}", lambda: fetch_breed_info(pet_type, breed_name))
+    except NotFound:
+        raise HTTPException(status_code=404, detail="Breed not found.")
@@ -0,0 +1,114 @@
+from contextlib import AsyncExitStack
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.background import BackgroundTask
+from app.database import snapshot_scope, use_replica
+from app.models import Pet, User
+from app.queries import calendar_reminders, calendar_treatments, calendar_state
+from app.etags import state_etag, is_not_modified
+from app.ics_feed import calendar_header, reminder_event, treatment_event, CALENDAR_FOOTER, MEDIA_TYPE
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Rows read per query while streaming a feed
+FEED_BATCH_SIZE = 500
+
+
+async def _feed_etag(db, owner_id: Optional[int], pet_id: Optional[int]) -> tuple:
+    """
+    Return the feed's ETag and whether it contains any pets.
+    """
+    state = sorted(tuple(row) for row in (await db.execute(calendar_state(owner_id, pet_id))).all())
+    return state_etag("calendar", owner_id, pet_id, state), any(row[0] == "pets" and row[1] for row in state)
+
+
+async def _stream_feed(db, name: str, owner_id: Optional[int], pet_id: Optional[int]):
+    """
+    Yield the calendar header, one chunk of cached VEVENT fragments per batch of rows, then the footer.
+    - `db` is the snapshot session the ETag was computed in, so the body always matches it.
+    """
+    yield calendar_header(name)
+    for builder, serialize in ((calendar_reminders, reminder_event), (calendar_treatments, treatment_event)):
+        after_id = 0
+        while True:
+            rows = (await db.execute(builder(owner_id, pet_id, after_id).limit(FEED_BATCH_SIZE))).all()
+            if rows:
+                yield b"".join(serialize(item, pet_name, pet_version) for item, pet_name, pet_version in rows)
+                after_id = rows[-1][0].id
+            db.expunge_all()
+            if len(rows) < FEED_BATCH_SIZE:
+                break
+    yield CALENDAR_FOOTER
+
+
+def _feed_response(db, feed: AsyncExitStack, name: str, filename: str, etag: str, owner_id=None, pet_id=None):
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'inline; filename="{filename}"',
+    }
+    stream = _stream_feed(db, name, owner_id, pet_id)
+    # The snapshot session stays open while the body streams and is closed once the response is done
+    return StreamingResponse(stream, media_type=MEDIA_TYPE, headers=headers, background=BackgroundTask(feed.aclose))
+
+
+@router.get("/owners/{owner_id}.ics")
+async def get_owner_calendar(owner_id: int, request: Request, if_none_match: Optional[str] = Header(None)):
+    """
+    Subscribable calendar with the reminders and dated treatments of all of an owner's pets.
+    - Streams events as they are read; unchanged events come from the fragment cache.
+    - The ETag and the events are read from one database snapshot.
+    - Returns 304 if `If-None-Match` matches, without reading any event rows.
+    - Returns 404 if the owner does not exist.
+    """
+    feed = AsyncExitStack()
+    streaming = False
+    try:
+        db = await feed.enter_async_context(snapshot_scope(read_only=use_replica(request)))
+        etag, has_pets = await _feed_etag(db, owner_id, None)
+        if not has_pets and not await db.get(User, owner_id):
+            raise HTTPException(status_code=404, detail="Owner not found.")
+        if is_not_modified(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response = _feed_response(db, feed, "Pawfect Planner", f"owner_{owner_id}.ics", etag, owner_id=owner_id)
+        streaming = True
+        return response
+    except SQLAlchemyError as e:
+        logger.error(f"Error reading owner calendar state: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+    finally:
+        if not streaming:
+            await feed.aclose()
+
+
+@router.get("/pets/{pet_id}.ics")
+async def get_pet_calendar(pet_id: int, request: Request, if_none_match: Optional[str] = Header(None)):
+    """
+    Subscribable calendar with one pet's reminders and dated treatments.
+    - Returns 304 if `If-None-Match` matches, 404 if the pet does not exist.
+    """
+    feed = AsyncExitStack()
+    streaming = False
+    try:
+        db = await feed.enter_async_context(snapshot_scope(read_only=use_replica(request)))
+        etag, has_pets = await _feed_etag(db, None, pet_id)
+        if not has_pets:
+            raise HTTPException(status_code=404, detail="Pet not found.")
+        if is_not_modified(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        pet = await db.get(Pet, pet_id)
+        name = f"{pet.name} - Pawfect Planner"
+        response = _feed_response(db, feed, name, f"pet_{pet_id}.ics", etag, pet_id=pet_id)
+        streaming = True
+        return response
+    except SQLAlchemyError as e:
+        logger.error(f"Error reading pet calendar state: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+    finally:
+        if not streaming:
+            await feed.aclose()
@@ -1,4 +1,6 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.jobs.breed_cache_warmup import breed_warmup
 
 router = APIRouter()
 
@@ -8,3 +10,13 @@ async def healthcheck():
     Simple endpoint to check if the service is running.
     """
     return {"status": "ok", "message": "Service is up and running"}
+
+
+@router.get("/ready", tags=["Healthcheck"])
+async def ready():
+    """
+    Readiness for traffic: 503 while the breed cache warm-up is running and BREED_WARMUP_BLOCKS_READINESS is set.
+    """
+    if not breed_warmup.ready:
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
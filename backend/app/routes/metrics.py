@@ -0,0 +1,86 @@
+from fastapi import APIRouter
+from app.database import pool_status
+from app.jobs.reminder_dispatch import dispatcher
+from app.jobs.treatment_rollover import rollover
+from app.ics_feed import fragment_cache
+from app.routes.breeds import breed_cache
+from app.breeds.catalog import catalog as breed_catalog
+from app.jobs.breed_catalog_refresh import breed_refresh
+from app.jobs.breed_cache_warmup import breed_warmup
+from app.breeds.weights import weight_ranges
+from app.upstream import upstream
+from app.vaccines.catalog import catalog
+from app.vaccines.schedule import schedule_cache_info
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics():
+    """
+    Report database connection pool usage.
+    - `checked_out`, `idle` and `overflow` are live connection counts.
+    - Wait times show how long requests queued for a connection.
+    - `checkout_timeouts` counts callers that gave up on an exhausted pool, `checkout_errors` failed connects.
+    """
+    return {"pools": pool_status()}
+
+
+@router.get("/reminder-dispatch")
+async def get_reminder_dispatch_metrics():
+    """
+    Report the reminder dispatcher of this worker.
+    - `pending` reminders are claimed and waiting in memory for their fire time.
+    - `failed` deliveries are retried once their lease expires.
+    """
+    return dispatcher.snapshot()
+
+
+@router.get("/treatment-rollover")
+async def get_treatment_rollover_metrics():
+    """
+    Report the treatment rollover job of this worker.
+    - `last_run` holds the rows advanced per interval class and how long the run took.
+    """
+    return rollover.snapshot()
+
+
+@router.get("/calendar-cache")
+async def get_calendar_cache_metrics():
+    """
+    Report the cache of serialized calendar events.
+    """
+    return fragment_cache.snapshot()
+
+
+@router.get("/vaccine-catalog")
+async def get_vaccine_catalog_metrics():
+    """
+    Report the in-memory vaccine catalog.
+    - `loads` counts the initial load plus every reload after a data file changed.
+    - `schedule_cache` covers computed schedules per (pet type, birth date, language, as-of date).
+    """
+    return {**catalog.snapshot(), "schedule_cache": schedule_cache_info()}
+
+
+@router.get("/breeds")
+async def get_breed_metrics():
+    """
+    Report breed lookups.
+    - `catalog` counts the breeds loaded per pet type; lookups it answers never reach the upstream APIs.
+    - `cache` counts hits, stale hits and "not found" hits per tier (`local`, then `redis`) and the
+      `upstream` loads behind them; `offload_ratio` is the share of lookups served without a load.
+    - `single_flight` covers loads: `leaders` made an upstream request, `shared` waited for one already in flight.
+    - `upstream` holds calls, retries, hedged requests and the circuit breaker state per API host.
+    - `warmup` reports the startup warm-up: breeds warmed and the share of pets they cover, for the pet
+      types the catalog does not serve.
+    """
+    return {
+        "catalog": breed_catalog.snapshot(),
+        "catalog_refresh": breed_refresh.snapshot(),
+        "weight_ranges": weight_ranges.snapshot(),
+        "cache": breed_cache.snapshot(),
+        "single_flight": breed_cache.flight.snapshot(),
+        "warmup": breed_warmup.snapshot(),
+        "upstream": upstream.snapshot(),
+    }
@@ -1,20 +1,51 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Body, Header, Response
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, timedelta
+from sqlalchemy import update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from app.schemas import PetCreate, PetUpdate, PetResponse
-from app.models import Pet as PetModel
-from app.database import get_db
+from app.schemas import (
+    PetCreate, PetUpdate, PetBulkUpdate, PetResponse, PetPage, PetOverview, OwnerOverview, BulkDelete, BulkResult,
+    ReminderOccurrence, VaccineScheduleResult,
+)
+from app.models import Pet as PetModel, User
+from app.database import get_session, get_read_session
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, paginate
+from app.queries import pets_for_owner, pets_with_upcoming_care
+from app.recurrence import reminder_occurrences
+from app.bulk import check_batch_size, validate_items, column_values, create_many, update_many, delete_many, summarize
+from app.etags import resource_etag, collection_etag, page_etag, conditional_response, if_match_versions, write_conflict
+from app.vaccines.materialize import materialize_schedule
+from app.vaccines.vaccines import VALID_PET_TYPES
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+ScheduleTarget = Literal["treatments", "reminders"]
+
+def check_schedulable(pet):
+    """
+    Vaccine schedules need a birth date and a pet type with vaccine data.
+    """
+    if not pet.birth_date:
+        raise HTTPException(status_code=400, detail="A birth date is required to schedule vaccinations.")
+    if pet.type.lower() not in VALID_PET_TYPES:
+        raise HTTPException(status_code=400, detail=f"Vaccine schedules are only available for {VALID_PET_TYPES}.")
+
 @router.post("/", response_model=PetResponse)
-def create_pet(pet: PetCreate, db: Session = Depends(get_db)):
+async def create_pet(
+    pet: PetCreate,
+    vaccine_schedule: Optional[ScheduleTarget] = Query(None),
+    language: str = "en",
+    db: AsyncSession = Depends(get_session),
+):
     """
     Create a new pet profile.
     - Ensures `other_breed` is only used when breed is set to "other".
+    - `vaccine_schedule` also creates the pet's scheduled vaccinations as treatments or reminders, in the same
+      transaction.
     - Handles database errors gracefully.
     """
     try:
@@ -24,77 +55,262 @@ def create_pet(pet: PetCreate, db: Session = Depends(get_db)):
         if pet.breed != "other" and pet.other_breed:
             raise HTTPException(status_code=400, detail="other_breed should only be set if breed is 'other'.")
 
-        new_pet = PetModel(**pet.dict())
+        if vaccine_schedule:
+            check_schedulable(pet)
+
+        new_pet = PetModel(**column_values(PetModel, pet.model_dump()))
         db.add(new_pet)
-        db.commit()
-        db.refresh(new_pet)
+        if vaccine_schedule:
+            await db.flush()
+            await materialize_schedule(db, new_pet, vaccine_schedule, language)
+        await db.commit()
+        await db.refresh(new_pet)
         return new_pet
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating pet: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_pets(items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_session)):
+    """
+    Create many pet profiles in one transaction.
+    - Each item is validated like `create_pet`; invalid items or unknown owners are reported per item.
+    - Valid items are written with one multi-row INSERT.
+    """
+    check_batch_size(items)
+    valid, results = validate_items(items, PetCreate)
+    try:
+        results += await create_many(db, PetModel, valid, User.id, "owner_id", "Owner not found.")
+        await db.commit()
+        return summarize(results)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error bulk creating pets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+@router.put("/bulk", response_model=BulkResult)
+async def bulk_update_pets(items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_session)):
+    """
+    Update many pet profiles in one transaction.
+    - Each item carries its `id` plus the fields to change.
+    - Unknown ids and invalid items are reported per item.
+    """
+    check_batch_size(items)
+    valid, results = validate_items(items, PetBulkUpdate)
+    try:
+        results += await update_many(db, PetModel, valid, "Pet not found.")
+        await db.commit()
+        return summarize(results)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error bulk updating pets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+@router.post("/bulk/delete", response_model=BulkResult)
+async def bulk_delete_pets(request: BulkDelete, db: AsyncSession = Depends(get_session)):
+    """
+    Delete many pet profiles in one statement.
+    - Unknown ids are reported per item.
+    """
+    check_batch_size(request.ids)
+    try:
+        results = await delete_many(db, PetModel, request.ids, "Pet not found.")
+        await db.commit()
+        return summarize(results)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error bulk deleting pets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+@router.get("/", response_model=PetPage)
+async def list_pets(
+    owner_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    List an owner's pets ordered by ID.
+    - Keyset pagination: pass the previous page's `next_cursor` as `cursor`.
+    - Returns 304 if `If-None-Match` matches the page's ETag.
+    """
+    after_id = decode_cursor(cursor, (int,))[0] if cursor else None
+    try:
+        pets = (await db.execute(pets_for_owner(owner_id, after_id).limit(limit + 1))).scalars().all()
+        page = paginate(pets, limit, lambda pet: (pet.id,))
+        return conditional_response(if_none_match, page_etag("pets", page, limit), response) or page
+    except SQLAlchemyError as e:
+        logger.error(f"Error listing pets: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+def build_overview(pet: PetModel, start: date, end: date) -> PetOverview:
+    overview = PetOverview.model_validate(pet)
+    overview.occurrences = [ReminderOccurrence(**item) for item in reminder_occurrences(pet.reminders, start, end)]
+    return overview
+
+@router.get("/owner/{owner_id}/overview", response_model=OwnerOverview)
+async def get_owner_overview(
+    owner_id: int,
+    response: Response,
+    days: int = Query(90, ge=1, le=365),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    Retrieve all of an owner's pets with the treatments and reminders due in the next `days` days.
+    - Fixed number of queries regardless of how many pets the owner has.
+    - Recurring reminders are expanded into `occurrences` within the window.
+    - Returns 304 if `If-None-Match` matches the overview's ETag.
+    """
+    try:
+        today = date.today()
+        end = today + timedelta(days=days)
+        statement = pets_with_upcoming_care(today, end)
+        pets = (await db.execute(statement.where(PetModel.owner_id == owner_id).order_by(PetModel.id))).scalars().all()
+        rows = [row for pet in pets for row in (pet, *pet.treatments, *pet.reminders)]
+        etag = collection_etag(f"owner-overview-{today:%Y%m%d}-{days}", rows)
+        return conditional_response(if_none_match, etag, response) or {
+            "owner_id": owner_id, "pets": [build_overview(pet, today, end) for pet in pets]
+        }
+    except SQLAlchemyError as e:
+        logger.error(f"Error retrieving owner overview: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+@router.get("/{pet_id}/overview", response_model=PetOverview)
+async def get_pet_overview(
+    pet_id: int,
+    response: Response,
+    days: int = Query(90, ge=1, le=365),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    Retrieve a pet profile with the treatments and reminders due in the next `days` days.
+    - Replaces separate pet, treatment and reminder calls with one response.
+    - Recurring reminders are expanded into `occurrences` within the window.
+    - Returns 404 if the pet does not exist, 304 if `If-None-Match` matches the overview's ETag.
+    """
+    try:
+        today = date.today()
+        end = today + timedelta(days=days)
+        pet = (await db.execute(pets_with_upcoming_care(today, end).where(PetModel.id == pet_id))).scalars().first()
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found.")
+        etag = collection_etag(f"pet-overview-{today:%Y%m%d}-{days}", (pet, *pet.treatments, *pet.reminders))
+        return conditional_response(if_none_match, etag, response) or build_overview(pet, today, end)
+    except SQLAlchemyError as e:
+        logger.error(f"Error retrieving pet overview: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+@router.post("/{pet_id}/vaccine-schedule", response_model=VaccineScheduleResult)
+async def create_vaccine_schedule(
+    pet_id: int,
+    target: ScheduleTarget = "treatments",
+    language: str = "en",
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Create the pet's scheduled vaccinations as treatments or reminders, in one multi-row INSERT.
+    - Idempotent: doses that already have a row are skipped, so it can be re-run at any time.
+    """
+    try:
+        pet = await db.get(PetModel, pet_id)
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found.")
+        check_schedulable(pet)
+        result = await materialize_schedule(db, pet, target, language)
+        await db.commit()
+        return result
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error creating vaccine schedule: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
 @router.get("/{pet_id}", response_model=PetResponse)
-def get_pet(pet_id: int, db: Session = Depends(get_db)):
+async def get_pet(
+    pet_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
     """
     Retrieve a pet profile by ID.
     - Returns 404 if the pet does not exist.
+    - Sends a strong ETag; returns 304 if `If-None-Match` matches it.
     """
     try:
-        pet = db.query(PetModel).filter(PetModel.id == pet_id).first()
+        pet = await db.get(PetModel, pet_id)
         if not pet:
             raise HTTPException(status_code=404, detail="Pet not found.")
-        return pet
+        return conditional_response(if_none_match, resource_etag("pet", pet.id, pet.version), response) or pet
     except SQLAlchemyError as e:
         logger.error(f"Error retrieving pet: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
 @router.put("/{pet_id}", response_model=PetResponse)
-def update_pet(pet_id: int, pet: PetUpdate, db: Session = Depends(get_db)):
+async def update_pet(
+    pet_id: int,
+    pet: PetUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_session),
+):
     """
     Update an existing pet profile.
     - Ensures `other_breed` is only used when breed is set to "other".
     - Returns 404 if the pet does not exist.
+    - With `If-Match`, only applies to the listed version(s); returns 412 if the pet changed meanwhile.
+    - Single round trip: UPDATE ... RETURNING.
     - Handles database errors gracefully.
     """
     try:
-        existing_pet = db.query(PetModel).filter(PetModel.id == pet_id).first()
-        if not existing_pet:
-            raise HTTPException(status_code=404, detail="Pet not found.")
-
         if pet.breed == "other" and not pet.other_breed:
             raise HTTPException(status_code=400, detail="When breed is 'other', other_breed must be provided.")
 
         if pet.breed != "other" and pet.other_breed:
             raise HTTPException(status_code=400, detail="other_breed should only be set if breed is 'other'.")
 
-        for key, value in pet.dict(exclude_unset=True).items():
-            setattr(existing_pet, key, value)
+        versions = if_match_versions(if_match, "pet", pet_id)
+        criteria = [PetModel.id == pet_id]
+        statement = (
+            update(PetModel)
+            .where(*criteria, *([PetModel.version.in_(versions)] if versions else []))
+            .values(**column_values(PetModel, pet.model_dump(exclude_unset=True)), version=PetModel.version + 1)
+            .returning(PetModel)
+        )
+        updated_pet = (await db.execute(statement)).scalars().first()
+        if not updated_pet:
+            raise await write_conflict(db, PetModel, criteria, versions, "Pet not found.")
 
-        db.commit()
-        db.refresh(existing_pet)
-        return existing_pet
+        await db.commit()
+        response.headers["ETag"] = resource_etag("pet", updated_pet.id, updated_pet.version)
+        return updated_pet
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating pet: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
 @router.delete("/{pet_id}")
-def delete_pet(pet_id: int, db: Session = Depends(get_db)):
+async def delete_pet(pet_id: int, db: AsyncSession = Depends(get_session)):
     """
     Delete a pet profile by ID.
     - Returns 404 if the pet does not exist.
+    - Single round trip: DELETE ... RETURNING.
     - Handles database errors gracefully.
     """
     try:
-        pet = db.query(PetModel).filter(PetModel.id == pet_id).first()
-        if not pet:
+        deleted_id = (
+            await db.execute(delete(PetModel).where(PetModel.id == pet_id).returning(PetModel.id))
+        ).scalar_one_or_none()
+        if deleted_id is None:
             raise HTTPException(status_code=404, detail="Pet not found.")
 
-        db.delete(pet)
-        db.commit()
+        await db.commit()
         return {"message": "Pet deleted successfully"}
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting pet: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
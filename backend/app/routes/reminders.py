@@ -1,13 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Body, Header, Response
+from typing import Any, Dict, List, Optional
+from sqlalchemy import update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from app.models import Reminder
-from app.schemas import ReminderCreate, ReminderUpdate, ReminderResponse
-from app.database import get_db
+from app.models import Reminder, Pet
+from app.schemas import (
+    ReminderCreate, ReminderUpdate, ReminderBulkUpdate, ReminderResponse, ReminderPage, ReminderOccurrence,
+    BulkDelete, BulkResult,
+)
+from app.database import get_session, get_read_session
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, paginate
+from app.queries import reminders_for_pet, upcoming_reminders, reset_dispatch_state
+from app.recurrence import reminder_occurrences
+from app.bulk import check_batch_size, validate_items, create_many, update_many, delete_many, summarize
+from app.etags import resource_etag, page_etag, conditional_response, if_match_versions, write_conflict
+from app.ics_feed import reminder_event, single_event_calendar, MEDIA_TYPE
 import logging
-from ics import Calendar, Event
 import datetime
-import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -15,110 +24,224 @@ router = APIRouter()
 
 
 @router.post("/", response_model=ReminderResponse)
-def create_reminder(reminder: ReminderCreate, db: Session = Depends(get_db)):
+async def create_reminder(reminder: ReminderCreate, db: AsyncSession = Depends(get_session)):
     """
     Create a new reminder.
     - Handles database errors gracefully.
     """
     try:
-        db_reminder = Reminder(**reminder.dict())
+        db_reminder = Reminder(**reminder.model_dump())
         db.add(db_reminder)
-        db.commit()
-        db.refresh(db_reminder)
+        await db.commit()
+        await db.refresh(db_reminder)
         return db_reminder
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating reminder: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_reminders(items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_session)):
+    """
+    Create many reminders in one transaction.
+    - Invalid items or unknown pets are reported per item.
+    - Valid items are written with one multi-row INSERT.
+    """
+    check_batch_size(items)
+    valid, results = validate_items(items, ReminderCreate)
+    try:
+        results += await create_many(db, Reminder, valid, Pet.id, "pet_id", "Pet not found.")
+        await db.commit()
+        return summarize(results)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error bulk creating reminders: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+
+@router.put("/bulk", response_model=BulkResult)
+async def bulk_update_reminders(items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_session)):
+    """
+    Update many reminders in one transaction.
+    - Each item carries its `id` plus the fields to change.
+    - Unknown ids and invalid items are reported per item.
+    """
+    check_batch_size(items)
+    valid, results = validate_items(items, ReminderBulkUpdate)
+    try:
+        results += await update_many(db, Reminder, valid, "Reminder not found", reset_dispatch_state)
+        await db.commit()
+        return summarize(results)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error bulk updating reminders: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+
+@router.post("/bulk/delete", response_model=BulkResult)
+async def bulk_delete_reminders(request: BulkDelete, db: AsyncSession = Depends(get_session)):
+    """
+    Delete many reminders in one statement.
+    - Unknown ids are reported per item.
+    """
+    check_batch_size(request.ids)
+    try:
+        results = await delete_many(db, Reminder, request.ids, "Reminder not found")
+        await db.commit()
+        return summarize(results)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error bulk deleting reminders: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+
+@router.get("/", response_model=ReminderPage)
+async def list_reminders(
+    pet_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    List a pet's reminders ordered by due date.
+    - Keyset pagination: pass the previous page's `next_cursor` as `cursor`.
+    - Returns 304 if `If-None-Match` matches the page's ETag.
+    """
+    after = tuple(decode_cursor(cursor, (datetime.date, int))) if cursor else None
+    try:
+        reminders = (await db.execute(reminders_for_pet(pet_id, after).limit(limit + 1))).scalars().all()
+        page = paginate(reminders, limit, lambda reminder: (reminder.due_date, reminder.id))
+        return conditional_response(if_none_match, page_etag("reminders", page, limit), response) or page
+    except SQLAlchemyError as e:
+        logger.error(f"Error listing reminders: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+
+@router.get("/occurrences", response_model=List[ReminderOccurrence])
+async def list_reminder_occurrences(
+    pet_id: int,
+    start: Optional[datetime.date] = None,
+    days: int = Query(90, ge=1, le=366),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    List a pet's reminder dates within [start, start + days), defaulting to today.
+    - Recurring reminders are expanded into one entry per occurrence; nothing is stored per occurrence.
+    """
+    start = start or datetime.date.today()
+    end = start + datetime.timedelta(days=days - 1)
+    try:
+        reminders = (await db.execute(upcoming_reminders([pet_id], start, end))).scalars().all()
+        return reminder_occurrences(reminders, start, end)
+    except SQLAlchemyError as e:
+        logger.error(f"Error listing reminder occurrences: {str(e)}")
+        raise HTTPException(status_code=500, detail="Database error occurred.")
+
+
 @router.get("/{reminder_id}", response_model=ReminderResponse)
-def get_reminder(reminder_id: int, db: Session = Depends(get_db)):
+async def get_reminder(
+    reminder_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
     """
     Retrieve a specific reminder by ID.
     - Returns 404 if the reminder does not exist.
+    - Sends a strong ETag; returns 304 if `If-None-Match` matches it.
     """
     try:
-        reminder = db.query(Reminder).filter(Reminder.id == reminder_id).first()
+        reminder = await db.get(Reminder, reminder_id)
         if not reminder:
             raise HTTPException(status_code=404, detail="Reminder not found")
-        return reminder
+        etag = resource_etag("reminder", reminder.id, reminder.version)
+        return conditional_response(if_none_match, etag, response) or reminder
     except SQLAlchemyError as e:
         logger.error(f"Error retrieving reminder: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
 
 @router.put("/{reminder_id}", response_model=ReminderResponse)
-def update_reminder(reminder_id: int, reminder_update: ReminderUpdate, db: Session = Depends(get_db)):
+async def update_reminder(
+    reminder_id: int,
+    reminder_update: ReminderUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_session),
+):
     """
     Update an existing reminder.
     - Returns 404 if the reminder does not exist.
+    - With `If-Match`, only applies to the listed version(s); returns 412 if the reminder changed meanwhile.
+    - Single round trip: UPDATE ... RETURNING.
     - Handles database errors gracefully.
     """
     try:
-        reminder = db.query(Reminder).filter(Reminder.id == reminder_id).first()
+        versions = if_match_versions(if_match, "reminder", reminder_id)
+        criteria = [Reminder.id == reminder_id]
+        values = reminder_update.model_dump(exclude_unset=True)
+        statement = (
+            update(Reminder)
+            .where(*criteria, *([Reminder.version.in_(versions)] if versions else []))
+            .values(**values, **reset_dispatch_state(values), version=Reminder.version + 1)
+            .returning(Reminder)
+        )
+        reminder = (await db.execute(statement)).scalars().first()
         if not reminder:
-            raise HTTPException(status_code=404, detail="Reminder not found")
-
-        for key, value in reminder_update.dict(exclude_unset=True).items():
-            setattr(reminder, key, value)
+            raise await write_conflict(db, Reminder, criteria, versions, "Reminder not found")
 
-        db.commit()
-        db.refresh(reminder)
+        await db.commit()
+        response.headers["ETag"] = resource_etag("reminder", reminder.id, reminder.version)
         return reminder
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating reminder: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
 
 @router.delete("/{reminder_id}")
-def delete_reminder(reminder_id: int, db: Session = Depends(get_db)):
+async def delete_reminder(reminder_id: int, db: AsyncSession = Depends(get_session)):
     """
     Delete a reminder.
     - Returns 404 if the reminder does not exist.
+    - Single round trip: DELETE ... RETURNING.
     - Handles database errors gracefully.
     """
     try:
-        reminder = db.query(Reminder).filter(Reminder.id == reminder_id).first()
-        if not reminder:
+        deleted_id = (
+            await db.execute(delete(Reminder).where(Reminder.id == reminder_id).returning(Reminder.id))
+        ).scalar_one_or_none()
+        if deleted_id is None:
             raise HTTPException(status_code=404, detail="Reminder not found")
 
-        db.delete(reminder)
-        db.commit()
+        await db.commit()
         return {"message": "Reminder deleted successfully"}
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting reminder: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
 
 
 @router.get("/{reminder_id}/export")
-def export_reminder_to_ics(reminder_id: int, db: Session = Depends(get_db)):
+async def export_reminder_to_ics(reminder_id: int, db: AsyncSession = Depends(get_read_session)):
     """
-    Export a reminder to an .ics file for calendar integration.
+    Export a reminder as an .ics calendar for calendar integration.
     - Returns 404 if the reminder does not exist.
-    - Uses a temporary file for better file handling.
+    - For a calendar that stays up to date, subscribe to `/calendar/pets/{pet_id}.ics` instead.
     """
     try:
-        reminder = db.query(Reminder).filter(Reminder.id == reminder_id).first()
+        reminder = await db.get(Reminder, reminder_id)
         if not reminder:
             raise HTTPException(status_code=404, detail="Reminder not found")
 
-        # Create an ICS calendar event
-        calendar = Calendar()
-        event = Event()
-        event.name = reminder.title
-        event.description = reminder.description or "No description provided."
-        event.begin = reminder.due_date.isoformat()
-        calendar.events.add(event)
-
-        # Save the file to a temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".ics") as temp_file:
-            temp_file.writelines(calendar.serialize().encode("utf-8"))
-            temp_filepath = temp_file.name
-
-        return {"message": "ICS file generated", "file_path": temp_filepath}
+        return Response(
+            content=single_event_calendar(reminder.title, reminder_event(reminder)),
+            media_type=MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="reminder_{reminder_id}.ics"'},
+        )
     except SQLAlchemyError as e:
         logger.error(f"Error exporting reminder to ICS: {str(e)}")
         raise HTTPException(status_code=500, detail="Database error occurred.")
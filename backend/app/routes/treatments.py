@@ -1,89 +1,174 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.models import Treatment
-from app.schemas import TreatmentCreate, TreatmentUpdate, TreatmentResponse
-from app.database import get_db
-from typing import List
-import os
-from ics import Calendar, Event
+from fastapi import APIRouter, HTTPException, Depends, Query, Body, Header, Response
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Treatment, Pet
+from app.schemas import (
+    TreatmentCreate, TreatmentUpdate, TreatmentBulkUpdate, TreatmentResponse, TreatmentPage, BulkDelete, BulkResult
+)
+from app.database import get_session, get_read_session
+from app.queries import treatments_for_pet
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, paginate
+from app.bulk import check_batch_size, validate_items, create_many, update_many, delete_many, summarize
+from app.etags import resource_etag, page_etag, conditional_response, if_match_versions, write_conflict
+from app.ics_feed import treatment_event, single_event_calendar, MEDIA_TYPE
+from typing import Any, Dict, List, Optional
 import datetime
 
 router = APIRouter()
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_treatments(items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_session)):
+    """
+    Create many treatments, possibly for different pets, in one transaction.
+    - Invalid items or unknown pets are reported per item.
+    """
+    check_batch_size(items)
+    valid, results = validate_items(items, TreatmentCreate)
+    results += await create_many(db, Treatment, valid, Pet.id, "pet_id", "Pet not found")
+    await db.commit()
+    return summarize(results)
+
+
+@router.put("/bulk", response_model=BulkResult)
+async def bulk_update_treatments(items: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_session)):
+    """
+    Update many treatments in one transaction.
+    - Each item carries its `id` plus the fields to change.
+    """
+    check_batch_size(items)
+    valid, results = validate_items(items, TreatmentBulkUpdate)
+    results += await update_many(db, Treatment, valid, "Treatment not found")
+    await db.commit()
+    return summarize(results)
+
+
+@router.post("/bulk/delete", response_model=BulkResult)
+async def bulk_delete_treatments(request: BulkDelete, db: AsyncSession = Depends(get_session)):
+    """
+    Delete many treatments in one statement.
+    """
+    check_batch_size(request.ids)
+    results = await delete_many(db, Treatment, request.ids, "Treatment not found")
+    await db.commit()
+    return summarize(results)
+
+
 @router.post("/pets/{pet_id}/treatments", response_model=TreatmentResponse)
-def create_treatment(pet_id: int, treatment: TreatmentCreate, db: Session = Depends(get_db)):
+async def create_treatment(pet_id: int, treatment: TreatmentCreate, db: AsyncSession = Depends(get_session)):
     """
     Create a new treatment for a specific pet.
     """
-    new_treatment = Treatment(**treatment.model_dump(), pet_id=pet_id)
+    new_treatment = Treatment(**treatment.model_dump(exclude={"pet_id"}), pet_id=pet_id)
     db.add(new_treatment)
-    db.commit()
-    db.refresh(new_treatment)
+    await db.commit()
+    await db.refresh(new_treatment)
     return new_treatment
 
 
-@router.get("/pets/{pet_id}/treatments", response_model=List[TreatmentResponse])
-def get_treatments(pet_id: int, db: Session = Depends(get_db)):
+@router.get("/pets/{pet_id}/treatments", response_model=TreatmentPage)
+async def get_treatments(
+    pet_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
+    """
+    Retrieve a page of treatments for a given pet, soonest due first.
+    - Keyset pagination: pass the previous page's `next_cursor` as `cursor`.
+    - Returns 304 if `If-None-Match` matches the page's ETag.
     """
-    Retrieve all treatments for a given pet.
+    after = tuple(decode_cursor(cursor, (datetime.date, int))) if cursor else None
+    treatments = (await db.execute(treatments_for_pet(pet_id, after).limit(limit + 1))).scalars().all()
+    page = paginate(treatments, limit, lambda treatment: (treatment.next_due_date, treatment.id))
+    return conditional_response(if_none_match, page_etag("treatments", page, limit), response) or page
+
+
+@router.get("/pets/{pet_id}/treatments/{treatment_id}", response_model=TreatmentResponse)
+async def get_treatment(
+    pet_id: int,
+    treatment_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_session),
+):
     """
-    treatments = db.query(Treatment).filter(Treatment.pet_id == pet_id).all()
-    return treatments
+    Retrieve a specific treatment for a pet.
+    - Sends a strong ETag; returns 304 if `If-None-Match` matches it.
+    """
+    treatment = (
+        await db.execute(select(Treatment).where(Treatment.id == treatment_id, Treatment.pet_id == pet_id))
+    ).scalars().first()
+    if not treatment:
+        raise HTTPException(status_code=404, detail="Treatment not found")
+    etag = resource_etag("treatment", treatment.id, treatment.version)
+    return conditional_response(if_none_match, etag, response) or treatment
 
 
 @router.put("/pets/{pet_id}/treatments/{treatment_id}", response_model=TreatmentResponse)
-def update_treatment(pet_id: int, treatment_id: int, treatment_update: TreatmentUpdate, db: Session = Depends(get_db)):
+async def update_treatment(
+    pet_id: int,
+    treatment_id: int,
+    treatment_update: TreatmentUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_session),
+):
     """
-    Update a specific treatment for a pet.
+    Update a specific treatment for a pet with a single UPDATE ... RETURNING.
+    - With `If-Match`, only applies to the listed version(s); returns 412 if the treatment changed meanwhile.
     """
-    treatment = db.query(Treatment).filter(Treatment.id == treatment_id, Treatment.pet_id == pet_id).first()
+    versions = if_match_versions(if_match, "treatment", treatment_id)
+    criteria = [Treatment.id == treatment_id, Treatment.pet_id == pet_id]
+    statement = (
+        update(Treatment)
+        .where(*criteria, *([Treatment.version.in_(versions)] if versions else []))
+        .values(**treatment_update.model_dump(exclude_unset=True), version=Treatment.version + 1)
+        .returning(Treatment)
+    )
+    treatment = (await db.execute(statement)).scalars().first()
     if not treatment:
-        raise HTTPException(status_code=404, detail="Treatment not found")
+        raise await write_conflict(db, Treatment, criteria, versions, "Treatment not found")
 
-    for key, value in treatment_update.model_dump(exclude_unset=True).items():
-        setattr(treatment, key, value)
-
-    db.commit()
-    db.refresh(treatment)
+    await db.commit()
+    response.headers["ETag"] = resource_etag("treatment", treatment.id, treatment.version)
     return treatment
 
 
 @router.delete("/pets/{pet_id}/treatments/{treatment_id}")
-def delete_treatment(pet_id: int, treatment_id: int, db: Session = Depends(get_db)):
+async def delete_treatment(pet_id: int, treatment_id: int, db: AsyncSession = Depends(get_session)):
     """
-    Delete a specific treatment for a pet.
+    Delete a specific treatment for a pet with a single DELETE ... RETURNING.
     """
-    treatment = db.query(Treatment).filter(Treatment.id == treatment_id, Treatment.pet_id == pet_id).first()
-    if not treatment:
+    statement = (
+        delete(Treatment)
+        .where(Treatment.id == treatment_id, Treatment.pet_id == pet_id)
+        .returning(Treatment.id)
+    )
+    if (await db.execute(statement)).scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Treatment not found")
 
-    db.delete(treatment)
-    db.commit()
+    await db.commit()
     return {"detail": "Treatment deleted"}
 
 
 @router.get("/pets/{pet_id}/treatments/{treatment_id}/export")
-def export_treatment_to_ics(pet_id: int, treatment_id: int, db: Session = Depends(get_db)):
+async def export_treatment_to_ics(pet_id: int, treatment_id: int, db: AsyncSession = Depends(get_read_session)):
     """
-    Export a treatment schedule as an .ics file for calendar integration.
+    Export a treatment schedule as an .ics calendar for calendar integration.
+    - The event is placed on the next due date, or today if the treatment has none.
     """
-    treatment = db.query(Treatment).filter(Treatment.id == treatment_id, Treatment.pet_id == pet_id).first()
+    treatment = (
+        await db.execute(select(Treatment).where(Treatment.id == treatment_id, Treatment.pet_id == pet_id))
+    ).scalars().first()
     if not treatment:
         raise HTTPException(status_code=404, detail="Treatment not found")
 
-    # Create an ICS calendar event
-    calendar = Calendar()
-    event = Event()
-    event.name = treatment.name
-    event.description = treatment.description
-    event.begin = treatment.due_date.isoformat() if treatment.due_date else datetime.datetime.now().isoformat()
-    calendar.events.add(event)
-
-    # Save the file to a temporary location
-    filename = f"treatment_{treatment_id}.ics"
-    filepath = os.path.join("/tmp", filename)
-    with open(filepath, "w") as file:
-        file.writelines(calendar.serialize())
-
-    return {"detail": f"ICS file created at {filepath}"}
+    fragment = treatment_event(treatment, day=treatment.next_due_date or datetime.date.today())
+    return Response(
+        content=single_event_calendar(treatment.name, fragment),
+        media_type=MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="treatment_{treatment_id}.ics"'},
+    )
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, EmailStr, HttpUrl, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, HttpUrl, computed_field, field_validator, model_validator
 from typing import Optional, List
-from datetime import date
+from typing_extensions import TypedDict
+from datetime import date, datetime
+from pydantic.json_schema import SkipJsonSchema
+from app.recurrence import normalize_recurrence, parse_recurrence
 
 
 # User Schemas
@@ -19,8 +22,7 @@ class UserLogin(UserBase):
 class UserResponse(UserBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Pet Schemas
@@ -35,35 +37,32 @@ class PetBase(BaseModel):
     behavior_issues: Optional[List[str]] = []
     pet_image_url: Optional[HttpUrl] = None
 
-    @validator("type")
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("type")
+    @classmethod
     def validate_pet_type(cls, value):
         valid_types = {"dog", "cat", "other"}
         if value.lower() not in valid_types:
             raise ValueError(f"Pet type must be one of {valid_types}.")
         return value
 
-    @validator("breed", always=True)
-    def validate_breed(cls, value, values):
-        if "type" in values and values["type"].lower() == "other":
-            return "other"
-        return value
-
-    @validator("other_breed", always=True)
-    def validate_other_breed(cls, value, values):
-        if values.get("breed") == "other" and not value:
-            raise ValueError("When breed is 'other', other_breed must be provided.")
-        if values.get("breed") != "other" and value:
-            raise ValueError("other_breed should only be set if breed is 'other'.")
-        return value
-
-    @validator("weight", always=True)
+    @field_validator("weight")
+    @classmethod
     def validate_weight(cls, value):
         if value is not None and value <= 0:
             raise ValueError("Weight must be greater than 0.")
         return value
 
-    class Config:
-        orm_mode = True
+    @model_validator(mode="after")
+    def validate_breed(self):
+        if self.type.lower() == "other":
+            self.breed = "other"
+        if self.breed == "other" and not self.other_breed:
+            raise ValueError("When breed is 'other', other_breed must be provided.")
+        if self.breed != "other" and self.other_breed:
+            raise ValueError("other_breed should only be set if breed is 'other'.")
+        return self
 
 
 class PetCreate(PetBase):
@@ -74,12 +73,22 @@ class PetUpdate(PetBase):
     pass
 
 
+class PetBulkUpdate(PetUpdate):
+    id: int
+
+
 class PetResponse(PetBase):
     id: int
     owner_id: int
+    version: int
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 
-    class Config:
-        orm_mode = True
+class PetPage(BaseModel):
+    items: List[PetResponse]
+    next_cursor: Optional[str] = None
 
 
 # Treatment Schemas
@@ -90,20 +99,51 @@ class TreatmentBase(BaseModel):
     next_due_date: Optional[date] = None
 
 
-class TreatmentCreate(TreatmentBase):
+class TreatmentWrite(TreatmentBase):
+    # Parsed from `frequency`; never taken from the request
+    frequency_count: SkipJsonSchema[Optional[int]] = None
+    frequency_unit: SkipJsonSchema[Optional[str]] = None
+
+    @model_validator(mode="after")
+    def parse_frequency(self):
+        try:
+            interval = parse_recurrence(self.frequency)
+        except ValueError:
+            # Free text such as "as needed" is kept as written, without an interval; rollover skips it
+            interval = None
+        self.frequency_count, self.frequency_unit = interval or (None, None)
+        if "frequency" not in self.model_fields_set:
+            # A partial update that leaves the frequency alone leaves its interval alone too
+            self.model_fields_set.difference_update({"frequency_count", "frequency_unit"})
+        return self
+
+
+class TreatmentCreate(TreatmentWrite):
     pet_id: int
 
 
-class TreatmentUpdate(TreatmentBase):
+class TreatmentUpdate(TreatmentWrite):
     pass
 
 
+class TreatmentBulkUpdate(TreatmentUpdate):
+    id: int
+
+
 class TreatmentResponse(TreatmentBase):
     id: int
     pet_id: int
+    frequency_count: Optional[int] = None
+    frequency_unit: Optional[str] = None
+    version: int
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+
+class TreatmentPage(BaseModel):
+    items: List[TreatmentResponse]
+    next_cursor: Optional[str] = None
 
 
 # Reminder Schemas
@@ -111,19 +151,105 @@ class ReminderBase(BaseModel):
     title: str
     description: Optional[str] = None
     due_date: date
+    recurrence: Optional[str] = None  # RRULE subset or interval such as "2 months"; stored as an RRULE
+
+    @field_validator("recurrence")
+    @classmethod
+    def validate_recurrence(cls, value):
+        return normalize_recurrence(value)
+
 
+class ReminderWrite(ReminderBase):
+    @computed_field
+    @property
+    def recurrence_start(self) -> date:
+        # Anchor of the series; the dispatcher later moves due_date on to the next occurrence
+        return self.due_date
 
-class ReminderCreate(ReminderBase):
+
+class ReminderCreate(ReminderWrite):
     pet_id: int
 
 
-class ReminderUpdate(ReminderBase):
+class ReminderUpdate(ReminderWrite):
     pass
 
 
+class ReminderBulkUpdate(ReminderUpdate):
+    id: int
+
+
 class ReminderResponse(ReminderBase):
     id: int
     pet_id: int
+    recurrence_start: Optional[date] = None
+    version: int
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReminderPage(BaseModel):
+    items: List[ReminderResponse]
+    next_cursor: Optional[str] = None
+
+
+class ReminderOccurrence(BaseModel):
+    reminder_id: int
+    pet_id: int
+    title: str
+    description: Optional[str] = None
+    date: date
+    recurring: bool
+
+
+# Bulk Schemas
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+
+class BulkItemResult(BaseModel):
+    index: int  # Position of the item in the request
+    success: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# Overview Schemas
+class PetOverview(PetResponse):
+    # Only the treatments and reminders due within the requested window
+    treatments: List[TreatmentResponse] = []
+    reminders: List[ReminderResponse] = []
+    # Reminders expanded into their dates within the window, recurring ones once per occurrence
+    occurrences: List[ReminderOccurrence] = []
+
+
+class OwnerOverview(BaseModel):
+    owner_id: int
+    pets: List[PetOverview]
+
+
+# Vaccine Schemas
+class VaccineScheduleItem(TypedDict):
+    # A TypedDict rather than a model: batch schedules validate up to 100k of these per request
+    pet_type: str
+    birth_date: date
+
+
+# Breed Schemas
+class WeightCheckItem(TypedDict):
+    # A TypedDict rather than a model: batch weight checks validate thousands of these per request
+    breed: str
+    weight: float
+
 
-    class Config:
-        orm_mode = True
+class VaccineScheduleResult(BaseModel):
+    target: str  # "treatments" or "reminders"
+    created: List[int]  # IDs of the rows created
+    skipped: int  # Scheduled doses that already had a row
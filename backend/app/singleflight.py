@@ -0,0 +1,58 @@
+"""
+Per-key request coalescing ("single-flight") for asyncio.
+
+While a call for a key is in flight, later callers for the same key await its result instead
+of starting their own, so a burst of identical cache misses costs one upstream request. Nothing
+is remembered once the call completes; caching is the caller's job.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls per key within one event loop.
+    - The first caller (the leader) runs the call; the others share its result or exception.
+    - A cancelled waiter does not cancel the call; it is only cancelled with the leader.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"calls": 0, "leaders": 0, "shared": 0}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        self.stats["calls"] += 1
+        future = self._calls.get(key)
+        if future is not None:
+            self.stats["shared"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats["leaders"] += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Mark it retrieved so asyncio does not log it when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def snapshot(self) -> dict:
+        return {"in_flight": self.in_flight(), **self.stats}
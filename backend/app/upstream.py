@@ -0,0 +1,242 @@
+"""
+Outbound calls to third-party APIs (The Dog API, The Cat API) with per-host resilience.
+
+Every call goes through the shared pooled client (`app.clients`) under its host's `HostPolicy`:
+- a deadline for the whole call, retries included, so a slow host holds a request for at most
+  `deadline` seconds instead of the client timeout times the attempts;
+- bounded retries of idempotent requests on connection errors, timeouts, 429 and 5xx, with full
+  jitter backoff (a random sleep up to `backoff * 2 ** attempt`);
+- a circuit breaker: after `failures` consecutive failed attempts the host is skipped for
+  `reset_seconds`, and calls fail fast with `CircuitOpen` so callers fall back to cached or stale
+  data. One trial call is then let through; it closes the circuit again or re-opens it;
+- optional hedging of GET requests: if no response arrived after `hedge_delay` seconds a second,
+  identical request is sent and the first response wins, trimming tail latency.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+import httpx
+from app.clients import get_http_client
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_DEADLINE_SECONDS = float(os.getenv("UPSTREAM_DEADLINE_SECONDS", 3))
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", 2))
+UPSTREAM_BACKOFF_SECONDS = float(os.getenv("UPSTREAM_BACKOFF_SECONDS", 0.1))
+UPSTREAM_BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", 5))
+UPSTREAM_BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", 30))
+UPSTREAM_HEDGE_DELAY_SECONDS = float(os.getenv("UPSTREAM_HEDGE_DELAY_SECONDS", 0))  # 0 disables hedging
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class HostPolicy(NamedTuple):
+    deadline: float = UPSTREAM_DEADLINE_SECONDS
+    retries: int = UPSTREAM_RETRIES
+    backoff: float = UPSTREAM_BACKOFF_SECONDS
+    failures: int = UPSTREAM_BREAKER_FAILURES  # Consecutive failed attempts that open the circuit
+    reset_seconds: float = UPSTREAM_BREAKER_RESET_SECONDS
+    hedge_delay: float = UPSTREAM_HEDGE_DELAY_SECONDS
+
+
+class CircuitOpen(httpx.TransportError):
+    """
+    Raised without calling the host while its circuit is open.
+    """
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """
+    Raised when a call, retries included, did not finish within its host's deadline.
+    """
+
+
+def is_retryable(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one host: closed -> open -> half-open -> closed.
+    """
+
+    def __init__(self, failures: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self.stats = {"opened": 0, "rejected": 0}
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if self.clock() - self.opened_at < self.reset_seconds:
+                self.stats["rejected"] += 1
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            # Only one trial call at a time
+            if self._trial_running:
+                self.stats["rejected"] += 1
+                return False
+            self._trial_running = True
+        return True
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_running = False
+
+    def abandon(self):
+        # A call ended without an outcome (cancelled); let the next one be the trial
+        self._trial_running = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_running = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failures:
+            if self.state != "open":
+                self.stats["opened"] += 1
+                logger.warning(f"Circuit opened after {self.consecutive_failures} consecutive failures")
+            self.state = "open"
+            self.opened_at = self.clock()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.consecutive_failures, **self.stats}
+
+
+class Upstream:
+    """
+    Resilient outbound HTTP calls; see the module docstring.
+    - `policies` overrides the default policy per host name.
+    - `client`, `clock` and `sleep` are injectable for tests.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, HostPolicy]] = None,
+        default: HostPolicy = HostPolicy(),
+        client: Callable[[], httpx.AsyncClient] = get_http_client,
+        clock: Callable[[], float] = time.monotonic,
+        sleep=asyncio.sleep,
+    ):
+        self.policies = dict(policies or {})
+        self.default = default
+        self.client = client
+        self.clock = clock
+        self.sleep = sleep
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def policy(self, host: str) -> HostPolicy:
+        return self.policies.get(host, self.default)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._breakers:
+            policy = self.policy(host)
+            self._breakers[host] = CircuitBreaker(policy.failures, policy.reset_seconds, self.clock)
+        return self._breakers[host]
+
+    def _count(self, host: str, name: str):
+        host_stats = self.stats.setdefault(
+            host, {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "hedged": 0, "deadline_exceeded": 0}
+        )
+        host_stats[name] += 1
+
+    async def _send(self, host: str, method: str, url: str, hedge_delay: float, **kwargs) -> httpx.Response:
+        """
+        One attempt; with hedging, up to two identical requests of which the first response wins.
+        """
+        self._count(host, "attempts")
+        first = asyncio.ensure_future(self.client().request(method, url, **kwargs))
+        requests = [first]
+        try:
+            if not hedge_delay or method not in IDEMPOTENT_METHODS:
+                return await first
+            done, _ = await asyncio.wait(requests, timeout=hedge_delay)
+            if done:
+                return first.result()
+
+            self._count(host, "hedged")
+            requests.append(asyncio.ensure_future(self.client().request(method, url, **kwargs)))
+            pending = set(requests)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for request in done:
+                    if request.exception() is None:
+                        return request.result()
+            # Both failed: report the original request's error
+            return first.result()
+        finally:
+            # The losing request, or both when the deadline cancelled the attempt
+            for request in requests:
+                if not request.done():
+                    request.cancel()
+
+    async def _attempts(
+        self, host: str, policy: HostPolicy, breaker: CircuitBreaker, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        retries = policy.retries if method in IDEMPOTENT_METHODS else 0
+        for attempt in range(retries + 1):
+            if attempt:
+                self._count(host, "retries")
+                await self.sleep(random.uniform(0, policy.backoff * 2 ** (attempt - 1)))
+            # No retry once the failures opened the circuit: the last outcome stands
+            last_attempt = attempt == retries
+            try:
+                response = await self._send(host, method, url, policy.hedge_delay, **kwargs)
+            except httpx.TransportError:
+                breaker.record_failure()
+                self._count(host, "failures")
+                if last_attempt or not breaker.allow():
+                    raise
+                continue
+            if not is_retryable(response):
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            self._count(host, "failures")
+            if last_attempt or not breaker.allow():
+                return response
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request under its host's policy; error statuses are returned, as with httpx.
+        - Raises `CircuitOpen` without calling an unhealthy host and `DeadlineExceeded` past the deadline.
+        """
+        method = method.upper()
+        host = urlsplit(url).hostname or ""
+        policy = self.policy(host)
+        breaker = self.breaker(host)
+        self._count(host, "calls")
+        if not breaker.allow():
+            raise CircuitOpen(f"Circuit open for {host}")
+        try:
+            async with asyncio.timeout(policy.deadline):
+                return await self._attempts(host, policy, breaker, method, url, **kwargs)
+        except TimeoutError:
+            breaker.record_failure()
+            self._count(host, "deadline_exceeded")
+            raise DeadlineExceeded(f"{method} {url} took longer than {policy.deadline}s")
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def snapshot(self) -> dict:
+        return {
+            host: {**self.stats.get(host, {}), "circuit": breaker.snapshot(), "policy": self.policy(host)._asdict()}
+            for host, breaker in self._breakers.items()
+        }
+
+
+# Process-wide outbound layer for the breed APIs
+upstream = Upstream()
@@ -1,9 +1,14 @@
 import os
-import requests
+import logging
+import httpx
 from dotenv import load_dotenv
-from functools import lru_cache
-from typing import Optional
-from fastapi import HTTPException
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+from app.breeds.catalog import catalog as breed_catalog
+from app.breeds.growth import expected_weight_range
+from app.breeds.weights import weight_ranges
+from app.cache import TieredCache
+from app.upstream import HostPolicy, upstream
 
 
 # Load environment variables from .env
@@ -13,9 +18,28 @@ load_dotenv()
 DOG_API_URL = "https://api.thedogapi.com/v1"
 API_KEY = os.getenv("DOG_API_KEY")
 
-def make_api_call(endpoint: str, params: dict = None) -> dict:
+# Gemini service, asked for puppy weight ranges the growth curves do not cover
+GEMINI_SERVICE_URL = os.getenv("GEMINI_SERVICE_URL", "http://gemini-service:8000/query")
+GEMINI_SERVICE_TIMEOUT_SECONDS = float(os.getenv("GEMINI_SERVICE_TIMEOUT_SECONDS", 10))
+LLM_WEIGHT_CACHE_SECONDS = int(os.getenv("LLM_WEIGHT_CACHE_SECONDS", 7 * 86400))
+
+# Gemini answers slowly and a query is not safe to repeat: one attempt under its own deadline
+upstream.policies.setdefault(
+    urlsplit(GEMINI_SERVICE_URL).hostname, HostPolicy(deadline=GEMINI_SERVICE_TIMEOUT_SECONDS, retries=0)
+)
+
+# Gemini weight ranges per (pet type, breed, age); failures are not cached
+llm_weight_cache = TieredCache("llm-weights", ttl=LLM_WEIGHT_CACHE_SECONDS, local_size=1024)
+
+# What a young animal of each pet type is called in prompts
+YOUNG_ANIMALS = {"dog": "puppy", "cat": "kitten"}
+
+logger = logging.getLogger(__name__)
+
+async def make_api_call(endpoint: str, params: dict = None) -> dict:
     """
     Generic function to make API calls to The Dog API.
+    Calls go through the shared outbound layer (app/upstream.py): deadline, retries and circuit breaker.
     Args:
         endpoint (str): The API endpoint (e.g., '/breeds').
         params (dict): Query parameters for the API call.
@@ -24,89 +48,90 @@ def make_api_call(endpoint: str, params: dict = None) -> dict:
     """
     headers = {"x-api-key": API_KEY}  # API key in headers
     try:
-        response = requests.get(f"{DOG_API_URL}{endpoint}", headers=headers, params=params)
+        response = await upstream.get(f"{DOG_API_URL}{endpoint}", headers=headers, params=params)
         response.raise_for_status()  # Raise HTTP errors
         return response.json()
-    except requests.exceptions.HTTPError as http_err:
+    except httpx.HTTPStatusError as http_err:
         return {"error": f"HTTP error occurred: {http_err}"}
-    except requests.exceptions.RequestException as req_err:
+    except httpx.RequestError as req_err:
         return {"error": f"Request error occurred: {req_err}"}
 
-@lru_cache(maxsize=100)
-def fetch_all_breeds():
+def fetch_all_breeds(pet_type: str = "dog"):
     """
-    Fetch all breeds from the API and cache the result.
+    Fetch all breeds from the local breed catalog (see app/breeds/catalog.py).
     Returns:
-        list: A list of all breeds, or an empty list if the API call fails.
+        list: A list of all breeds, or an empty list if the catalog is not loaded yet.
     """
-    headers = {"x-api-key": API_KEY}
-    try:
-        response = requests.get(f"{DOG_API_URL}/breeds", headers=headers)
-        response.raise_for_status()
-        return response.json()  # Cache this result
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching breeds: {e}")
-        return []
+    return breed_catalog.breeds(pet_type)
 
-def validate_weight(breed: str, weight: float, age: Optional[int] = None, is_puppy: bool = False) -> str:
+async def fetch_llm_weight_range(breed: str, age_weeks: int, pet_type: Optional[str] = None) -> Tuple[float, float]:
     """
-    Validates the pet's weight based on its breed and age.
-    If the pet is a puppy, additional logic applies via Gemini.
+    Ask the Gemini service for a young animal's healthy weight range (in kilograms).
+    Only used for breeds the growth curves do not cover; answers are cached, failures raise.
     """
-    # Dummy weight ranges for demonstration; replace with Dog API data.
-    weight_ranges = {
-        "Golden Retriever": (55, 75),
-        "Labrador": (55, 80),
-        # Add other breeds here
-    }
+    young = YOUNG_ANIMALS.get(pet_type, "puppy or kitten")
 
-    if breed not in weight_ranges and not is_puppy:
-        raise HTTPException(status_code=404, detail="Breed weight range not available.")
-
-    if is_puppy:
-        # Query Gemini for puppy-specific ranges
-        response = requests.post(
-            "http://gemini-service:8000/query",
-            json={"prompt": f"What is the healthy weight range for a {age}-month-old {breed} puppy?"},
+    async def ask() -> list:
+        response = await upstream.request(
+            "POST",
+            GEMINI_SERVICE_URL,
+            json={"prompt": f"What is the healthy weight range in kg for a {age_weeks}-week-old {breed} {young}?"},
         )
-        data = response.json()
-        if "weight_range" in data:
-            min_weight, max_weight = map(float, data["weight_range"].split("-"))
-        else:
-            raise HTTPException(status_code=500, detail="Error fetching weight range for puppies.")
-    else:
-        min_weight, max_weight = weight_ranges[breed]
+        response.raise_for_status()
+        return [float(bound) for bound in response.json()["weight_range"].split("-")]
 
-    if weight < min_weight:
-        return "underweight"
-    elif weight > max_weight:
-        return "overweight"
-    return "healthy"
+    min_weight, max_weight = await llm_weight_cache.get_or_load(f"{pet_type}:{breed.lower()}:{age_weeks}", ask)
+    return min_weight, max_weight
 
-def validate_weight(breed: str, weight: float, is_puppy: bool = False) -> Optional[str]:
+async def puppy_weight_range(
+    breed: str, age_weeks: int, pet_type: Optional[str] = None
+) -> Optional[Tuple[float, float]]:
+    """
+    Healthy weight range of a puppy or kitten: from the local growth curves, or else from Gemini.
+    Returns None if neither can tell.
+    """
+    bounds = expected_weight_range(breed, age_weeks, pet_type, ranges=weight_ranges)
+    if bounds is not None:
+        return bounds
+    try:
+        return await fetch_llm_weight_range(breed, age_weeks, pet_type)
+    except (httpx.HTTPError, KeyError, ValueError) as e:
+        logger.warning(f"No weight range for a {age_weeks}-week-old {breed}: {e}")
+        return None
+
+async def validate_weight(
+    breed: str,
+    weight: float,
+    is_puppy: bool = False,
+    age_weeks: Optional[int] = None,
+    pet_type: Optional[str] = None,
+) -> Optional[str]:
     """
     Validates the pet's weight against breed standards.
-    For puppies, defers to Gemini for advice.
+    For puppies, the age in weeks selects the point on the breed's growth curve.
     Returns a notification message if the weight is out of range, otherwise None.
+    Ranges come from the local breed catalog, or from the bundled ranges of common breeds until it is loaded.
     """
-    # Example breed weight ranges (data should come from The Dog API or The Cat API)
-    breed_weight_ranges = {
-        "Golden Retriever": (25.0, 35.0),  # in kilograms
-        "Siamese": (4.0, 6.0),
-        "other": None,  # No weight range for "other"
-    }
+    if breed == "other":
+        return None  # No weight range for "other"
 
     if is_puppy:
-        return "Puppy weight validation requires Gemini assistance."
+        if age_weeks is None:
+            return "Puppy weight validation requires the age in weeks."
+        bounds = await puppy_weight_range(breed, age_weeks, pet_type)
+        subject = f"a {age_weeks}-week-old {breed}"
+    else:
+        # Adult weight ranges (in kilograms) come from the breed catalog, see app/breeds/weights.py
+        bounds = weight_ranges.weight_range(breed, pet_type)
+        subject = breed
 
-    # Check if the breed is supported
-    if breed not in breed_weight_ranges or not breed_weight_ranges[breed]:
+    if bounds is None:
         return None  # Skip validation for unsupported breeds
 
-    min_weight, max_weight = breed_weight_ranges[breed]
+    min_weight, max_weight = bounds
     if weight < min_weight:
-        return f"Underweight: {weight}kg is below the healthy range for {breed} ({min_weight}-{max_weight}kg)."
+        return f"Underweight: {weight}kg is below the healthy range for {subject} ({min_weight}-{max_weight}kg)."
     elif weight > max_weight:
-        return f"Overweight: {weight}kg exceeds the healthy range for {breed} ({min_weight}-{max_weight}kg)."
+        return f"Overweight: {weight}kg exceeds the healthy range for {subject} ({min_weight}-{max_weight}kg)."
 
     return None  # Weight is within the healthy range
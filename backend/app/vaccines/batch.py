@@ -0,0 +1,187 @@
+"""
+Vaccine schedules for many pets at once.
+
+Birth dates are grouped by pet type and every due date of a group is computed with NumPy
+datetime64 arithmetic, one array operation per scheduled dose, following the rules of
+`app.vaccines.schedule`. The results are streamed back as NDJSON, one line per requested pet,
+in request order, and match the single-pet `/vaccines/schedule` endpoint exactly.
+"""
+import json
+import os
+from datetime import date
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+from app.schemas import VaccineScheduleItem
+from app.recurrence import Interval
+from app.vaccines.catalog import ScheduledVaccine, catalog
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Upper bound on pets per request, and pets computed and written per streamed chunk
+VACCINE_SCHEDULE_BATCH_MAX = int(os.getenv("VACCINE_SCHEDULE_BATCH_MAX", 100_000))
+VACCINE_SCHEDULE_CHUNK_SIZE = int(os.getenv("VACCINE_SCHEDULE_CHUNK_SIZE", 10_000))
+
+_items = TypeAdapter(List[VaccineScheduleItem])
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_datetime64(days: List[date]) -> np.ndarray:
+    # Via ordinals: much faster than letting NumPy convert date objects one by one
+    ordinals = np.fromiter((day.toordinal() for day in days), dtype=np.int64, count=len(days))
+    return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def validate_chunk(items: List[Dict[str, Any]]) -> Tuple[list, Dict[int, str]]:
+    """
+    Validate a chunk of items in one call.
+    - Returns (index, item) pairs for valid items and an error message per invalid index.
+    """
+    try:
+        return list(enumerate(_items.validate_python(items))), {}
+    except ValidationError as e:
+        errors: Dict[int, list] = {}
+        for err in e.errors():
+            index, *loc = err["loc"]
+            errors.setdefault(index, []).append(f"{'.'.join(map(str, loc))}: {err['msg']}")
+    indexes = [index for index in range(len(items)) if index not in errors]
+    valid = _items.validate_python([items[index] for index in indexes])
+    return list(zip(indexes, valid)), {index: "; ".join(messages) for index, messages in errors.items()}
+
+
+def add_months(days: np.ndarray, months) -> np.ndarray:
+    """
+    Vectorized `app.recurrence.add_months`: shift by whole months, clamping to the end of shorter months.
+    """
+    month = days.astype("datetime64[M]")
+    day_of_month = (days - month.astype("datetime64[D]")).astype(np.int64)
+    target = month + np.asarray(months, dtype=np.int64).astype("timedelta64[M]")
+    month_length = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    return target.astype("datetime64[D]") + np.minimum(day_of_month, month_length - 1).astype("timedelta64[D]")
+
+
+def occurrence(anchors: np.ndarray, interval: Interval, n) -> np.ndarray:
+    """
+    Vectorized `app.recurrence.occurrence`; `n` may be a scalar or an array.
+    """
+    if interval.unit in ("day", "week"):
+        step = interval.count * (7 if interval.unit == "week" else 1)
+        return anchors + (np.asarray(n, dtype=np.int64) * step).astype("timedelta64[D]")
+    return add_months(anchors, np.asarray(n, dtype=np.int64) * interval.count * (12 if interval.unit == "year" else 1))
+
+
+def next_occurrence(anchors: np.ndarray, interval: Interval, after: np.datetime64) -> np.ndarray:
+    """
+    Vectorized `app.recurrence.next_occurrence`: first occurrence of each series strictly after `after`.
+    """
+    if interval.unit in ("day", "week"):
+        step = interval.count * (7 if interval.unit == "week" else 1)
+        return occurrence(anchors, interval, np.maximum((after - anchors).astype(np.int64) // step + 1, 0))
+
+    # Whole steps that stay within the month of `after`; at most one more step is needed
+    step = interval.count * (12 if interval.unit == "year" else 1)
+    months_behind = (after.astype("datetime64[M]") - anchors.astype("datetime64[M]")).astype(np.int64)
+    n = np.maximum(months_behind // step, 0)
+    return occurrence(anchors, interval, np.where(occurrence(anchors, interval, n) <= after, n + 1, n))
+
+
+def due_date_matrix(schedules: Sequence[ScheduledVaccine], birth_dates: np.ndarray, as_of: date):
+    """
+    Due dates of every pet (rows) for every scheduled dose (columns), following `app.vaccines.schedule`.
+    - Returns (due dates as datetime64[D], mask of the entries to report, the vaccine of each column).
+    """
+    as_of = np.datetime64(as_of, "D")
+    due, keep, columns = [], [], []
+    for vaccine in schedules:
+        vaccine_due, vaccine_keep = [], []
+        if vaccine.dose_weeks:
+            doses = [birth_dates + np.timedelta64(weeks * 7, "D") for weeks in vaccine.dose_weeks]
+            for dose in doses:
+                vaccine_due.append(dose)
+                vaccine_keep.append(dose > as_of)
+            if vaccine.booster:
+                # Only once the whole early-life series is over
+                vaccine_due.append(next_occurrence(doses[-1], vaccine.booster, as_of))
+                vaccine_keep.append(~np.logical_or.reduce([dose > as_of for dose in doses]))
+        else:
+            earliest = birth_dates + np.timedelta64(vaccine.min_weeks * 7, "D")
+            if vaccine.first_dose:
+                first = occurrence(birth_dates, vaccine.first_dose, 1)
+            elif vaccine.min_weeks or not vaccine.booster:
+                first = earliest
+            else:
+                first = occurrence(birth_dates, vaccine.booster, 1)
+            first = np.maximum(first, earliest)
+            if vaccine.booster:
+                vaccine_due.append(np.where(first > as_of, first, next_occurrence(first, vaccine.booster, as_of)))
+                vaccine_keep.append(np.ones(len(birth_dates), dtype=bool))
+            else:
+                vaccine_due.append(first)
+                vaccine_keep.append(first > as_of)
+
+        if vaccine.max_years is not None:
+            limit = add_months(birth_dates, 12 * vaccine.max_years)
+            vaccine_keep = [kept & (day < limit) for day, kept in zip(vaccine_due, vaccine_keep)]
+        due += vaccine_due
+        keep += vaccine_keep
+        columns += [vaccine] * len(vaccine_due)
+
+    if not columns:
+        empty = np.empty((len(birth_dates), 0))
+        return empty.astype("datetime64[D]"), empty.astype(bool), columns
+    return np.column_stack(due), np.column_stack(keep), columns
+
+
+def encode_schedules(pet_type: str, birth_dates: List[date], as_of: date, language: str) -> List[str]:
+    """
+    `"birth_date":...,"schedule":[...]` JSON members for each birth date, in order.
+    - Pets born on the same day share a schedule, so each distinct birth date is computed and encoded once.
+    """
+    births, inverse = np.unique(to_datetime64(birth_dates), return_inverse=True)
+    due, keep, columns = due_date_matrix(catalog.schedules(pet_type), births, as_of)
+    # Everything but the date is the same for every pet; encode it once per column
+    prefixes, suffixes = [], []
+    for vaccine in columns:
+        description = json.dumps(catalog.description(pet_type, vaccine.name, language))
+        prefixes.append(f'{{"name":{json.dumps(vaccine.name)},"criticality":"{vaccine.criticality}","due_date":"')
+        suffixes.append(f'","description":{description}}}')
+
+    dates, keep = np.datetime_as_string(due, unit="D").tolist(), keep.tolist()
+    encoded = [
+        f'"birth_date":"{birth}","schedule":[' + ",".join(
+            prefix + day + suffix for prefix, day, suffix, kept in zip(prefixes, row, suffixes, mask) if kept
+        ) + "]"
+        for birth, row, mask in zip(np.datetime_as_string(births, unit="D").tolist(), dates, keep)
+    ]
+    return [encoded[position] for position in inverse.ravel().tolist()]
+
+
+def _error_line(index: int, error: str) -> str:
+    return json.dumps({"index": index, "success": False, "error": error})
+
+
+def stream_schedules(
+    items: List[Dict[str, Any]], language: str, as_of: date, valid_pet_types: Sequence[str]
+) -> Iterator[bytes]:
+    """
+    Yield NDJSON lines for `items`, one chunk of pets at a time.
+    - Invalid items and unsupported pet types get an error line instead of failing the batch.
+    """
+    for offset in range(0, len(items), VACCINE_SCHEDULE_CHUNK_SIZE):
+        valid, errors = validate_chunk(items[offset:offset + VACCINE_SCHEDULE_CHUNK_SIZE])
+        lines = {index: _error_line(offset + index, error) for index, error in errors.items()}
+
+        groups: Dict[str, list] = {}
+        for index, item in valid:
+            groups.setdefault(item["pet_type"].lower(), []).append((index, item))
+
+        for pet_type, pets in groups.items():
+            if pet_type not in valid_pet_types or catalog.vaccines(pet_type) is None:
+                for index, item in pets:
+                    lines[index] = _error_line(offset + index, f"Unsupported pet type: {item['pet_type']}.")
+                continue
+            schedules = encode_schedules(pet_type, [item["birth_date"] for _, item in pets], as_of, language)
+            for (index, _), schedule in zip(pets, schedules):
+                lines[index] = f'{{"index":{offset + index},"success":true,"pet_type":"{pet_type}",{schedule}}}'
+
+        yield ("\n".join(lines[index] for index in sorted(lines)) + "\n").encode("utf-8")
@@ -0,0 +1,190 @@
+"""
+In-memory vaccine catalog.
+
+The `<pet type>_vaccines.json` files and the optional `vaccines_lang.json` translations are
+read once, next to this module rather than relative to the working directory. Schedules are
+pre-parsed into integer week offsets and `app.recurrence` intervals, and descriptions into a
+(pet type, language, vaccine) index, so a schedule request does no file I/O or string parsing.
+The same vaccine name can carry a different description per pet type (e.g. "Rabies"). The files
+are re-read when their modification time changes, so edited data is picked up without a restart.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+from app.recurrence import Interval, parse_recurrence
+
+logger = logging.getLogger(__name__)
+
+VACCINE_DATA_DIR = Path(os.getenv("VACCINE_DATA_DIR", Path(__file__).resolve().parent))
+# How often, at most, the files are checked for changes
+VACCINE_CATALOG_CHECK_SECONDS = float(os.getenv("VACCINE_CATALOG_CHECK_SECONDS", 5))
+
+LANGUAGE_FILE = "vaccines_lang.json"
+DEFAULT_LANGUAGE = "en"
+
+# Key of the early-life dose schedule per pet type
+SCHEDULE_KEYS = {"dog": "puppy_schedule", "cat": "kitten_schedule"}
+
+
+class ScheduledVaccine(NamedTuple):
+    name: str
+    criticality: str  # "mandatory" or "recommended"
+    dose_weeks: Tuple[int, ...]  # Early-life doses, in weeks after birth
+    first_dose: Optional[Interval]  # Age at the first dose, for vaccines without early-life doses
+    booster: Optional[Interval]  # Repeat interval; None when the vaccine does not repeat
+    min_weeks: int  # Youngest age it may be given at
+    max_years: Optional[int]  # Not scheduled from this age on
+
+
+def _weeks(value: str) -> int:
+    # "6 weeks" -> 6
+    return int(value.split()[0])
+
+
+def _interval(vaccine: dict, key: str, pet_type: str) -> Optional[Interval]:
+    try:
+        return parse_recurrence(vaccine.get(key))
+    except ValueError:
+        logger.warning(f"Ignoring {key} '{vaccine.get(key)}' of vaccine '{vaccine['name']}' for {pet_type}")
+        return None
+
+
+def parse_schedules(pet_type: str, data: dict) -> Tuple[ScheduledVaccine, ...]:
+    """
+    Pre-parse the vaccines of one pet type, mandatory ones first.
+    """
+    schedule_key = SCHEDULE_KEYS.get(pet_type)
+    schedules = []
+    for criticality in ("mandatory", "recommended"):
+        for vaccine in data.get(criticality, []):
+            restriction = vaccine.get("age_restriction") or {}
+            schedules.append(ScheduledVaccine(
+                name=vaccine["name"],
+                criticality=criticality,
+                dose_weeks=tuple(_weeks(weeks) for weeks in vaccine.get(schedule_key, [])),
+                first_dose=_interval(vaccine, "first_dose_age", pet_type),
+                booster=_interval(vaccine, "frequency", pet_type),
+                min_weeks=restriction.get("min_weeks") or 0,
+                max_years=restriction.get("max_years"),
+            ))
+    return tuple(schedules)
+
+
+class VaccineCatalog:
+    """
+    Thread-safe, hot-reloading view of the vaccine data files.
+    - Lookups call `refresh`, which re-reads the files at most every `check_seconds` and only if one changed.
+    - A reload builds new indexes and swaps them in at once; readers never see a half-loaded catalog.
+    """
+
+    def __init__(self, data_dir: Path = VACCINE_DATA_DIR, check_seconds: float = VACCINE_CATALOG_CHECK_SECONDS):
+        self.data_dir = Path(data_dir)
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._mtimes: Optional[Dict[str, int]] = None
+        self._checked_at = 0.0
+        self._vaccines: Dict[str, dict] = {}
+        self._schedules: Dict[str, Tuple[ScheduledVaccine, ...]] = {}
+        self._descriptions: Dict[Tuple[Optional[str], str, str], str] = {}
+        self.stats = {"loads": 0, "lookups": 0, "description_hits": 0, "description_misses": 0}
+        self.loaded_at: Optional[float] = None
+
+    def _file_mtimes(self) -> Dict[str, int]:
+        return {
+            path.name: path.stat().st_mtime_ns
+            for path in sorted(self.data_dir.glob("*.json"))
+            if path.name.endswith("_vaccines.json") or path.name == LANGUAGE_FILE
+        }
+
+    def load(self):
+        """
+        Read every data file and rebuild the indexes.
+        """
+        with self._lock:
+            mtimes = self._file_mtimes()
+            vaccines, schedules, descriptions = {}, {}, {}
+            for name in mtimes:
+                if name == LANGUAGE_FILE:
+                    continue
+                pet_type = name[:-len("_vaccines.json")]
+                with open(self.data_dir / name, "r", encoding="utf-8") as file:
+                    vaccines[pet_type] = json.load(file)
+                schedules[pet_type] = parse_schedules(pet_type, vaccines[pet_type])
+                # The data files carry the default-language descriptions
+                for group in vaccines[pet_type].values():
+                    for vaccine in group:
+                        key = (pet_type, DEFAULT_LANGUAGE, vaccine["name"])
+                        if vaccine.get("description"):
+                            descriptions.setdefault(key, vaccine["description"])
+
+            if LANGUAGE_FILE in mtimes:
+                # Translations are not per pet type; they apply to every pet type, and to lookups without one
+                with open(self.data_dir / LANGUAGE_FILE, "r", encoding="utf-8") as file:
+                    for language, entries in json.load(file).items():
+                        for vaccine_name, description in entries.items():
+                            for pet_type in (None, *vaccines):
+                                descriptions[(pet_type, language, vaccine_name)] = description
+
+            self._vaccines, self._schedules, self._descriptions = vaccines, schedules, descriptions
+            self._mtimes = mtimes
+            self._checked_at = time.monotonic()
+            self.loaded_at = time.time()
+            self.stats["loads"] += 1
+        logger.info(f"Loaded vaccine catalog for {sorted(vaccines)} from {self.data_dir}")
+
+    def refresh(self):
+        """
+        Reload if never loaded or if a data file was added, removed or modified.
+        """
+        if self._mtimes is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return
+        self._checked_at = time.monotonic()
+        if self._mtimes is None or self._file_mtimes() != self._mtimes:
+            self.load()
+
+    def vaccines(self, pet_type: str) -> Optional[dict]:
+        """
+        Raw vaccine data of a pet type, or None if there is no data file for it.
+        """
+        self.refresh()
+        self.stats["lookups"] += 1
+        return self._vaccines.get(pet_type)
+
+    def schedules(self, pet_type: str) -> Tuple[ScheduledVaccine, ...]:
+        self.refresh()
+        self.stats["lookups"] += 1
+        return self._schedules.get(pet_type, ())
+
+    def description(self, pet_type: Optional[str], vaccine_name: str, language: str = DEFAULT_LANGUAGE) -> str:
+        """
+        Description of a pet type's vaccine in `language`; empty when there is none.
+        - Without a pet type, only the translations file is consulted.
+        """
+        description = self._descriptions.get((pet_type, language, vaccine_name))
+        if description is None:
+            self.stats["description_misses"] += 1
+            return ""
+        self.stats["description_hits"] += 1
+        return description
+
+    @property
+    def version(self) -> int:
+        # Changes on every reload; part of the schedule cache key
+        return self.stats["loads"]
+
+    def snapshot(self) -> dict:
+        return {
+            "data_dir": str(self.data_dir),
+            "pet_types": sorted(self._vaccines),
+            "descriptions": len(self._descriptions),
+            "loaded_at": self.loaded_at,
+            **self.stats,
+        }
+
+
+# Process-wide catalog, loaded at startup and on first use
+catalog = VaccineCatalog()
@@ -0,0 +1,76 @@
+"""
+Turn a pet's vaccine schedule into treatment or reminder rows.
+
+Every generated row carries a `source_key` and is written with one multi-row
+INSERT ... ON CONFLICT (pet_id, source_key) DO NOTHING, in the caller's transaction, so
+running it again (or concurrently) never creates duplicates.
+- Early-life doses get one row each, keyed by vaccine and date.
+- The last dose of a vaccine that repeats becomes a repeating row (a treatment frequency or a
+  reminder recurrence) keyed by the vaccine alone. The rollover job and the dispatcher move it
+  on, and a later run recognizes it by that key.
+"""
+from datetime import date
+from typing import List, Optional
+from sqlalchemy.dialects.postgresql import insert
+from app.models import Pet, Treatment, Reminder
+from app.recurrence import describe_interval, to_rrule
+from app.vaccines.catalog import catalog
+from app.vaccines.schedule import vaccine_schedule
+
+TARGETS = {"treatments": Treatment, "reminders": Reminder}
+
+
+def source_key(vaccine_name: str, due_date: Optional[str] = None) -> str:
+    return f"vaccine:{vaccine_name}:{due_date}" if due_date else f"vaccine:{vaccine_name}"
+
+
+def schedule_rows(pet: Pet, target: str, language: str = "en", as_of: Optional[date] = None) -> List[dict]:
+    """
+    Column values of the rows to generate for a pet with a birth date and a supported type.
+    """
+    pet_type = pet.type.lower()
+    vaccines = {vaccine.name: vaccine for vaccine in catalog.schedules(pet_type)}
+    schedule = vaccine_schedule(pet_type, pet.birth_date, language, as_of)
+    last_dose = {item["name"]: position for position, item in enumerate(schedule)}
+
+    rows = []
+    for position, item in enumerate(schedule):
+        due_date = date.fromisoformat(item["due_date"])
+        booster = vaccines[item["name"]].booster if last_dose[item["name"]] == position else None
+        key = source_key(item["name"]) if booster else source_key(item["name"], item["due_date"])
+        description = item["description"] or None
+        if target == "treatments":
+            rows.append({
+                "name": item["name"], "description": description, "next_due_date": due_date,
+                "frequency": describe_interval(booster) if booster else None,
+                "frequency_count": booster.count if booster else None,
+                "frequency_unit": booster.unit if booster else None,
+                "pet_id": pet.id, "source_key": key,
+            })
+        else:
+            rows.append({
+                "title": item["name"], "description": description, "due_date": due_date,
+                "recurrence": to_rrule(booster) if booster else None,
+                "recurrence_start": due_date,
+                "pet_id": pet.id, "source_key": key,
+            })
+    return rows
+
+
+async def materialize_schedule(db, pet: Pet, target: str, language: str = "en", as_of: Optional[date] = None) -> dict:
+    """
+    Insert the pet's scheduled vaccinations as `target` rows; does not commit.
+    - Returns the ids created and how many rows already existed.
+    """
+    model = TARGETS[target]
+    rows = schedule_rows(pet, target, language, as_of)
+    created = []
+    if rows:
+        statement = (
+            insert(model)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["pet_id", "source_key"])
+            .returning(model.id)
+        )
+        created = list((await db.execute(statement)).scalars().all())
+    return {"target": target, "created": created, "skipped": len(rows) - len(created)}
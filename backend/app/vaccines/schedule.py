@@ -0,0 +1,87 @@
+"""
+Vaccine schedule engine.
+
+Due dates come from the pre-parsed catalog entries in closed form: a repeating vaccine's next
+dose is found with `app.recurrence.next_occurrence`, whatever the pet's age, and frequencies
+in days, weeks, months or years are all understood ("Yearly", "2 months", "6 months").
+- Vaccines with early-life doses (puppy/kitten schedule) list the doses still ahead; once the
+  series is over, the next booster after the last dose.
+- Other vaccines start at `first_dose_age`, or else at the youngest age allowed by
+  `age_restriction.min_weeks`, and then repeat at their frequency.
+- Nothing is scheduled at or after `age_restriction.max_years`.
+Schedules are cached per (pet type, birth date, language, as-of date, catalog version).
+`app.vaccines.batch` implements the same rules with NumPy arrays.
+"""
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List, Optional
+from app.recurrence import add_months, next_occurrence, occurrence
+from app.vaccines.catalog import ScheduledVaccine, catalog
+
+VACCINE_SCHEDULE_CACHE_SIZE = int(os.getenv("VACCINE_SCHEDULE_CACHE_SIZE", 10_000))
+
+
+def first_dose_date(vaccine: ScheduledVaccine, birth_date: date) -> date:
+    """
+    First dose of a vaccine without early-life doses; never before the minimum age.
+    """
+    earliest = birth_date + timedelta(weeks=vaccine.min_weeks)
+    if vaccine.first_dose:
+        first = occurrence(birth_date, vaccine.first_dose, 1)
+    elif vaccine.min_weeks or not vaccine.booster:
+        first = earliest
+    else:
+        first = occurrence(birth_date, vaccine.booster, 1)
+    return max(first, earliest)
+
+
+def due_dates(vaccine: ScheduledVaccine, birth_date: date, as_of: date) -> List[date]:
+    """
+    Upcoming due dates of one vaccine, strictly after `as_of`.
+    """
+    if vaccine.dose_weeks:
+        doses = [birth_date + timedelta(weeks=weeks) for weeks in vaccine.dose_weeks]
+        due = [dose for dose in doses if dose > as_of]
+        if not due and vaccine.booster:
+            due = [next_occurrence(doses[-1], vaccine.booster, as_of)]
+    else:
+        first = first_dose_date(vaccine, birth_date)
+        if first > as_of:
+            due = [first]
+        else:
+            due = [next_occurrence(first, vaccine.booster, as_of)] if vaccine.booster else []
+
+    if vaccine.max_years is not None:
+        limit = add_months(birth_date, 12 * vaccine.max_years)
+        due = [day for day in due if day < limit]
+    return due
+
+
+# Fields of a schedule entry, in the order of the cached tuples
+SCHEDULE_FIELDS = ("name", "criticality", "due_date", "description")
+
+
+@lru_cache(maxsize=VACCINE_SCHEDULE_CACHE_SIZE)
+def _cached_schedule(pet_type: str, birth_date: date, language: str, as_of: date, catalog_version: int) -> tuple:
+    # Immutable entries: the cache is shared by every caller
+    return tuple(
+        (vaccine.name, vaccine.criticality, day.isoformat(), catalog.description(pet_type, vaccine.name, language))
+        for vaccine in catalog.schedules(pet_type)
+        for day in due_dates(vaccine, birth_date, as_of)
+    )
+
+
+def vaccine_schedule(pet_type: str, birth_date: date, language: str = "en", as_of: Optional[date] = None) -> list:
+    """
+    Upcoming vaccinations of a pet, in catalog order (mandatory vaccines first).
+    - Fresh dicts on every call, so callers may change them without touching the cache.
+    """
+    catalog.refresh()
+    entries = _cached_schedule(pet_type, birth_date, language, as_of or date.today(), catalog.version)
+    return [dict(zip(SCHEDULE_FIELDS, entry)) for entry in entries]
+
+
+def schedule_cache_info() -> dict:
+    info = _cached_schedule.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from functools import lru_cache
-import json
+from fastapi import APIRouter, HTTPException, Body
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from app.vaccines.catalog import catalog
+from app.vaccines.schedule import vaccine_schedule
+from app.vaccines.batch import NDJSON_MEDIA_TYPE, VACCINE_SCHEDULE_BATCH_MAX, stream_schedules
 
 router = APIRouter()
 
@@ -20,31 +23,22 @@ def validate_pet_type(pet_type: str):
         logging.error(f"Invalid pet type provided: {pet_type}")
         raise HTTPException(status_code=400, detail=f"Unsupported pet type: {pet_type}. Must be one of {VALID_PET_TYPES}.")
 
-@lru_cache(maxsize=10)
 def load_vaccine_data(pet_type: str):
     """
-    Load vaccine data from the JSON file, with caching for efficiency.
+    Fetch vaccine data from the in-memory catalog.
     """
-    file_path = f"data/{pet_type}_vaccines.json"
-    try:
-        with open(file_path, "r") as file:
-            logging.info(f"Loading vaccine data for {pet_type}.")
-            return json.load(file)
-    except FileNotFoundError:
-        logging.error(f"File not found: {file_path}")
+    vaccine_data = catalog.vaccines(pet_type)
+    if vaccine_data is None:
+        logging.error(f"No vaccine data file for {pet_type} in {catalog.data_dir}")
         raise HTTPException(status_code=404, detail="Vaccination data not found.")
+    return vaccine_data
 
-def get_description(vaccine_name: str, language: str = "en"):
+def get_description(vaccine_name: str, language: str = "en", pet_type: str = None):
     """
     Fetch the vaccine description in the specified language.
+    Without `pet_type`, only the translations file is consulted.
     """
-    try:
-        with open("data/vaccines_lang.json", "r") as lang_file:
-            lang_data = json.load(lang_file)
-            return lang_data.get(language, {}).get(vaccine_name, "")
-    except FileNotFoundError:
-        logging.warning("Language file not found. Defaulting to hardcoded descriptions.")
-        return ""
+    return catalog.description(pet_type, vaccine_name, language)
 
 @router.get("/vaccines")
 def get_vaccines(pet_type: str, criticality: str = None):
@@ -64,42 +58,39 @@ def get_vaccines(pet_type: str, criticality: str = None):
     return vaccine_data
 
 @router.post("/vaccines/schedule")
-def calculate_vaccine_schedule(birth_date: str, pet_type: str, language: str = "en"):
+def calculate_vaccine_schedule(birth_date: str, pet_type: str, language: str = "en", as_of: Optional[date] = None):
     """
     Calculate a vaccination schedule based on the pet's age.
+    - Lists the upcoming doses after `as_of` (default: today); see `app.vaccines.schedule` for the rules.
     """
     validate_pet_type(pet_type)
 
     try:
-        # Load vaccination data
-        vaccine_data = load_vaccine_data(pet_type)
-        
-        birth_date = datetime.strptime(birth_date, "%Y-%m-%d")
-        today = datetime.today()
-
-        schedule = []
-        for vaccine in vaccine_data.get("recommended", []):
-            if "puppy_schedule" in vaccine or "kitten_schedule" in vaccine:
-                schedule_key = "puppy_schedule" if pet_type == "dog" else "kitten_schedule"
-                for weeks in vaccine.get(schedule_key, []):
-                    due_date = birth_date + timedelta(weeks=int(weeks.split()[0]))
-                    if due_date > today:
-                        schedule.append({
-                            "name": vaccine["name"],
-                            "due_date": due_date.strftime("%Y-%m-%d"),
-                            "description": f"{get_description(vaccine['name'], language)}"
-                        })
-            else:
-                interval = int(vaccine["frequency"].split()[0])
-                next_due_date = birth_date + timedelta(weeks=interval * 52)
-                while next_due_date <= today:
-                    next_due_date += timedelta(weeks=interval * 52)
-                schedule.append({
-                    "name": vaccine["name"],
-                    "due_date": next_due_date.strftime("%Y-%m-%d"),
-                    "description": f"{get_description(vaccine['name'], language)}"
-                })
-        return {"schedule": schedule}
+        # Raises 404 when there is no data for the pet type
+        pet_type = pet_type.lower()
+        load_vaccine_data(pet_type)
+        birth_date = datetime.strptime(birth_date, "%Y-%m-%d").date()
+        return {"schedule": vaccine_schedule(pet_type, birth_date, language, as_of)}
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error generating schedule: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating schedule: {str(e)}")
+
+@router.post("/vaccines/schedule/batch")
+def calculate_vaccine_schedules(
+    items: List[Dict[str, Any]] = Body(...), language: str = "en", as_of: Optional[date] = None
+):
+    """
+    Calculate vaccination schedules for many pets at once, streamed back as NDJSON.
+    - Each item is {"pet_type", "birth_date"}; each output line holds its `index`, and its `schedule` or `error`.
+    - Due dates are the same as from `/vaccines/schedule`, computed with vectorized date arithmetic.
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one item.")
+    if len(items) > VACCINE_SCHEDULE_BATCH_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"Batch too large; at most {VACCINE_SCHEDULE_BATCH_MAX} items are allowed."
+        )
+    stream = stream_schedules(items, language, as_of or date.today(), VALID_PET_TYPES)
+    return StreamingResponse(stream, media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,76 @@
+"""
+Compare ways of turning 1k pets into a JSON response body.
+
+- legacy: validate, `jsonable_encoder`, `json.dumps` (the path JSONResponse and the v1 shims took)
+- orjson: validate, dump to Python, `orjson.dumps` (what ORJSONResponse does)
+- pydantic: validate and dump JSON bytes in pydantic-core (FastAPI's path for routes with a response_model)
+
+    python -m benchmarks.bench_serialization
+"""
+import json
+import os
+import statistics
+import time
+from datetime import date, datetime, timezone
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.models import Pet
+from app.schemas import PetResponse
+
+PETS = int(os.getenv("BENCH_PETS", 1000))
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", 50))
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, only needed for the comparison
+    orjson = None
+
+adapter = TypeAdapter(List[PetResponse])
+
+
+def make_pets(count: int) -> list:
+    return [
+        Pet(
+            id=i, owner_id=i % 50 + 1, name=f"pet{i}", type="dog", breed="Labrador", birth_date=date(2020, 1, 1),
+            weight=12.5, version=1,
+            updated_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+        for i in range(count)
+    ]
+
+
+def legacy(pets) -> bytes:
+    validated = [PetResponse.model_validate(pet) for pet in pets]
+    return json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_dumps(pets) -> bytes:
+    return orjson.dumps(adapter.dump_python(adapter.validate_python(pets), mode="json"))
+
+
+def pydantic_json(pets) -> bytes:
+    return adapter.dump_json(adapter.validate_python(pets))
+
+
+def run(label: str, serialize, pets):
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        serialize(pets)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<10} median {statistics.median(timings):8.2f} ms   p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms")
+
+
+def main():
+    pets = make_pets(PETS)
+    assert json.loads(legacy(pets)) == json.loads(pydantic_json(pets))
+    print(f"Serializing {PETS} PetResponse objects, {ITERATIONS} iterations")
+    run("legacy", legacy, pets)
+    if orjson:
+        run("orjson", orjson_dumps, pets)
+    run("pydantic", pydantic_json, pets)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare vaccine schedules for many pets: one `/vaccines/schedule` call per pet vs one batch call.
+
+- single: the single-pet handler called in-process once per pet (a lower bound; no HTTP overhead)
+- single-http: the single-pet endpoint over the test client, on a sample, extrapolated to all pets
+- batch: `/vaccines/schedule/batch` over the test client, reading the whole NDJSON stream
+
+    python -m benchmarks.bench_vaccine_batch
+"""
+import os
+import random
+import time
+from datetime import date, timedelta
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.vaccines.vaccines import router, calculate_vaccine_schedule
+
+PETS = int(os.getenv("BENCH_PETS", 100_000))
+HTTP_SAMPLE = int(os.getenv("BENCH_HTTP_SAMPLE", 2_000))
+
+
+def make_items(count: int) -> list:
+    rng = random.Random(42)
+    today = date.today()
+    return [
+        {"pet_type": rng.choice(("dog", "cat")), "birth_date": str(today - timedelta(days=rng.randint(-30, 5000)))}
+        for _ in range(count)
+    ]
+
+
+def timed(label: str, pets: int, run, scale: float = 1.0):
+    start = time.perf_counter()
+    run()
+    elapsed = (time.perf_counter() - start) * scale
+    print(f"{label:<12} {elapsed * 1000:10.1f} ms   {pets / elapsed:12,.0f} pets/s")
+
+
+def main():
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    client = TestClient(app)
+    items = make_items(PETS)
+    sample = items[:HTTP_SAMPLE]
+    print(f"Vaccine schedules for {PETS} pets (single-http extrapolated from {len(sample)})")
+
+    timed("single", PETS, lambda: [calculate_vaccine_schedule(item["birth_date"], item["pet_type"]) for item in items])
+    timed(
+        "single-http", PETS,
+        lambda: [client.post("/api/vaccines/schedule", params=item) for item in sample],
+        scale=PETS / len(sample),
+    )
+
+    def batch():
+        response = client.post("/api/vaccines/schedule/batch", json=items)
+        assert response.status_code == 200 and response.text.count("\n") == PETS
+
+    timed("batch", PETS, batch)
+
+
+if __name__ == "__main__":
+    main()
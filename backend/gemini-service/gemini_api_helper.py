@@ -33,7 +33,7 @@ async def query_gemini(data: GeminiPrompt):
     # Attach weight validation for adult pets
     weight_message = None
     if data.weight and data.age != "puppy":
-        weight_message = validate_weight(data.breed, data.weight)
+        weight_message = await validate_weight(data.breed, data.weight)
 
     try:
         # Build prompt for Gemini API
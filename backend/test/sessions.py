@@ -0,0 +1,20 @@
+from contextlib import asynccontextmanager
+from app.database import ThreadpoolSession
+
+
+def threadpool_session_factory(Session):
+    """
+    Stand-in for `database.session_scope` over a sync sessionmaker, for the jobs and helpers that take one.
+    - The sessionmaker stays reachable as `factory.Session`, for setting up and checking rows directly.
+    """
+
+    @asynccontextmanager
+    async def factory(read_only=False):
+        db = ThreadpoolSession(Session())
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    factory.Session = Session
+    return factory
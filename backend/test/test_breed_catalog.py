@@ -0,0 +1,125 @@
+import asyncio
+from pathlib import Path
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.breeds import catalog as catalog_module
+from app.breeds.catalog import BreedCatalog, BreedIndex
+from app.routes import breeds
+from app.upstream import Upstream
+
+DOGS = [
+    {"id": 1, "name": "Golden Retriever", "weight": {"metric": "25 - 34"}},
+    {"id": 2, "name": "Labrador Retriever", "weight": {"metric": "25 - 36"}},
+    {"id": 3, "name": "German Shepherd Dog", "weight": {"metric": "23 - 41"}},
+    {"id": 4, "name": "Goldendoodle"},
+    {"id": 5, "name": "Beagle", "weight": {"metric": "9 - 11"}},
+    {"id": 6, "name": "Bull Terrier (Miniature)"},
+]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """
+    Breed list API that honours If-None-Match; `upstream.fail` makes it return 503.
+    """
+    upstream.requests, upstream.fail = [], False
+    upstream.breeds = {"dog": DOGS, "cat": [{"id": "siam", "name": "Siamese"}]}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        upstream.requests.append(request)
+        if upstream.fail:
+            return httpx.Response(503)
+        pet_type = "dog" if "thedogapi" in request.url.host else "cat"
+        etag = f'"{pet_type}-{len(upstream.breeds[pet_type])}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, json=upstream.breeds[pet_type], headers={"ETag": etag})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(catalog_module, "upstream", Upstream(client=lambda: client))
+    return upstream
+
+
+class TestBreedIndex:
+    """
+    Tests for breed search over one pet type.
+    """
+
+    index = BreedIndex(DOGS)
+
+    def names(self, results):
+        return [result["name"] for result in results]
+
+    def test_name_prefix_before_word_prefix(self):
+        assert self.names(self.index.autocomplete("gold", limit=2)) == ["Golden Retriever", "Goldendoodle"]
+        assert self.names(self.index.autocomplete("retr"))[:2] == ["Golden Retriever", "Labrador Retriever"]
+        assert self.names(self.index.autocomplete("mini"))[0] == "Bull Terrier (Miniature)"
+
+    def test_fuzzy_match_for_typos(self):
+        assert self.names(self.index.autocomplete("labrdor"))[0] == "Labrador Retriever"
+        assert self.names(self.index.autocomplete("german shepard"))[0] == "German Shepherd Dog"
+        assert self.index.autocomplete("zzzz") == []
+
+    def test_lookup(self):
+        assert self.index.lookup("golden retriever")["id"] == 1
+        assert self.index.lookup("Shepherd")["id"] == 3  # The only breed with a word starting with it
+        assert self.index.lookup("labrador")["id"] == 2
+        assert self.index.lookup("retriever") is None  # Ambiguous: no guessed breed
+        assert self.index.lookup("gold") is None
+        assert self.index.lookup("herd") is None  # Inside a word only
+        assert self.index.lookup("poodle x") is None
+
+
+class TestBreedCatalog:
+    """
+    Tests for loading and refreshing the breed catalog.
+    """
+
+    def test_refresh_uses_conditional_requests(self, upstream, tmp_path):
+        catalog = BreedCatalog(tmp_path / "breeds.json")
+        assert asyncio.run(catalog.refresh()) == {"dog": True, "cat": True}
+        assert asyncio.run(catalog.refresh()) == {"dog": False, "cat": False}
+        assert upstream.requests[-1].headers["if-none-match"] == '"cat-1"'
+        assert catalog.stats["not_modified"] == 2
+
+        upstream.breeds["cat"] = [{"id": "siam", "name": "Siamese"}, {"id": "pers", "name": "Persian"}]
+        assert asyncio.run(catalog.refresh()) == {"dog": False, "cat": True}
+        assert catalog.lookup("cat", "persian")["id"] == "pers"
+
+    def test_failed_refresh_keeps_serving(self, upstream, tmp_path):
+        catalog = BreedCatalog(tmp_path / "breeds.json")
+        asyncio.run(catalog.refresh())
+        upstream.fail = True
+        assert asyncio.run(catalog.refresh()) == {"dog": False, "cat": False}
+        assert catalog.stats["failed"] == 2
+        assert catalog.lookup("dog", "beagle")["id"] == 5
+
+    def test_snapshot_survives_a_restart(self, upstream, tmp_path):
+        asyncio.run(BreedCatalog(tmp_path / "breeds.json").refresh())
+        restarted = BreedCatalog(tmp_path / "breeds.json")
+        assert restarted.load_snapshot()
+        assert restarted.autocomplete("dog", "bea") == [{"id": 5, "name": "Beagle"}]
+
+        # The saved validators make the first refresh after a restart conditional
+        requests = len(upstream.requests)
+        assert asyncio.run(restarted.refresh()) == {"dog": False, "cat": False}
+        assert len(upstream.requests) == requests + 2
+
+    def test_default_snapshot_path_does_not_depend_on_the_working_directory(self):
+        assert catalog_module.BREED_CATALOG_SNAPSHOT.is_absolute()
+        assert catalog_module.BREED_CATALOG_SNAPSHOT.parent == Path(catalog_module.__file__).resolve().parent
+
+    def test_route_answers_from_catalog(self, upstream, monkeypatch):
+        catalog = BreedCatalog(snapshot_path=None)
+        asyncio.run(catalog.refresh())
+        monkeypatch.setattr(breeds, "breed_catalog", catalog)
+        requests = len(upstream.requests)
+
+        assert asyncio.run(breeds.get_breed_info("Dog", "Beagle"))["weight"] == {"metric": "9 - 11"}
+        assert asyncio.run(breeds.autocomplete_breeds("dog", "lab", 5)) == [{"id": 2, "name": "Labrador Retriever"}]
+        for name in ("unicorn", "retriever"):
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(breeds.get_breed_info("dog", name))
+            assert error.value.status_code == 404
+        assert len(upstream.requests) == requests
@@ -0,0 +1,140 @@
+import asyncio
+import httpx
+import pytest
+from app import util
+from app.breeds import growth
+from app.breeds.catalog import BreedCatalog
+from app.breeds.weights import WeightRanges
+from app.cache import TieredCache
+from app.upstream import HostPolicy, Upstream
+
+BREEDS = {
+    "dog": [
+        {"name": "Chihuahua", "weight": {"metric": "2 - 3"}},
+        {"name": "Golden Retriever", "weight": {"metric": "25 - 34"}},
+        {"name": "Great Dane", "weight": {"metric": "45 - 59"}},
+    ],
+    "cat": [{"name": "Siamese", "weight": {"metric": "4 - 6"}}],
+}
+
+
+@pytest.fixture
+def ranges(monkeypatch):
+    catalog = BreedCatalog(snapshot_path=None)
+    for pet_type, breeds in BREEDS.items():
+        catalog.replace(pet_type, breeds)
+    ranges = WeightRanges(catalog)
+    monkeypatch.setattr(util, "weight_ranges", ranges)
+    monkeypatch.setattr(util, "llm_weight_cache", TieredCache("llm-weights", ttl=3600, redis=None))
+    return ranges
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """
+    Stand-in for the Gemini service; records prompts and answers with `gemini.answer`.
+    """
+    gemini.prompts, gemini.answer = [], {"weight_range": "1.5-2.5"}
+
+    def handler(request):
+        gemini.prompts.append(httpx.Response(200, content=request.content).json()["prompt"])
+        if isinstance(gemini.answer, Exception):
+            raise gemini.answer
+        return httpx.Response(200, json=gemini.answer)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(util, "upstream", Upstream(default=HostPolicy(retries=0), client=lambda: client))
+    return gemini
+
+
+def validate_weight(*args, **kwargs):
+    return asyncio.run(util.validate_weight(*args, **kwargs))
+
+
+class TestGrowthCurves:
+    """
+    Tests for the interpolated growth tables.
+    """
+
+    def test_interpolation(self):
+        assert growth.growth_share("large", 12) == 0.22
+        assert growth.growth_share("large", 14) == pytest.approx(0.27)
+        assert growth.growth_share("toy", 80) == 1.0
+
+    def test_size_classes(self):
+        assert growth.size_class("dog", (2, 3)) == "toy"
+        assert growth.size_class("dog", (25, 34)) == "large"
+        assert growth.size_class("dog", (45, 59)) == "giant"
+        assert growth.size_class("cat", (4, 6)) == "cat"
+
+    def test_tables_grow_to_adult_weight(self):
+        for points in growth.GROWTH_TABLES.values():
+            shares = [share for _, share in points]
+            assert shares == sorted(shares) and shares[-1] == 1.0
+
+    def test_expected_range(self, ranges):
+        def expected(breed, age_weeks):
+            return growth.expected_weight_range(breed, age_weeks, ranges=ranges)
+
+        assert expected("Golden Retriever", 12) == (round(25 * 0.22 * 0.85, 1), round(34 * 0.22 * 1.15, 1))
+        # Giant breeds are further from adult weight than toy breeds at the same age
+        assert expected("Great Dane", 24)[1] / 59 < expected("Chihuahua", 24)[1] / 3
+        assert expected("Siamese", 52) == (3.4, 6.9)
+        assert expected("Unicorn", 12) is None
+
+
+class TestPuppyWeightValidation:
+    """
+    Tests for puppy weights in util.validate_weight.
+    """
+
+    def test_covered_breed_needs_no_llm(self, ranges, gemini):
+        assert validate_weight("Golden Retriever", 6.0, is_puppy=True, age_weeks=12) is None
+        message = validate_weight("Golden Retriever", 20.0, is_puppy=True, age_weeks=12)
+        assert message.startswith("Overweight: 20.0kg exceeds the healthy range for a 12-week-old Golden Retriever")
+        assert gemini.prompts == []
+
+    def test_known_breed_never_reaches_the_llm(self, ranges, monkeypatch):
+        async def no_llm(*args, **kwargs):
+            raise AssertionError("asked Gemini for a breed with a local weight range")
+
+        monkeypatch.setattr(util, "fetch_llm_weight_range", no_llm)
+        assert validate_weight("Great Dane", 10.0, is_puppy=True, age_weeks=12, pet_type="dog") is None
+        assert validate_weight("Siamese", 0.2, is_puppy=True, age_weeks=8, pet_type="cat").startswith("Underweight")
+        assert validate_weight("Golden Retriever", 20.0, is_puppy=True, age_weeks=12).startswith("Overweight")
+
+    def test_bundled_ranges_cover_common_breeds_without_a_catalog(self, monkeypatch):
+        """
+        Test the default configuration: with no breed catalog loaded, common breeds are still checked locally.
+        """
+        async def no_llm(*args, **kwargs):
+            raise AssertionError("asked Gemini for a breed with a bundled weight range")
+
+        monkeypatch.setattr(util, "weight_ranges", WeightRanges(BreedCatalog(snapshot_path=None)))
+        monkeypatch.setattr(util, "fetch_llm_weight_range", no_llm)
+        assert validate_weight("Labrador Retriever", 6.0, is_puppy=True, age_weeks=12) is None
+        assert validate_weight("Maine Coon", 4.0, is_puppy=True, age_weeks=8, pet_type="cat").startswith("Overweight")
+
+    def test_llm_fallback_for_uncovered_breed(self, ranges, gemini):
+        assert validate_weight("Azawakh", 1.0, is_puppy=True, age_weeks=8) == (
+            "Underweight: 1.0kg is below the healthy range for a 8-week-old Azawakh (1.5-2.5kg)."
+        )
+        validate_weight("Azawakh", 2.0, is_puppy=True, age_weeks=8)
+        assert len(gemini.prompts) == 1  # Cached
+        assert gemini.prompts[0].endswith("8-week-old Azawakh puppy or kitten?")
+
+    def test_llm_prompt_names_the_pet_type(self, ranges, gemini):
+        validate_weight("Sokoke", 1.0, is_puppy=True, age_weeks=8, pet_type="cat")
+        assert gemini.prompts == ["What is the healthy weight range in kg for a 8-week-old Sokoke kitten?"]
+
+    def test_llm_failure_skips_validation(self, ranges, gemini):
+        gemini.answer = httpx.ConnectTimeout("slow")
+        assert validate_weight("Azawakh", 1.0, is_puppy=True, age_weeks=8) is None
+        gemini.answer = {"error": "no idea"}
+        assert validate_weight("Azawakh", 1.0, is_puppy=True, age_weeks=8) is None
+        assert len(gemini.prompts) == 2  # Failures are not cached
+
+    def test_age_is_required(self, ranges, gemini):
+        assert validate_weight("Golden Retriever", 6.0, is_puppy=True) == (
+            "Puppy weight validation requires the age in weeks."
+        )
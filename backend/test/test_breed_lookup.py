@@ -0,0 +1,137 @@
+import asyncio
+import json
+import httpx
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.breeds.catalog import BreedCatalog
+from app.cache import TieredCache
+from app.routes import breeds
+from app.upstream import HostPolicy, Upstream
+from app.singleflight import SingleFlight
+
+
+class FakeRedis:
+    def __init__(self, fail: bool = False):
+        self.data = {}
+        self.fail = fail
+
+    async def get(self, key):
+        if self.fail:
+            raise RedisConnectionError("down")
+        return self.data.get(key)
+
+    async def setex(self, key, seconds, value):
+        if self.fail:
+            raise RedisConnectionError("down")
+        self.data[key] = value
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """
+    Slow breed API answering every search with one match; counts the requests it gets.
+    """
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        if request.url.params["q"] == "unknown":
+            return httpx.Response(200, json=[])
+        if request.url.params["q"] == "outage":
+            return httpx.Response(503, text="Service Unavailable")
+        return httpx.Response(200, json=[{"name": request.url.params["q"].title(), "host": request.url.host}])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = FakeRedis()
+    layer = Upstream(default=HostPolicy(retries=0, failures=1), client=lambda: client)
+    monkeypatch.setattr(breeds, "upstream", layer)
+    monkeypatch.setattr(breeds, "breed_cache", TieredCache("breeds", ttl=3600, negative_ttl=300, redis=lambda: cache))
+    monkeypatch.setattr(breeds, "breed_catalog", BreedCatalog(snapshot_path=None))  # Not loaded: lookups go upstream
+    upstream.requests, upstream.cache = requests, cache
+    return upstream
+
+
+class TestSingleFlight:
+    """
+    Tests for per-key request coalescing.
+    """
+
+    def test_concurrent_calls_share_one_result(self):
+        flight, calls = SingleFlight(), []
+
+        async def call():
+            calls.append(1)
+            number = len(calls)
+            await asyncio.sleep(0.01)
+            return number
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", call) for _ in range(10)), flight.do("other", call))
+
+        assert asyncio.run(run()) == [1] * 10 + [2]
+        assert flight.snapshot() == {"in_flight": 0, "calls": 11, "leaders": 2, "shared": 9}
+
+    def test_exception_reaches_every_caller(self):
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        async def run():
+            return await asyncio.gather(*(flight.do("key", call) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+        assert flight.in_flight() == 0
+
+
+class TestBreedLookup:
+    """
+    Tests for the async breed route.
+    """
+
+    def test_burst_of_misses_makes_one_request(self, upstream):
+        async def run():
+            return await asyncio.gather(*(breeds.get_breed_info("Dog", "Beagle") for _ in range(20)))
+
+        results = asyncio.run(run())
+        assert results == [{"name": "Beagle", "host": "api.thedogapi.com"}] * 20
+        assert len(upstream.requests) == 1
+        assert json.loads(upstream.cache.data["breeds:dog:beagle"])["value"]["name"] == "Beagle"
+
+        # Served from the cache afterwards
+        asyncio.run(breeds.get_breed_info("dog", "beagle"))
+        assert len(upstream.requests) == 1
+
+    def test_not_found_is_shared(self, upstream):
+        async def run():
+            lookups = (breeds.get_breed_info("cat", "unknown") for _ in range(5))
+            return await asyncio.gather(*lookups, return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(result, HTTPException) and result.status_code == 404 for result in results)
+        assert len(upstream.requests) == 1
+
+    def test_redis_outage_falls_back_to_upstream(self, upstream, monkeypatch):
+        monkeypatch.setattr(breeds, "breed_cache", TieredCache("breeds", ttl=3600, redis=lambda: FakeRedis(fail=True)))
+        assert asyncio.run(breeds.get_breed_info("cat", "siamese"))["host"] == "api.thecatapi.com"
+
+    def test_invalid_pet_type(self, upstream):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(breeds.get_breed_info("fish", "goldfish"))
+        assert error.value.status_code == 400
+        assert not upstream.requests
+
+    def test_unhealthy_api_fails_fast(self, upstream):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(breeds.get_breed_info("dog", "outage"))
+        assert error.value.status_code == 503 and len(upstream.requests) == 1
+
+        # The circuit is open: other breeds on that host fail at once, without a request
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(breeds.get_breed_info("dog", "beagle"))
+        assert error.value.detail == "Breed API temporarily unavailable."
+        assert len(upstream.requests) == 1
+        assert asyncio.run(breeds.get_breed_info("cat", "siamese"))["name"] == "Siamese"
@@ -0,0 +1,195 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.breeds.catalog import BreedCatalog
+from app.database import Base
+from app.jobs.breed_cache_warmup import BreedCacheWarmup
+from app.models import User, Pet
+from app.routes import healthcheck
+from test.sessions import threadpool_session_factory
+
+PETS = [
+    # (type, breed)
+    ("dog", "Labrador"),
+    ("Dog", "labrador "),
+    ("dog", "Labrador"),
+    ("dog", "Poodle"),
+    ("dog", "Poodle"),
+    ("dog", "Unknownshire"),
+    ("cat", "Siamese"),
+    ("dog", "other"),  # No breed information to warm
+    ("dog", None),
+    ("bird", "Parrot"),  # No breed API
+]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # The warm-up query is portable SQL, so a SQLite file is enough here
+    engine = create_engine(f"sqlite:///{tmp_path / 'pets.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        db.add(User(id=1, email="owner@example.com", password="x"))
+        for index, (pet_type, breed) in enumerate(PETS, start=1):
+            db.add(Pet(id=index, name=f"pet {index}", type=pet_type, breed=breed, owner_id=1))
+        db.commit()
+
+    yield threadpool_session_factory(Session)
+    engine.dispose()
+
+
+class FakeLookup:
+    def __init__(self, delay=0.01, missing=("unknownshire",), failing=()):
+        self.delay = delay
+        self.missing = missing
+        self.failing = failing
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, pet_type, breed_name):
+        self.calls.append((pet_type, breed_name))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if breed_name in self.missing:
+            raise HTTPException(status_code=404, detail="Breed not found.")
+        if breed_name in self.failing:
+            raise HTTPException(status_code=503, detail="Breed API temporarily unavailable.")
+        return {"name": breed_name}
+
+
+def test_warm_up_looks_up_the_most_common_breeds(session_factory):
+    lookup = FakeLookup()
+    warmup = BreedCacheWarmup(session_factory=session_factory, lookup=lookup, limit=10, concurrency=2)
+
+    result = asyncio.run(warmup.warm_up())
+
+    assert sorted(lookup.calls) == [("cat", "siamese"), ("dog", "labrador"), ("dog", "poodle"), ("dog", "unknownshire")]
+    assert lookup.max_running <= 2
+    assert result["breeds"] == 4
+    assert (result["warmed"], result["not_found"], result["failed"]) == (3, 1, 0)
+    # Negative entries are cached too, so every pet with a breed is covered
+    assert result["pets"] == 7
+    assert result["coverage"] == 1.0
+    assert warmup.last_run == result
+
+
+def test_warm_up_limit_and_failures(session_factory):
+    lookup = FakeLookup(failing=("poodle",))
+    warmup = BreedCacheWarmup(session_factory=session_factory, lookup=lookup, limit=2)
+
+    result = asyncio.run(warmup.warm_up())
+
+    # The two most common breeds: 3 labradors and 2 poodles
+    assert sorted(lookup.calls) == [("dog", "labrador"), ("dog", "poodle")]
+    assert (result["warmed"], result["failed"]) == (1, 1)
+    assert result["coverage"] == round(3 / 7, 4)
+
+
+def test_warm_up_timeout_keeps_partial_results(session_factory):
+    lookup = FakeLookup(delay=5)
+    warmup = BreedCacheWarmup(session_factory=session_factory, lookup=lookup, concurrency=1, timeout_seconds=0.05)
+
+    result = asyncio.run(warmup.warm_up())
+
+    assert result["timed_out"]
+    assert len(lookup.calls) == 1
+    assert result["warmed"] == 0
+    assert result["coverage"] == 0
+
+
+def test_readiness_waits_for_the_warm_up(session_factory, monkeypatch):
+    lookup = FakeLookup(delay=0.05)
+    warmup = BreedCacheWarmup(session_factory=session_factory, lookup=lookup, blocks_readiness=True)
+    monkeypatch.setattr(healthcheck, "breed_warmup", warmup)
+
+    async def scenario():
+        assert warmup.ready
+        warmup.start()
+        during = await healthcheck.ready()
+        await warmup._task
+        after = await healthcheck.ready()
+        await warmup.stop()
+        return during, after
+
+    during, after = asyncio.run(scenario())
+
+    assert during.status_code == 503
+    assert after == {"status": "ready"}
+    assert warmup.finished
+
+
+def test_readiness_is_not_blocked_by_default(session_factory):
+    warmup = BreedCacheWarmup(session_factory=session_factory, lookup=FakeLookup(delay=1))
+
+    async def scenario():
+        warmup.start()
+        ready = warmup.ready
+        await warmup.stop()
+        return ready
+
+    assert asyncio.run(scenario())
+
+
+def test_pet_types_served_by_the_catalog_are_skipped(session_factory):
+    catalog = BreedCatalog(snapshot_path=None)
+    catalog.replace("dog", [{"name": "Labrador"}, {"name": "Poodle"}])
+    lookup = FakeLookup()
+    warmup = BreedCacheWarmup(session_factory=session_factory, lookup=lookup, catalog=catalog)
+
+    result = asyncio.run(warmup.warm_up())
+
+    # Only cat lookups go through the breed cache, and coverage counts cat pets only
+    assert lookup.calls == [("cat", "siamese")]
+    assert (result["pet_types"], result["skipped_pet_types"]) == (["cat"], ["dog"])
+    assert (result["breeds"], result["warmed"], result["pets"], result["coverage"]) == (1, 1, 1, 1.0)
+
+
+def test_nothing_to_warm_when_the_catalog_serves_every_pet_type(monkeypatch):
+    catalog = BreedCatalog(snapshot_path=None)
+    catalog.replace("dog", [{"name": "Labrador"}])
+    catalog.replace("cat", [{"name": "Siamese"}])
+
+    def no_database(read_only=False):
+        raise AssertionError("queried the database with nothing to warm")
+
+    lookup = FakeLookup()
+    warmup = BreedCacheWarmup(session_factory=no_database, lookup=lookup, catalog=catalog, blocks_readiness=True)
+    monkeypatch.setattr(healthcheck, "breed_warmup", warmup)
+
+    async def scenario():
+        warmup.start()
+        await warmup._task
+        ready = await healthcheck.ready()
+        await warmup.stop()
+        return ready
+
+    assert asyncio.run(scenario()) == {"status": "ready"}
+    assert lookup.calls == []
+    assert warmup.last_run["skipped_pet_types"] == ["dog", "cat"]
+    assert (warmup.last_run["breeds"], warmup.last_run["coverage"]) == (0, None)
+
+
+def test_breeds_loaded_into_the_catalog_meanwhile_are_not_counted(session_factory):
+    catalog = BreedCatalog(snapshot_path=None)
+    lookup = FakeLookup()
+
+    async def lookup_then_load(pet_type, breed_name):
+        # The catalog refresh lands while the warm-up is running
+        catalog.replace("dog", [{"name": "Labrador"}])
+        return await lookup(pet_type, breed_name)
+
+    warmup = BreedCacheWarmup(session_factory=session_factory, lookup=lookup_then_load, concurrency=1, catalog=catalog)
+
+    result = asyncio.run(warmup.warm_up())
+
+    assert len(lookup.calls) == 2  # The first breed, then Siamese; the other dog breeds are skipped
+    assert result["skipped"] == 2
+    assert result["coverage"] < 1.0
@@ -0,0 +1,133 @@
+import asyncio
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.breeds import weights as weights_module
+from app.breeds.catalog import BreedCatalog
+from app.breeds.weights import WeightIndex, WeightRanges, parse_weight_range
+from app.routes import breeds
+from app import util
+
+DOGS = [
+    {"id": 1, "name": "Golden Retriever", "weight": {"imperial": "55 - 75", "metric": "25 - 34"}},
+    {"id": 2, "name": "Labrador Retriever", "weight": {"metric": "25 - 36"}},
+    {"id": 3, "name": "Chihuahua", "weight": {"metric": "2 - 3"}},
+    {"id": 4, "name": "Mystery Dog", "weight": {"metric": "NaN"}},
+]
+CATS = [{"id": "siam", "name": "Siamese", "weight": {"metric": "4 - 6"}}]
+
+
+@pytest.fixture
+def ranges(monkeypatch):
+    catalog = BreedCatalog(snapshot_path=None)
+    catalog.replace("dog", DOGS)
+    catalog.replace("cat", CATS)
+    ranges = WeightRanges(catalog)
+    monkeypatch.setattr(weights_module, "weight_ranges", ranges)
+    monkeypatch.setattr(util, "weight_ranges", ranges)
+    monkeypatch.setattr(breeds, "weight_ranges", ranges)
+    return ranges
+
+
+@pytest.mark.parametrize("metric, expected", [
+    ("25 - 34", (25.0, 34.0)),
+    ("2.5 - 4", (2.5, 4.0)),
+    ("NaN", None),
+    ("NaN - 8", None),
+    ("23", None),
+    ("9 - 3", None),
+    (None, None),
+])
+def test_parse_weight_range(metric, expected):
+    assert parse_weight_range(metric) == expected
+
+
+class TestWeightIndex:
+    """
+    Tests for the vectorized weight classification.
+    """
+
+    index = WeightIndex(DOGS)
+
+    def test_only_parseable_ranges_are_indexed(self):
+        assert len(self.index) == 3
+        assert self.index.weight_range("golden retriever") == (25.0, 34.0)
+        assert self.index.weight_range("Labrador") == (25.0, 36.0)  # The only breed starting with it
+        assert self.index.weight_range("Retriever") is None  # Ambiguous: no guessed range
+        assert self.index.weight_range("Chihua") == (2.0, 3.0)
+        assert self.index.weight_range("hua") is None  # Inside a word only
+        assert self.index.weight_range("Mystery Dog") is None
+
+    def test_classify(self):
+        status, low, high = self.index.classify(
+            ["Chihuahua", "Golden Retriever", "Golden Retriever", "Labrador", "Unicorn", "Chihuahua"],
+            [2.5, 20.0, 40.0, 25.0, 10.0, -1.0],
+        )
+        assert status.tolist() == [2, 1, 3, 2, 0, 4]
+        assert low[:4].tolist() == [2.0, 25.0, 25.0, 25.0] and np.isnan(low[4])
+        assert high[3] == 36.0
+
+
+def validate_weight(*args, **kwargs):
+    return asyncio.run(util.validate_weight(*args, **kwargs))
+
+
+class TestWeightRanges:
+    """
+    Tests for weight ranges over the breed catalog.
+    """
+
+    def test_index_follows_catalog_changes(self, ranges):
+        assert ranges.weight_range("Siamese") == (4.0, 6.0)
+        ranges.catalog.replace("cat", [{"name": "Siamese", "weight": {"metric": "3 - 5"}}])
+        assert ranges.weight_range("siamese", "cat") == (3.0, 5.0)
+
+    def test_validate_weight(self, ranges):
+        assert validate_weight("Golden Retriever", 40.0) == (
+            "Overweight: 40.0kg exceeds the healthy range for Golden Retriever (25.0-34.0kg)."
+        )
+        assert validate_weight("Siamese", 3.0).startswith("Underweight")
+        assert validate_weight("Chihuahua", 2.5) is None
+        assert validate_weight("other", 2.5) is None
+        assert validate_weight("Unicorn", 2.5) is None
+
+    def test_bundled_ranges_until_the_catalog_is_loaded(self, ranges, monkeypatch):
+        """
+        Test the default configuration: without a loaded catalog, common breeds are checked against the bundled ranges.
+        """
+        catalog = BreedCatalog(snapshot_path=None)
+        bundled = WeightRanges(catalog)
+        monkeypatch.setattr(util, "weight_ranges", bundled)
+        result = bundled.validate_batch("dog", ["Golden Retriever", "Labrador", "Unicorn"], [40.0, 30.0, 2.5])
+        assert [item["status"] for item in result["results"]] == ["overweight", "healthy", "unknown"]
+        assert validate_weight("Golden Retriever", 40.0).startswith("Overweight")
+        assert validate_weight("Siamese", 3.0, pet_type="cat").startswith("Underweight")
+        assert validate_weight("Poodle", 40.0) is None  # Several poodle sizes: no guessed range
+        assert bundled.snapshot()["sources"] == {"dog": "fallback", "cat": "fallback"}
+
+        # The catalog takes over for the pet types it has loaded
+        catalog.replace("dog", [{"name": "Golden Retriever", "weight": {"metric": "30 - 45"}}])
+        assert validate_weight("Golden Retriever", 40.0) is None
+        assert bundled.weight_range("Siamese", "cat") == (4.0, 6.0)
+        assert bundled.snapshot()["sources"] == {"dog": "catalog", "cat": "fallback"}
+
+    def test_every_bundled_range_parses(self):
+        for pet_type, bundled in weights_module.fallback_breeds().items():
+            assert len(WeightIndex(bundled)) == len(bundled), pet_type
+
+    def test_batch_endpoint(self, ranges):
+        app = FastAPI()
+        app.include_router(breeds.router)
+        client = TestClient(app)
+        items = [{"breed": "Golden Retriever", "weight": 30}, {"breed": "Unicorn", "weight": 3}] * 5_000
+        response = client.post("/breeds/dog/weights/validate", json=items)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["summary"] == {"unknown": 5_000, "underweight": 0, "healthy": 5_000, "overweight": 0, "invalid": 0}
+        assert body["results"][:2] == [
+            {"status": "healthy", "min_weight": 25.0, "max_weight": 34.0},
+            {"status": "unknown", "min_weight": None, "max_weight": None},
+        ]
+        assert client.post("/breeds/fish/weights/validate", json=items).status_code == 400
+        assert client.post("/breeds/dog/weights/validate", json=[{"breed": "Beagle"}]).status_code == 422
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app.bulk import delete_many, summarize, update_many, validate_items
+from app.database import Base
+from app.models import User, Pet
+from app.schemas import PetBulkUpdate
+from test.sessions import threadpool_session_factory
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        db.add(User(id=1, email="owner@example.com", password="x"))
+        db.add_all([
+            Pet(id=1, name="Rex", type="dog", breed="Labrador", weight=30.0, birth_date=date(2020, 1, 1), owner_id=1),
+            Pet(id=2, name="Tom", type="cat", breed="Siamese", weight=4.0, birth_date=date(2021, 6, 1), owner_id=1),
+            Pet(id=3, name="Fido", type="dog", breed="Poodle", weight=8.0, owner_id=1),
+        ])
+        db.commit()
+
+    yield threadpool_session_factory(Session)
+    engine.dispose()
+
+
+def run(session_factory, operation):
+    async def scenario():
+        async with session_factory() as db:
+            results = await operation(db)
+            await db.commit()
+        return summarize(results)
+
+    return asyncio.run(scenario())
+
+
+class TestBulk:
+    """
+    Tests for the shared bulk update and delete helpers.
+    """
+
+    def test_update_writes_only_the_fields_each_item_set(self, session_factory):
+        items = [
+            {"id": 1, "name": "Rex", "type": "dog", "breed": "Labrador", "weight": 32.0},
+            {"id": 2, "name": "Tom", "type": "cat", "breed": "Siamese", "birth_date": "2021-07-01"},
+        ]
+        valid, failures = validate_items(items, PetBulkUpdate)
+        body = run(session_factory, lambda db: update_many(db, Pet, valid, "Pet not found."))
+        assert (body["succeeded"], body["failed"]) == (2, 0)
+
+        with session_factory.Session() as db:
+            rex, tom = db.get(Pet, 1), db.get(Pet, 2)
+            assert (rex.weight, rex.birth_date) == (32.0, date(2020, 1, 1))
+            assert (tom.weight, tom.birth_date) == (4.0, date(2021, 7, 1))
+            assert (rex.version, tom.version) == (2, 2)
+
+    def test_update_reports_unknown_and_repeated_ids(self, session_factory):
+        items = [
+            {"id": 3, "name": "Fido", "type": "dog", "breed": "Poodle"},
+            {"id": 9, "name": "Ghost", "type": "dog", "breed": "Poodle"},
+            {"id": 3, "name": "Fido II", "type": "dog", "breed": "Poodle"},
+        ]
+        valid, _ = validate_items(items, PetBulkUpdate)
+        body = run(session_factory, lambda db: update_many(db, Pet, valid, "Pet not found."))
+        assert [result["success"] for result in body["results"]] == [True, False, False]
+        assert body["results"][2]["error"] == "Duplicate id in batch."
+        with session_factory.Session() as db:
+            assert db.get(Pet, 3).name == "Fido"
+
+    def test_delete_counts_each_row_once(self, session_factory):
+        body = run(session_factory, lambda db: delete_many(db, Pet, [1, 1, 9, 2], "Pet not found."))
+        assert (body["succeeded"], body["failed"]) == (2, 2)
+        assert [result["error"] for result in body["results"]] == [
+            None, "Duplicate id in batch.", "Pet not found.", None
+        ]
+        with session_factory.Session() as db:
+            assert db.scalars(select(Pet.id)).all() == [3]
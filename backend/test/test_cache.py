@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from app.cache import LocalCache, NotFound, TieredCache
+from test.test_breed_lookup import FakeRedis
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Loader:
+    """
+    Counts its calls; returns "v<call number>", or raises NotFound when `missing` is set.
+    """
+
+    def __init__(self, missing: bool = False):
+        self.calls = 0
+        self.missing = missing
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.missing:
+            raise NotFound()
+        return f"v{self.calls}"
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_cache(clock, redis=None, **options) -> TieredCache:
+    defaults = {"ttl": 60, "stale_ttl": 600, "negative_ttl": 10, "local_ttl": 30}
+    return TieredCache("test", clock=clock, redis=(lambda: redis) if redis else None, **{**defaults, **options})
+
+
+class TestLocalCache:
+    def test_lru_eviction_and_expiry(self, clock):
+        local = LocalCache(2, clock)
+        local.set("a", {"value": 1}, 10)
+        local.set("b", {"value": 2}, 10)
+        local.get("a")
+        local.set("c", {"value": 3}, 10)  # Evicts "b", the least recently used
+        assert local.get("b") is None and local.get("a") == {"value": 1}
+        clock.now += 10
+        assert local.get("a") is None and len(local) == 1
+
+
+class TestTieredCache:
+    """
+    Tests for the two-tier read-through cache.
+    """
+
+    def test_tiers_in_order(self, clock):
+        redis, loader = FakeRedis(), Loader()
+        cache = make_cache(clock, redis)
+
+        async def run():
+            first = await cache.get_or_load("k", loader)
+            second = await cache.get_or_load("k", loader)
+            clock.now += 31  # Past the local TTL, still fresh in Redis
+            third = await cache.get_or_load("k", loader)
+            return first, second, third
+
+        assert asyncio.run(run()) == ("v1", "v1", "v1")
+        assert loader.calls == 1
+        assert (cache.stats["local"]["hits"], cache.stats["redis"]["hits"]) == (1, 1)
+        assert cache.snapshot()["offload_ratio"] == round(2 / 3, 4)
+
+    def test_stale_while_revalidate(self, clock):
+        loader = Loader()
+        cache = make_cache(clock, FakeRedis())
+
+        async def run():
+            await cache.get_or_load("k", loader)
+            clock.now += 61
+            stale = await cache.get_or_load("k", loader)
+            again = await cache.get_or_load("k", loader)  # Refresh already running: no second one
+            await cache.wait_for_refreshes()
+            return stale, again, await cache.get_or_load("k", loader)
+
+        assert asyncio.run(run()) == ("v1", "v1", "v2")
+        assert loader.calls == 2
+        assert (cache.stats["redis"]["stale"], cache.stats["local"]["stale"]) == (1, 1)
+        assert (cache.stats["upstream"]["loads"], cache.stats["upstream"]["refreshes"]) == (1, 1)
+
+    def test_failed_refresh_keeps_stale_value(self, clock):
+        cache = make_cache(clock)
+
+        async def failing():
+            raise RuntimeError("upstream down")
+
+        async def run():
+            await cache.get_or_load("k", Loader())
+            clock.now += 61
+            stale = await cache.get_or_load("k", failing)
+            await cache.wait_for_refreshes()
+            again = await cache.get_or_load("k", failing)
+            await cache.wait_for_refreshes()
+            return stale, again
+
+        assert asyncio.run(run()) == ("v1", "v1")
+        assert cache.stats["upstream"]["failed_refreshes"] == 2
+
+    def test_expired_entry_is_reloaded(self, clock):
+        loader = Loader()
+        cache = make_cache(clock, FakeRedis())
+
+        async def run():
+            await cache.get_or_load("k", loader)
+            clock.now += 60 + 600
+            return await cache.get_or_load("k", loader)
+
+        assert asyncio.run(run()) == "v2"
+        assert cache.stats["upstream"]["loads"] == 2
+
+    def test_negative_entries(self, clock):
+        redis, loader = FakeRedis(), Loader(missing=True)
+        cache = make_cache(clock, redis)
+
+        async def lookup():
+            with pytest.raises(NotFound):
+                await cache.get_or_load("typo", loader)
+
+        asyncio.run(lookup())
+        asyncio.run(lookup())
+        assert loader.calls == 1 and cache.stats["local"]["negative"] == 1
+
+        # Shared through Redis, then never served stale
+        other_worker = make_cache(clock, redis)
+        with pytest.raises(NotFound):
+            asyncio.run(other_worker.get_or_load("typo", loader))
+        assert other_worker.stats["redis"]["negative"] == 1
+        clock.now += 11
+        with pytest.raises(NotFound):
+            asyncio.run(other_worker.get_or_load("typo", loader))
+        assert loader.calls == 2
+
+    def test_errors_are_not_cached(self, clock):
+        cache = make_cache(clock)
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            raise RuntimeError("upstream down")
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                asyncio.run(cache.get_or_load("k", failing))
+        assert len(calls) == 2 and cache.stats["upstream"]["failed"] == 2
+
+    def test_redis_errors_are_skipped(self, clock):
+        cache = make_cache(clock, FakeRedis(fail=True))
+        assert asyncio.run(cache.get_or_load("k", Loader())) == "v1"
+        assert cache.stats["redis"]["errors"] == 2  # The read and the write
@@ -0,0 +1,34 @@
+import sqlite3
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.database import TimedQueuePool, pool_wait_stats
+
+
+def sqlite_connection():
+    return sqlite3.connect(":memory:")
+
+
+def refused_connection():
+    raise ConnectionRefusedError("connection refused")
+
+
+class TestPoolWaitStats:
+    """
+    Tests for the checkout counters behind GET /metrics/db-pool.
+    """
+
+    def test_exhausted_pool_counts_as_timeout(self):
+        pool = TimedQueuePool(sqlite_connection, pool_size=1, max_overflow=0, timeout=0.01, logging_name="exhausted")
+        held = pool.connect()
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+        held.close()
+        stats = pool_wait_stats["exhausted"].snapshot()
+        assert (stats["checkouts"], stats["checkout_timeouts"], stats["checkout_errors"]) == (1, 1, 0)
+
+    def test_connect_failure_counts_as_error(self):
+        pool = TimedQueuePool(refused_connection, pool_size=1, max_overflow=0, timeout=0.01, logging_name="down")
+        with pytest.raises(ConnectionRefusedError):
+            pool.connect()
+        stats = pool_wait_stats["down"].snapshot()
+        assert (stats["checkout_timeouts"], stats["checkout_errors"]) == (0, 1)
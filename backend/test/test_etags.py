@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException, Response
+from app.etags import resource_etag, collection_etag, page_etag, is_not_modified, conditional_response, if_match_versions
+
+
+def row(table, id, version):
+    return SimpleNamespace(__tablename__=table, id=id, version=version)
+
+
+class TestEtags:
+    """
+    Tests for ETag generation and conditional request parsing.
+    """
+
+    def test_resource_etag_changes_with_version(self):
+        """
+        Test that a new row version produces a new strong ETag.
+        """
+        assert resource_etag("pet", 7, 1) == '"pet-7-v1"'
+        assert resource_etag("pet", 7, 1) != resource_etag("pet", 7, 2)
+
+    def test_collection_etag_tracks_rows(self):
+        """
+        Test that list ETags change when a row is updated, added or removed.
+        """
+        rows = [row("pets", 1, 1), row("pets", 2, 1)]
+        etag = collection_etag("pets", rows)
+        assert collection_etag("pets", list(rows)) == etag
+        assert collection_etag("pets", [row("pets", 1, 2), row("pets", 2, 1)]) != etag
+        assert collection_etag("pets", rows[:1]) != etag
+        assert collection_etag("pets", [row("reminders", 1, 1), row("pets", 2, 1)]) != etag
+
+    def test_page_etag_tracks_next_cursor(self):
+        """
+        Test that a full last page changes its ETag once another page exists, and with the page size.
+        """
+        items = [row("pets", 1, 1), row("pets", 2, 1)]
+        last_page = page_etag("pets", {"items": items, "next_cursor": None}, 2)
+        assert page_etag("pets", {"items": list(items), "next_cursor": None}, 2) == last_page
+        assert page_etag("pets", {"items": items, "next_cursor": "Mg"}, 2) != last_page
+        assert page_etag("pets", {"items": items, "next_cursor": None}, 3) != last_page
+
+    def test_if_none_match(self):
+        """
+        Test weak comparison, lists and the wildcard for If-None-Match.
+        """
+        etag = '"pet-7-v1"'
+        assert is_not_modified(etag, etag)
+        assert is_not_modified('W/"pet-7-v1"', etag)
+        assert is_not_modified('"pet-7-v0", "pet-7-v1"', etag)
+        assert is_not_modified("*", etag)
+        assert not is_not_modified('"pet-7-v2"', etag)
+        assert not is_not_modified(None, etag)
+
+    def test_conditional_response(self):
+        """
+        Test that a match yields 304 and a miss sets the ETag header.
+        """
+        response = Response()
+        assert conditional_response('"pet-7-v0"', '"pet-7-v1"', response) is None
+        assert response.headers["etag"] == '"pet-7-v1"'
+
+        not_modified = conditional_response('"pet-7-v1"', '"pet-7-v1"', Response())
+        assert not_modified.status_code == 304
+        assert not_modified.headers["etag"] == '"pet-7-v1"'
+
+    def test_if_match_versions(self):
+        """
+        Test that If-Match is turned into the versions an update may apply to.
+        """
+        assert if_match_versions(None, "pet", 7) is None
+        assert if_match_versions("*", "pet", 7) is None
+        assert if_match_versions('"pet-7-v3"', "pet", 7) == [3]
+        assert if_match_versions('"pet-7-v3", "pet-7-v4"', "pet", 7) == [3, 4]
+
+    @pytest.mark.parametrize("header", ['"pet-8-v3"', 'W/"pet-7-v3"', '"reminder-7-v3"', '"garbage"'])
+    def test_if_match_rejects_foreign_or_weak_tags(self, header):
+        """
+        Test that tags for another resource, or weak tags, fail the precondition.
+        """
+        with pytest.raises(HTTPException) as exc:
+            if_match_versions(header, "pet", 7)
+        assert exc.value.status_code == 412
@@ -0,0 +1,148 @@
+import asyncio
+import os
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from app import database
+from app.database import Base
+from app.models import User, Pet, Reminder
+from app.routes.calendar import get_pet_calendar
+from app.ics_feed import escape_text, fold, reminder_event, calendar_header, single_event_calendar, FragmentCache
+from test.sessions import threadpool_session_factory
+
+
+def reminder(version=1, title="Flea treatment", recurrence=None):
+    return SimpleNamespace(
+        id=7, version=version, title=title, description="Apply, then wait; 24h\nno bath",
+        due_date=date(2024, 5, 1), updated_at=datetime(2024, 4, 1, 12, 0, tzinfo=timezone.utc),
+        recurrence=recurrence, recurrence_start=date(2024, 2, 1) if recurrence else None,
+    )
+
+
+class TestIcsFeed:
+    """
+    Tests for iCalendar serialization and the fragment cache.
+    """
+
+    def test_escape_text(self):
+        """
+        Test that TEXT values escape separators and newlines.
+        """
+        assert escape_text("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+    def test_fold_long_lines(self):
+        """
+        Test that lines are folded to 75 octets without splitting multi-byte characters.
+        """
+        line = "SUMMARY:" + "é" * 60
+        folded = fold(line)
+        physical = folded.encode("utf-8").split(b"\r\n")[:-1]
+        assert all(len(part) <= 75 for part in physical)
+        assert all(part.startswith(b" ") for part in physical[1:])
+        assert folded.replace("\r\n ", "").rstrip("\r\n") == line
+
+    def test_reminder_event(self):
+        """
+        Test the VEVENT fields of a reminder.
+        """
+        event = reminder_event(reminder(), "Rex", pet_version=1).decode()
+        assert "UID:reminder-7@pawfectplanner\r\n" in event
+        assert "DTSTART;VALUE=DATE:20240501\r\n" in event
+        assert "DTEND;VALUE=DATE:20240502\r\n" in event
+        assert "SUMMARY:Rex: Flea treatment\r\n" in event
+        assert "DESCRIPTION:Apply\\, then wait\\; 24h\\nno bath\r\n" in event
+
+    def test_recurring_reminder_event(self):
+        """
+        Test that a recurring reminder is one event with an RRULE, starting at the series anchor.
+        """
+        event = reminder_event(reminder(version=3, recurrence="FREQ=MONTHLY;INTERVAL=1")).decode()
+        assert "DTSTART;VALUE=DATE:20240201\r\n" in event
+        assert "RRULE:FREQ=MONTHLY;INTERVAL=1\r\n" in event
+
+    def test_new_version_is_not_served_from_cache(self):
+        """
+        Test that editing a row (which bumps its version) produces a fresh fragment.
+        """
+        assert b"Flea treatment" in reminder_event(reminder(version=1), "Rex", pet_version=1)
+        assert b"Deworming" in reminder_event(reminder(version=2, title="Deworming"), "Rex", pet_version=1)
+
+    def test_fragment_cache_is_bounded(self):
+        """
+        Test that the least recently used fragment is evicted first.
+        """
+        cache = FragmentCache(maxsize=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.snapshot()["size"] == 2
+
+    def test_single_event_calendar(self):
+        """
+        Test that a single export is a complete calendar.
+        """
+        body = single_event_calendar("Flea treatment", reminder_event(reminder())).decode()
+        assert body.startswith(calendar_header("Flea treatment").decode())
+        assert body.endswith("END:VEVENT\r\nEND:VCALENDAR\r\n")
+
+
+# Snapshot reads need PostgreSQL; see test_query_plans.py for TEST_DATABASE_URL
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def pet_database(monkeypatch):
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        db.add(User(id=1, email="owner@example.com", password="x"))
+        db.add(Pet(id=1, name="Rex", type="dog", breed="Labrador", owner_id=1))
+        db.flush()
+        db.add(Reminder(id=1, title="Flea treatment", due_date=date(2024, 5, 1), pet_id=1))
+        db.commit()
+
+    monkeypatch.setattr(database, "session_scope", threadpool_session_factory(Session))
+    yield Session
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+class TestCalendarFeed:
+    """
+    Tests for the streamed calendar feeds.
+    """
+
+    def test_body_matches_etag_despite_concurrent_write(self, pet_database):
+        """
+        Test that a write between computing the ETag and streaming the body does not reach the body.
+        """
+        request = Request({"type": "http", "method": "GET", "path": "/calendar/pets/1.ics", "headers": []})
+
+        async def read_feed(write_before_streaming=False):
+            response = await get_pet_calendar(1, request, if_none_match=None)
+            if write_before_streaming:
+                with pet_database() as db:
+                    db.add(Reminder(id=2, title="Vet visit", due_date=date(2024, 5, 2), pet_id=1))
+                    db.commit()
+            body = b"".join([chunk async for chunk in response.body_iterator]).decode()
+            await response.background()
+            return response.headers["ETag"], body
+
+        first_etag, first_body = asyncio.run(read_feed(write_before_streaming=True))
+        assert "Flea treatment" in first_body
+        assert "Vet visit" not in first_body
+
+        second_etag, second_body = asyncio.run(read_feed())
+        assert "Vet visit" in second_body
+        assert second_etag != first_etag
@@ -0,0 +1,57 @@
+import asyncio
+from app.jobs.base import BackgroundJob, env_flag
+
+
+class CountingJob(BackgroundJob):
+    def __init__(self, interval_seconds, fail=False):
+        super().__init__(interval_seconds)
+        self.fail = fail
+        self.stopped = False
+        self.stats.update(runs=0)
+
+    async def run_once(self):
+        self.stats["runs"] += 1
+        if self.fail:
+            raise RuntimeError("boom")
+
+    async def on_stop(self):
+        self.stopped = True
+
+
+def test_env_flag(monkeypatch):
+    monkeypatch.setenv("JOB_FLAG", "Yes")
+    assert env_flag("JOB_FLAG")
+    monkeypatch.setenv("JOB_FLAG", "off")
+    assert not env_flag("JOB_FLAG", default=True)
+    monkeypatch.delenv("JOB_FLAG")
+    assert env_flag("JOB_FLAG", default=True)
+    assert not env_flag("JOB_FLAG")
+
+
+def test_job_repeats_until_stopped_and_counts_failures():
+    job = CountingJob(interval_seconds=0.01, fail=True)
+
+    async def scenario():
+        job.start()
+        await asyncio.sleep(0.05)
+        running = job.snapshot()["running"]
+        await job.stop()
+        return running
+
+    assert asyncio.run(scenario())
+    assert job.stats["runs"] > 1
+    assert job.stats["failed"] == job.stats["runs"]
+    assert job.stopped
+    assert not job.snapshot()["running"]
+
+
+def test_one_off_job_runs_once():
+    job = CountingJob(interval_seconds=None)
+
+    async def scenario():
+        job.start()
+        await job._task
+        await job.stop()
+
+    asyncio.run(scenario())
+    assert job.stats == {"failed": 0, "runs": 1}
@@ -0,0 +1,43 @@
+from datetime import date
+import pytest
+from fastapi import HTTPException
+from app.pagination import encode_cursor, decode_cursor, paginate
+
+
+class TestPagination:
+    """
+    Tests for keyset pagination helpers.
+    """
+
+    def test_cursor_round_trip(self):
+        """
+        Test that a (date, id) sort key survives encoding.
+        """
+        cursor = encode_cursor(date(2024, 5, 1), 17)
+        assert decode_cursor(cursor, (date, int)) == [date(2024, 5, 1), 17]
+
+    def test_cursor_keeps_null_dates(self):
+        """
+        Test that undated treatments can be used as a cursor position.
+        """
+        cursor = encode_cursor(None, 3)
+        assert decode_cursor(cursor, (date, int)) == [None, 3]
+
+    def test_invalid_cursor(self):
+        """
+        Test that a tampered cursor is rejected with 400.
+        """
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor("not-a-cursor", (int,))
+        assert exc.value.status_code == 400
+
+    def test_paginate_sets_next_cursor_only_when_more_rows(self):
+        """
+        Test that the extra fetched row is dropped and turned into a cursor.
+        """
+        page = paginate([1, 2, 3], 2, lambda row: (row,))
+        assert page["items"] == [1, 2]
+        assert decode_cursor(page["next_cursor"], (int,)) == [2]
+
+        last_page = paginate([1, 2], 2, lambda row: (row,))
+        assert last_page["next_cursor"] is None
@@ -0,0 +1,87 @@
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from app.recurrence import (
+    Interval, parse_recurrence, normalize_recurrence, occurrences, next_occurrence, reminder_occurrences
+)
+
+
+class TestRecurrence:
+    """
+    Tests for recurrence parsing and lazy occurrence expansion.
+    """
+
+    @pytest.mark.parametrize("text, expected", [
+        ("2 months", Interval(2, "month")),
+        ("Yearly", Interval(1, "year")),
+        ("1 year", Interval(1, "year")),
+        ("every 3 weeks", Interval(3, "week")),
+        ("every day", Interval(1, "day")),
+        ("fortnightly", Interval(2, "week")),
+        ("FREQ=MONTHLY;INTERVAL=6", Interval(6, "month")),
+        ("RRULE:FREQ=WEEKLY", Interval(1, "week")),
+    ])
+    def test_parse(self, text, expected):
+        """
+        Test the RRULE subset and the free-text frequencies used in the app.
+        """
+        assert parse_recurrence(text) == expected
+
+    @pytest.mark.parametrize("text", ["sometimes", "0 months", "FREQ=HOURLY", "FREQ=MONTHLY;BYDAY=MO"])
+    def test_parse_rejects_unsupported_rules(self, text):
+        """
+        Test that unsupported rules are rejected instead of silently ignored.
+        """
+        with pytest.raises(ValueError):
+            parse_recurrence(text)
+
+    def test_normalize(self):
+        """
+        Test that rules are stored as canonical RRULEs.
+        """
+        assert normalize_recurrence("every 2 weeks") == "FREQ=WEEKLY;INTERVAL=2"
+        assert normalize_recurrence("") is None
+
+    def test_occurrences_within_window(self):
+        """
+        Test that only the occurrences inside the window are produced.
+        """
+        days = list(occurrences(date(2020, 1, 1), Interval(3, "day"), date(2024, 1, 1), date(2024, 1, 10)))
+        assert days == [date(2024, 1, 1), date(2024, 1, 4), date(2024, 1, 7), date(2024, 1, 10)]
+
+    def test_month_end_anchor_does_not_drift(self):
+        """
+        Test that a series anchored on the 31st clamps in short months and comes back to the 31st.
+        """
+        days = list(occurrences(date(2024, 1, 31), Interval(1, "month"), date(2024, 1, 1), date(2024, 5, 31)))
+        assert days == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31)]
+
+    def test_single_occurrence_without_interval(self):
+        """
+        Test that a one-off date is its own series.
+        """
+        assert list(occurrences(date(2024, 3, 1), None, date(2024, 1, 1), date(2024, 12, 31))) == [date(2024, 3, 1)]
+        assert list(occurrences(date(2025, 3, 1), None, date(2024, 1, 1), date(2024, 12, 31))) == []
+
+    def test_next_occurrence(self):
+        """
+        Test that the next occurrence is strictly after the given day.
+        """
+        assert next_occurrence(date(2024, 1, 31), Interval(1, "month"), date(2024, 2, 29)) == date(2024, 3, 31)
+        assert next_occurrence(date(2020, 2, 29), Interval(1, "year"), date(2023, 6, 1)) == date(2024, 2, 29)
+
+    def test_reminder_occurrences(self):
+        """
+        Test that recurring reminders expand from their series start and merge with one-off reminders.
+        """
+        reminders = [
+            SimpleNamespace(id=1, pet_id=1, title="Flea", description=None, due_date=date(2024, 3, 1),
+                            recurrence="FREQ=MONTHLY;INTERVAL=1", recurrence_start=date(2024, 1, 15)),
+            SimpleNamespace(id=2, pet_id=1, title="Vet", description=None, due_date=date(2024, 2, 20),
+                            recurrence=None, recurrence_start=date(2024, 2, 20)),
+        ]
+        items = reminder_occurrences(reminders, date(2024, 2, 1), date(2024, 3, 31))
+        assert [(item["reminder_id"], item["date"]) for item in items] == [
+            (1, date(2024, 2, 15)), (2, date(2024, 2, 20)), (1, date(2024, 3, 15)),
+        ]
+        assert items[0]["recurring"] and not items[1]["recurring"]
@@ -0,0 +1,257 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_session
+from app.models import User, Pet, Reminder
+from app.bulk import update_rows
+from app.jobs.reminder_dispatch import ReminderDispatcher
+from app.queries import claim_due_reminders, reset_dispatch_state
+from app.routes.reminders import router as reminders_router
+from test.sessions import threadpool_session_factory
+
+NOW = datetime(2024, 5, 1, 23, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    File-backed SQLite database so several dispatchers can share it.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'dispatch.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        db.add(User(id=1, email="owner@example.com", password="x"))
+        db.add(Pet(id=1, name="Rex", type="dog", breed="Labrador", owner_id=1))
+        db.add_all([
+            Reminder(id=1, title="Flea treatment", due_date=date(2024, 5, 1), pet_id=1),
+            Reminder(id=2, title="Vet visit", due_date=date(2024, 5, 2), pet_id=1),
+            Reminder(id=3, title="Vaccine", due_date=date(2024, 6, 1), pet_id=1),
+        ])
+        db.commit()
+
+    yield threadpool_session_factory(Session)
+    engine.dispose()
+
+
+def make_dispatcher(session_factory, fired, worker_id, clock=lambda: NOW, hooks=None):
+    return ReminderDispatcher(
+        hooks=hooks if hooks is not None else [lambda reminder: fired.append((worker_id, reminder.id))],
+        session_factory=session_factory, clock=clock, worker_id=worker_id, lookahead_seconds=3600, lease_seconds=60,
+    )
+
+
+def notified(session_factory) -> dict:
+    with session_factory.Session() as db:
+        return dict(db.execute(select(Reminder.id, Reminder.notified_at)).all())
+
+
+class TestReminderDispatch:
+    """
+    Tests for claiming, firing and acknowledging due reminders.
+    """
+
+    def test_fires_due_reminders_once(self, session_factory):
+        """
+        Test that reminders due in the window fire and are marked notified; later ones stay pending.
+        """
+        fired = []
+        dispatcher = make_dispatcher(session_factory, fired, "a")
+        asyncio.run(dispatcher.tick())
+
+        # Reminder 2 is due at midnight, inside the one hour look-ahead: claimed but not fired yet
+        assert fired == [("a", 1)]
+        assert dispatcher.snapshot()["pending"] == 1
+        assert notified(session_factory)[1] is not None
+        assert notified(session_factory)[2] is None
+
+        dispatcher.clock = lambda: NOW + timedelta(hours=1)
+        asyncio.run(dispatcher.tick())
+        assert fired == [("a", 1), ("a", 2)]
+        assert notified(session_factory)[3] is None
+        assert dispatcher.stats["acknowledged"] == 2
+
+    def test_workers_do_not_double_claim(self, session_factory):
+        """
+        Test that a second worker skips reminders under another worker's lease.
+        """
+        fired = []
+        first = make_dispatcher(session_factory, fired, "a")
+        second = make_dispatcher(session_factory, fired, "b")
+        assert asyncio.run(first.claim(NOW)) == 2
+        assert asyncio.run(second.claim(NOW)) == 0
+
+        asyncio.run(first.fire_due(NOW + timedelta(hours=1)))
+        asyncio.run(second.fire_due(NOW + timedelta(hours=1)))
+        assert sorted(fired) == [("a", 1), ("a", 2)]
+
+    def test_failed_delivery_is_retried_after_lease(self, session_factory):
+        """
+        Test at-least-once delivery: a failing hook leaves the reminder to be claimed again.
+        """
+        def broken(reminder):
+            raise RuntimeError("push service down")
+
+        failing = make_dispatcher(session_factory, [], "a", hooks=[broken])
+        asyncio.run(failing.tick())
+        assert failing.stats["failed"] == 1
+        assert notified(session_factory)[1] is None
+
+        fired = []
+        later = NOW + timedelta(hours=2, minutes=1)  # past horizon + lease of the first claim
+        retry = make_dispatcher(session_factory, fired, "b", clock=lambda: later)
+        asyncio.run(retry.tick())
+        assert ("b", 1) in fired
+        assert notified(session_factory)[1] is not None
+
+    def test_release_hands_back_unfired_claims(self, session_factory):
+        """
+        Test that stopping a worker lets another one claim its pending reminders immediately.
+        """
+        fired = []
+        first = make_dispatcher(session_factory, fired, "a")
+        asyncio.run(first.claim(NOW))
+        asyncio.run(first.release())
+        assert first.stats["released"] == 2
+
+        second = make_dispatcher(session_factory, fired, "b")
+        assert asyncio.run(second.claim(NOW)) == 2
+
+    def test_recurring_reminder_moves_to_next_occurrence(self, session_factory):
+        """
+        Test that a fired recurring reminder is not marked notified but rescheduled to its next occurrence.
+        """
+        with session_factory.Session() as db:
+            db.get(Reminder, 1).recurrence = "FREQ=MONTHLY;INTERVAL=1"
+            db.get(Reminder, 1).recurrence_start = date(2024, 1, 1)
+            db.commit()
+
+        fired = []
+        dispatcher = make_dispatcher(session_factory, fired, "a")
+        asyncio.run(dispatcher.tick())
+        assert fired == [("a", 1)]
+        with session_factory.Session() as db:
+            reminder = db.get(Reminder, 1)
+            assert reminder.notified_at is None
+            assert reminder.due_date == date(2024, 6, 1)
+            assert reminder.claimed_by is None
+            assert reminder.version == 2
+
+    def test_rescheduled_reminder_fires_again(self, session_factory):
+        """
+        Test that moving a notified reminder's date clears its dispatch state, while other edits keep it.
+        """
+        fired = []
+        dispatcher = make_dispatcher(session_factory, fired, "a")
+        asyncio.run(dispatcher.tick())
+        assert notified(session_factory)[1] is not None
+
+        def claimable():
+            statement = claim_due_reminders("b", NOW, NOW.date(), NOW + timedelta(minutes=1), 10)
+            with session_factory.Session() as db:
+                rows = db.execute(statement).all()
+                db.rollback()
+            return [row.id for row in rows]
+
+        # Same date, new title (as a full PUT sends it): still notified
+        values = {"title": "Flea and tick treatment", "due_date": date(2024, 5, 1), "recurrence_start": date(2024, 5, 1)}
+        with session_factory.Session() as db:
+            db.execute(update(Reminder).where(Reminder.id == 1).values(**values, **reset_dispatch_state(values)))
+            db.commit()
+        assert claimable() == []
+
+        # Moved to a new date through the bulk path: claimed again
+        async def reschedule():
+            async with session_factory() as db:
+                await update_rows(
+                    db, Reminder, [{"id": 1, "due_date": date(2024, 4, 30), "recurrence_start": date(2024, 4, 30)}],
+                    reset_dispatch_state,
+                )
+                await db.commit()
+
+        asyncio.run(reschedule())
+        assert notified(session_factory)[1] is None
+        assert claimable() == [1]
+
+    def test_reminder_moved_while_held_is_requeued(self, session_factory):
+        """
+        Test that a held reminder moved to a later date is not marked notified at its old time.
+        """
+        fired = []
+        dispatcher = make_dispatcher(session_factory, fired, "a")
+        asyncio.run(dispatcher.claim(NOW))
+        assert dispatcher.snapshot()["pending"] == 2
+
+        # Reminder 2 is edited in the database while it waits in the heap; its claim stays in place
+        with session_factory.Session() as db:
+            reminder = db.get(Reminder, 2)
+            reminder.due_date = date(2024, 5, 20)
+            reminder.version += 1
+            db.commit()
+
+        asyncio.run(dispatcher.fire_due(NOW + timedelta(hours=1)))
+        assert ("a", 2) in fired
+        assert notified(session_factory)[2] is None
+        assert dispatcher.stats["requeued"] == 1
+        with session_factory.Session() as db:
+            assert db.get(Reminder, 2).claimed_by is None
+
+        # Claimed again, and fired, on its new date
+        fired.clear()
+        dispatcher.clock = lambda: datetime(2024, 5, 20, 0, 1, tzinfo=timezone.utc)
+        asyncio.run(dispatcher.tick())
+        assert fired == [("a", 2)]
+        assert notified(session_factory)[2] is not None
+
+
+@pytest.fixture
+def client(session_factory):
+    """
+    The reminders router on the dispatch test database.
+    """
+    app = FastAPI()
+    app.include_router(reminders_router, prefix="/reminders")
+
+    async def get_test_session():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_session] = get_test_session
+    return TestClient(app)
+
+
+class TestReminderRoutes:
+    """
+    Tests that the reminder update routes reset the dispatch state of rescheduled reminders.
+    """
+
+    def test_put_reschedules_a_notified_reminder(self, session_factory, client):
+        asyncio.run(make_dispatcher(session_factory, [], "a").tick())
+        assert notified(session_factory)[1] is not None
+
+        response = client.put("/reminders/1", json={"title": "Flea and tick treatment", "due_date": "2024-05-01"})
+        assert response.status_code == 200
+        assert notified(session_factory)[1] is not None
+
+        response = client.put("/reminders/1", json={"title": "Flea treatment", "due_date": "2024-05-03"})
+        assert response.status_code == 200
+        assert response.json()["due_date"] == "2024-05-03"
+        assert notified(session_factory)[1] is None
+
+    def test_bulk_put_reschedules_notified_reminders(self, session_factory, client):
+        dispatcher = make_dispatcher(session_factory, [], "a", clock=lambda: NOW + timedelta(hours=1))
+        asyncio.run(dispatcher.tick())
+        assert notified(session_factory)[2] is not None
+
+        response = client.put("/reminders/bulk", json=[
+            {"id": 1, "title": "Flea treatment", "due_date": "2024-05-03"},
+            {"id": 2, "title": "Vet visit", "due_date": "2024-05-02"},
+        ])
+        assert response.status_code == 200
+        assert response.json()["succeeded"] == 2
+        assert notified(session_factory)[1] is None
+        assert notified(session_factory)[2] is not None
@@ -0,0 +1,121 @@
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.jobs.treatment_rollover import TreatmentRollover
+from app.models import User, Pet, Treatment
+from app.recurrence import Interval, next_occurrence
+from app.schemas import TreatmentCreate, TreatmentBulkUpdate
+from test.sessions import threadpool_session_factory
+
+# The rollover statements use PostgreSQL date arithmetic; see test_query_plans.py for TEST_DATABASE_URL
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+TODAY = date(2024, 5, 15)
+
+CASES = [
+    # (frequency, next_due_date)
+    ("1 day", date(2024, 5, 14)),
+    ("3 days", date(2024, 5, 1)),
+    ("every 2 weeks", date(2024, 1, 3)),
+    ("1 month", date(2024, 1, 31)),
+    ("2 months", date(2023, 3, 15)),
+    ("6 months", date(2024, 5, 16)),  # Not overdue yet
+    ("Yearly", date(2020, 2, 29)),
+    ("1 month", date(2024, 4, 15)),
+    (None, date(2023, 1, 1)),  # No frequency: left alone
+]
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        db.add(User(id=1, email="owner@example.com", password="x"))
+        db.add(Pet(id=1, name="Rex", type="dog", breed="Labrador", owner_id=1))
+        db.flush()
+        for index, (frequency, due) in enumerate(CASES, start=1):
+            fields = TreatmentCreate(name="treatment", frequency=frequency, next_due_date=due, pet_id=1).model_dump()
+            db.add(Treatment(id=index, **fields))
+        db.commit()
+
+    yield threadpool_session_factory(Session)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+class TestTreatmentFrequency:
+    """
+    Tests for parsing the treatment frequency at write time.
+    """
+
+    def test_frequency_is_parsed(self):
+        treatment = TreatmentCreate(name="Flea", frequency="every 3 weeks", pet_id=1)
+        assert (treatment.frequency_count, treatment.frequency_unit) == (3, "week")
+        assert treatment.frequency == "every 3 weeks"
+
+    def test_interval_is_not_taken_from_the_request(self):
+        treatment = TreatmentCreate(name="Flea", frequency_count=9, frequency_unit="day", pet_id=1)
+        assert treatment.frequency_count is None and treatment.frequency_unit is None
+
+    def test_partial_update_keeps_interval(self):
+        """
+        Test that a partial update without a frequency does not clear the stored interval.
+        """
+        assert TreatmentBulkUpdate(id=1, name="Flea").model_dump(exclude_unset=True) == {"id": 1, "name": "Flea"}
+        changed = TreatmentBulkUpdate(id=1, name="Flea", frequency="Yearly").model_dump(exclude_unset=True)
+        assert (changed["frequency_count"], changed["frequency_unit"]) == (1, "year")
+
+    def test_free_text_frequency_has_no_interval(self):
+        """
+        Test that frequencies outside the supported grammar are accepted as written, like legacy rows.
+        """
+        treatment = TreatmentCreate(name="Flea", frequency="as needed", pet_id=1)
+        assert treatment.frequency == "as needed"
+        assert treatment.frequency_count is None and treatment.frequency_unit is None
+        changed = TreatmentBulkUpdate(id=1, name="Flea", frequency="now and then").model_dump(exclude_unset=True)
+        assert (changed["frequency_count"], changed["frequency_unit"]) == (None, None)
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+class TestTreatmentRollover:
+    """
+    Tests for the set-based next_due_date rollover.
+    """
+
+    def test_overdue_treatments_move_to_next_occurrence(self, session_factory):
+        """
+        Test that each overdue row lands on the first occurrence on or after today, as computed in Python.
+        """
+        job = TreatmentRollover(session_factory, clock=lambda: datetime.combine(TODAY, datetime.min.time(), timezone.utc))
+        result = asyncio.run(job.roll_over())
+
+        with session_factory.Session() as db:
+            rows = {row.id: row for row in db.execute(select(Treatment)).scalars()}
+        advanced = 0
+        for index, (frequency, due) in enumerate(CASES, start=1):
+            row = rows[index]
+            if row.frequency_unit and due < TODAY:
+                expected = next_occurrence(due, Interval(row.frequency_count, row.frequency_unit), TODAY - timedelta(days=1))
+                assert row.next_due_date == expected, frequency
+                assert row.version == 2
+                advanced += 1
+            else:
+                assert row.next_due_date == due
+                assert row.version == 1
+        assert result["advanced"] == advanced
+        assert result["advanced_by_days"] == 3
+
+    def test_second_run_is_a_no_op(self, session_factory):
+        job = TreatmentRollover(session_factory, clock=lambda: datetime.combine(TODAY, datetime.min.time(), timezone.utc))
+        asyncio.run(job.roll_over())
+        assert asyncio.run(job.roll_over())["advanced"] == 0
+        assert job.snapshot()["runs"] == 2
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+from app.upstream import CircuitOpen, DeadlineExceeded, HostPolicy, Upstream
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers each request with the next (delay, status) step scripted for its path; the last step repeats.
+    """
+
+    def handle_request(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            steps = server.script.get(self.path, [(0, 200)])
+            delay, status = steps.pop(0) if len(steps) > 1 else steps[0]
+        time.sleep(delay)
+        body = json.dumps({"path": self.path, "status": status}).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up (deadline or hedge)
+
+    do_GET = do_POST = handle_request
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock, server.hits, server.script = threading.Lock(), {}, {}
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def call(layer: Upstream, method: str, url: str):
+    async def run():
+        async with httpx.AsyncClient(timeout=5) as client:
+            layer.client = lambda: client
+            return await layer.request(method, url)
+
+    return asyncio.run(run())
+
+
+def make_layer(**policy) -> Upstream:
+    return Upstream(default=HostPolicy(**{"deadline": 2, "retries": 2, "backoff": 0.01, "hedge_delay": 0, **policy}))
+
+
+class TestUpstream:
+    """
+    Tests for the outbound resilience layer against a local stub server.
+    """
+
+    def test_retries_transient_errors(self, stub):
+        stub.script["/flaky"] = [(0, 503), (0, 502), (0, 200)]
+        layer = make_layer()
+        assert call(layer, "GET", f"{stub.url}/flaky").status_code == 200
+        assert stub.hits["/flaky"] == 3
+        assert layer.stats["127.0.0.1"]["retries"] == 2
+
+    def test_retries_are_bounded(self, stub):
+        stub.script["/down"] = [(0, 500)]
+        response = call(make_layer(retries=1), "GET", f"{stub.url}/down")
+        assert response.status_code == 500 and stub.hits["/down"] == 2
+
+    def test_client_errors_and_posts_are_not_retried(self, stub):
+        stub.script["/missing"] = [(0, 404)]
+        stub.script["/write"] = [(0, 503)]
+        layer = make_layer()
+        assert call(layer, "GET", f"{stub.url}/missing").status_code == 404
+        assert call(layer, "POST", f"{stub.url}/write").status_code == 503
+        assert (stub.hits["/missing"], stub.hits["/write"]) == (1, 1)
+        assert layer.breaker("127.0.0.1").consecutive_failures == 1
+
+    def test_deadline_covers_all_attempts(self, stub):
+        stub.script["/slow"] = [(1, 200)]
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            call(make_layer(deadline=0.2), "GET", f"{stub.url}/slow")
+        assert time.perf_counter() - start < 0.6
+
+    def test_circuit_breaker(self, stub):
+        stub.script["/down"] = [(0, 500), (0, 500), (0, 500), (0, 200)]
+        clock = Clock()
+        layer = make_layer(retries=0, failures=3, reset_seconds=30)
+        layer.clock = clock
+        for _ in range(3):
+            assert call(layer, "GET", f"{stub.url}/down").status_code == 500
+        assert layer.breaker("127.0.0.1").state == "open"
+
+        # Fails fast without reaching the host
+        with pytest.raises(CircuitOpen):
+            call(layer, "GET", f"{stub.url}/down")
+        assert stub.hits["/down"] == 3
+
+        # After the reset time one trial call goes through and closes the circuit
+        clock.now += 30
+        assert call(layer, "GET", f"{stub.url}/down").status_code == 200
+        assert layer.breaker("127.0.0.1").snapshot() == {
+            "state": "closed", "consecutive_failures": 0, "opened": 1, "rejected": 1
+        }
+
+    def test_failed_trial_reopens_the_circuit(self, stub):
+        stub.script["/down"] = [(0, 500)]
+        clock = Clock()
+        layer = make_layer(retries=2, failures=1, reset_seconds=30)
+        layer.clock = clock
+        assert call(layer, "GET", f"{stub.url}/down").status_code == 500
+        assert stub.hits["/down"] == 1  # The circuit opened before the first retry
+        clock.now += 30
+        assert call(layer, "GET", f"{stub.url}/down").status_code == 500  # Failed trial, no retry
+        assert stub.hits["/down"] == 2 and layer.breaker("127.0.0.1").state == "open"
+        with pytest.raises(CircuitOpen):
+            call(layer, "GET", f"{stub.url}/down")
+
+    def test_hedged_request_cuts_tail_latency(self, stub):
+        stub.script["/tail"] = [(1, 200), (0, 200)]
+        layer = make_layer(hedge_delay=0.05)
+        start = time.perf_counter()
+        assert call(layer, "GET", f"{stub.url}/tail").status_code == 200
+        assert time.perf_counter() - start < 0.5
+        assert stub.hits["/tail"] == 2 and layer.stats["127.0.0.1"]["hedged"] == 1
+
+    def test_fast_response_is_not_hedged(self, stub):
+        layer = make_layer(hedge_delay=0.5)
+        assert call(layer, "GET", f"{stub.url}/fast").status_code == 200
+        assert stub.hits["/fast"] == 1 and layer.stats["127.0.0.1"]["hedged"] == 0
+
+    def test_per_host_policy(self):
+        layer = Upstream(policies={"api.thecatapi.com": HostPolicy(deadline=1)})
+        assert layer.policy("api.thecatapi.com").deadline == 1
+        assert layer.policy("api.thedogapi.com") == layer.default
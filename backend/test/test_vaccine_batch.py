@@ -0,0 +1,61 @@
+import json
+from datetime import date, timedelta
+from app.vaccines import batch
+from app.vaccines.batch import stream_schedules
+from app.vaccines.vaccines import VALID_PET_TYPES, calculate_vaccine_schedule
+
+
+def run_batch(items, language="en", as_of=None):
+    body = b"".join(stream_schedules(items, language, as_of or date.today(), VALID_PET_TYPES))
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+class TestVaccineBatch:
+    """
+    Tests for batch vaccine schedules.
+    """
+
+    def test_matches_single_schedule(self, monkeypatch):
+        """
+        Test that every batch line equals the single-pet schedule for the same input, across chunks.
+        """
+        monkeypatch.setattr(batch, "VACCINE_SCHEDULE_CHUNK_SIZE", 5)
+        today = date.today()
+        items = [
+            {"pet_type": pet_type, "birth_date": str(today - timedelta(days=days))}
+            for pet_type in ("dog", "cat")
+            for days in (-30, 0, 1, 20, 45, 70, 100, 364, 365, 366, 730, 1000, 3650)
+        ]
+        lines = run_batch(items)
+        assert [line["index"] for line in lines] == list(range(len(items)))
+        for item, line in zip(items, lines):
+            assert line["success"] and line["pet_type"] == item["pet_type"]
+            assert line["schedule"] == calculate_vaccine_schedule(item["birth_date"], item["pet_type"])["schedule"]
+
+    def test_matches_single_schedule_on_month_ends(self):
+        """
+        Test month and year arithmetic (clamping, leap days, age limits) against the single-pet engine.
+        """
+        as_of = date(2024, 2, 29)
+        births = [date(2000, 1, 1) + timedelta(days=days) for days in range(0, 9200, 13)]
+        births += [date(2023, 1, 31), date(2023, 8, 31), date(2020, 2, 29), date(2014, 3, 1), date(2024, 3, 1)]
+        items = [{"pet_type": pet_type, "birth_date": str(birth)} for pet_type in ("dog", "cat") for birth in births]
+        for item, line in zip(items, run_batch(items, as_of=as_of)):
+            single = calculate_vaccine_schedule(item["birth_date"], item["pet_type"], as_of=as_of)
+            assert line["schedule"] == single["schedule"], item
+
+    def test_descriptions_follow_the_pet_type(self):
+        lines = run_batch([{"pet_type": "dog", "birth_date": "2026-06-01"}], as_of=date(2026, 10, 18))
+        rabies = next(entry for entry in lines[0]["schedule"] if entry["name"] == "Rabies")
+        assert rabies["description"].startswith("A viral disease fatal to dogs")
+
+    def test_invalid_items_are_reported_per_line(self):
+        lines = run_batch([
+            {"pet_type": "dog", "birth_date": "2024-01-01"},
+            {"pet_type": "dog", "birth_date": "not-a-date"},
+            {"pet_type": "bird", "birth_date": "2024-01-01"},
+            {"birth_date": "2024-01-01"},
+        ])
+        assert [line["success"] for line in lines] == [True, False, False, False]
+        assert lines[2]["error"] == "Unsupported pet type: bird."
+        assert "birth_date" in lines[1]["error"] and "pet_type" in lines[3]["error"]
@@ -0,0 +1,84 @@
+import json
+import os
+from app.recurrence import Interval
+from app.vaccines.catalog import VaccineCatalog, catalog
+
+DOG_DATA = {
+    "mandatory": [{"name": "Rabies", "frequency": "2 years", "description": "Rabies vaccine."}],
+    "recommended": [
+        {"name": "Hexavalent Vaccine", "frequency": "Yearly", "puppy_schedule": ["6 weeks", "9 weeks"]},
+        {"name": "Kennel Cough", "frequency": "1 year", "description": "Respiratory."},
+    ],
+}
+
+
+def write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class TestVaccineCatalog:
+    """
+    Tests for the in-memory vaccine catalog.
+    """
+
+    def test_bundled_data_is_found_from_any_working_directory(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        bundled = VaccineCatalog(catalog.data_dir)
+        assert "mandatory" in bundled.vaccines("dog")
+        assert "recommended" in bundled.vaccines("cat")
+
+    def test_schedules_are_pre_parsed(self, tmp_path):
+        write(tmp_path / "dog_vaccines.json", DOG_DATA)
+        schedules = VaccineCatalog(tmp_path).schedules("dog")
+        assert [(vaccine.name, vaccine.criticality, vaccine.dose_weeks, vaccine.booster) for vaccine in schedules] == [
+            ("Rabies", "mandatory", (), Interval(2, "year")),
+            ("Hexavalent Vaccine", "recommended", (6, 9), Interval(1, "year")),
+            ("Kennel Cough", "recommended", (), Interval(1, "year")),
+        ]
+
+    def test_description_index(self, tmp_path):
+        """
+        Test that translations override and extend the descriptions from the data files.
+        """
+        write(tmp_path / "dog_vaccines.json", DOG_DATA)
+        write(tmp_path / "vaccines_lang.json", {"he": {"Rabies": "Kalevet"}, "en": {"Kennel Cough": "Cough."}})
+        vaccines = VaccineCatalog(tmp_path)
+        vaccines.load()
+        assert vaccines.description("dog", "Rabies") == "Rabies vaccine."
+        assert vaccines.description("dog", "Rabies", "he") == "Kalevet"
+        assert vaccines.description(None, "Rabies", "he") == "Kalevet"
+        assert vaccines.description("dog", "Kennel Cough") == "Cough."
+        assert vaccines.description("dog", "Hexavalent Vaccine", "he") == ""
+        assert (vaccines.stats["description_hits"], vaccines.stats["description_misses"]) == (4, 1)
+
+    def test_descriptions_are_per_pet_type(self, tmp_path):
+        """
+        Test that a vaccine name shared by several pet types keeps each pet type's description.
+        """
+        write(tmp_path / "cat_vaccines.json", {"mandatory": [{"name": "Rabies", "description": "For cats."}]})
+        write(tmp_path / "dog_vaccines.json", DOG_DATA)
+        vaccines = VaccineCatalog(tmp_path)
+        vaccines.load()
+        assert vaccines.description("cat", "Rabies") == "For cats."
+        assert vaccines.description("dog", "Rabies") == "Rabies vaccine."
+        assert vaccines.description(None, "Rabies") == ""
+
+    def test_reloads_when_a_file_changes(self, tmp_path):
+        path = tmp_path / "dog_vaccines.json"
+        write(path, DOG_DATA)
+        vaccines = VaccineCatalog(tmp_path, check_seconds=0)
+        assert len(vaccines.schedules("dog")) == 3
+        vaccines.schedules("dog")
+        assert vaccines.stats["loads"] == 1
+
+        write(path, {"mandatory": [], "recommended": DOG_DATA["recommended"][:1]})
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert len(vaccines.schedules("dog")) == 1
+        assert vaccines.stats["loads"] == 2
+
+    def test_unknown_pet_type(self, tmp_path):
+        write(tmp_path / "dog_vaccines.json", DOG_DATA)
+        vaccines = VaccineCatalog(tmp_path)
+        assert vaccines.vaccines("bird") is None
+        assert vaccines.schedules("bird") == ()
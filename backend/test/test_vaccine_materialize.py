@@ -0,0 +1,97 @@
+import asyncio
+import os
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, func, select, text, update
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, ThreadpoolSession
+from app.models import User, Pet, Treatment, Reminder
+from app.vaccines.materialize import materialize_schedule, schedule_rows
+
+# ON CONFLICT needs PostgreSQL; see test_query_plans.py for TEST_DATABASE_URL
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+PUPPY = SimpleNamespace(id=1, type="dog", birth_date=date(2024, 1, 31))
+AS_OF = date(2024, 3, 20)
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        db.add(User(id=1, email="owner@example.com", password="x"))
+        db.add(Pet(id=1, name="Rex", type="dog", breed="Labrador", birth_date=PUPPY.birth_date, owner_id=1))
+        db.commit()
+    yield Session
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def materialize(Session, target: str, as_of: date = AS_OF) -> dict:
+    async def run():
+        db = ThreadpoolSession(Session())
+        try:
+            result = await materialize_schedule(db, await db.get(Pet, 1), target, as_of=as_of)
+            await db.commit()
+            return result
+        finally:
+            await db.close()
+
+    return asyncio.run(run())
+
+
+class TestScheduleRows:
+    """
+    Tests for turning a schedule into rows.
+    """
+
+    def test_treatment_rows(self):
+        rows = {row["source_key"]: row for row in schedule_rows(PUPPY, "treatments", as_of=AS_OF)}
+        # Remaining puppy doses are one-off rows; the last one repeats yearly as the booster
+        assert rows["vaccine:Hexavalent Vaccine:2024-04-03"]["frequency"] is None
+        booster = rows["vaccine:Hexavalent Vaccine"]
+        assert (booster["next_due_date"], booster["frequency"]) == (date(2024, 4, 24), "1 year")
+        assert (booster["frequency_count"], booster["frequency_unit"]) == (1, "year")
+        assert rows["vaccine:Kennel Cough"]["frequency"] == "6 months"
+
+    def test_reminder_rows(self):
+        rows = {row["source_key"]: row for row in schedule_rows(PUPPY, "reminders", as_of=AS_OF)}
+        assert rows["vaccine:Rabies"]["recurrence"] == "FREQ=YEARLY;INTERVAL=2"
+        assert rows["vaccine:Rabies"]["recurrence_start"] == rows["vaccine:Rabies"]["due_date"]
+        assert rows["vaccine:Hexavalent Vaccine:2024-04-03"]["recurrence"] is None
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+class TestMaterializeSchedule:
+    """
+    Tests for writing a schedule to the database.
+    """
+
+    @pytest.mark.parametrize("model, target", [(Treatment, "treatments"), (Reminder, "reminders")])
+    def test_rerun_creates_no_duplicates(self, Session, model, target):
+        first = materialize(Session, target)
+        assert first["created"] and first["skipped"] == 0
+        second = materialize(Session, target)
+        assert second["created"] == [] and second["skipped"] == len(first["created"])
+        with Session() as db:
+            assert db.scalar(select(func.count(model.id))) == len(first["created"])
+
+    def test_rerun_after_rollover(self, Session):
+        """
+        Test that a booster row the rollover job moved on is still recognized a year later.
+        """
+        created = len(materialize(Session, "treatments")["created"])
+        with Session() as db:
+            db.execute(update(Treatment).where(Treatment.frequency.is_not(None)).values(next_due_date=date(2025, 4, 24)))
+            db.commit()
+
+        later = materialize(Session, "treatments", as_of=date(2025, 3, 1))
+        assert later["created"] == []
+        with Session() as db:
+            assert db.scalar(select(func.count(Treatment.id))) == created
@@ -0,0 +1,81 @@
+from datetime import date
+from app.vaccines.schedule import vaccine_schedule, schedule_cache_info
+
+
+def due(schedule) -> dict:
+    return {item["name"]: item["due_date"] for item in schedule}
+
+
+class TestVaccineSchedule:
+    """
+    Tests for the closed-form vaccine schedule engine, on the bundled dog data.
+    """
+
+    def test_puppy(self):
+        """
+        Test that a puppy gets its early-life doses and first doses at first_dose_age or the minimum age.
+        """
+        schedule = vaccine_schedule("dog", date(2024, 1, 31), as_of=date(2024, 2, 10))
+        assert [(item["name"], item["due_date"]) for item in schedule] == [
+            ("Rabies", "2024-04-30"),  # first_dose_age 3 months
+            ("Hexavalent Vaccine", "2024-03-13"),
+            ("Hexavalent Vaccine", "2024-04-03"),
+            ("Hexavalent Vaccine", "2024-04-24"),
+            ("Parkworm Prevention", "2024-03-27"),  # min_weeks 8
+            ("Kennel Cough", "2024-03-27"),
+        ]
+        assert schedule[0]["criticality"] == "mandatory"
+
+    def test_adult_boosters_use_real_intervals(self):
+        """
+        Test "Yearly", "2 months", "6 months" and "2 years" boosters, and the max_years age limit.
+        """
+        schedule = due(vaccine_schedule("dog", date(2014, 3, 1), as_of=date(2024, 2, 29)))
+        assert schedule == {
+            "Rabies": "2024-06-01",
+            "Hexavalent Vaccine": "2024-05-24",  # Yearly after the last puppy dose
+            "Kennel Cough": "2024-04-26",
+            # Parkworm Prevention would be due 2024-04-26, after its 10 year age limit
+        }
+
+    def test_very_old_birth_date(self):
+        """
+        Test that the next dose is computed directly, not by stepping through a century of boosters.
+        """
+        schedule = due(vaccine_schedule("dog", date(1900, 1, 1), as_of=date(2024, 1, 1)))
+        assert schedule["Rabies"] == "2024-04-01"
+
+    def test_descriptions_follow_the_pet_type(self):
+        """
+        Test that dogs and cats each get their own description of a vaccine both data files define.
+        """
+        def descriptions(pet_type):
+            schedule = vaccine_schedule(pet_type, date(2026, 6, 1), as_of=date(2026, 10, 18))
+            return {item["name"]: item["description"] for item in schedule}
+
+        dog, cat = descriptions("dog"), descriptions("cat")
+        assert dog["Rabies"].startswith("A viral disease fatal to dogs")
+        assert cat["Rabies"].startswith("Recommended for cats")
+
+    def test_schedules_are_cached(self):
+        birth = date(2019, 7, 4)
+        before = schedule_cache_info()
+        first = vaccine_schedule("dog", birth, as_of=date(2024, 1, 1))
+        assert vaccine_schedule("dog", birth, as_of=date(2024, 1, 1)) == first
+        after = schedule_cache_info()
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+        vaccine_schedule("dog", birth, as_of=date(2024, 1, 2))
+        assert schedule_cache_info()["misses"] == before["misses"] + 2
+
+    def test_callers_cannot_change_the_cache(self):
+        """
+        Test that changing a returned schedule entry does not leak into the next caller's schedule.
+        """
+        birth = date(2020, 3, 1)
+        first = vaccine_schedule("dog", birth, as_of=date(2024, 1, 1))
+        expected = [dict(entry) for entry in first]
+        first[0]["due_date"] = "1999-01-01"
+        first[0]["pet_id"] = 7
+        first.pop()
+        assert vaccine_schedule("dog", birth, as_of=date(2024, 1, 1)) == expected